@@ -2,8 +2,9 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from .config import Config
+from .database import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 
@@ -11,14 +12,41 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # Inicializar extensiones
+    # Inicializar extensiones (pools instrumentados antes de crear los engines)
+    from .database import configure_engines
+    configure_engines(app)
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # Server-Timing, métricas por ruta y cProfile muestreado (opcionales)
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Backend de cache (memoria o compartido entre workers) + invalidaciones
+    from .cache import init_cache
+    init_cache(app)
+
+    # ETag / Last-Modified / 304 y Cache-Control de los GET
+    from .http_cache import init_http_cache
+    init_http_cache(app)
+
+    # Réplica de lectura y statement timeouts por endpoint
+    from .database import init_database
+    init_database(app)
+
+    from . import models  # importante: este import va DENTRO de la función
+
     # Importar y registrar blueprints *dentro* de create_app
     from .routes import api_bp
     app.register_blueprint(api_bp)
 
+    # Catálogo de skills en memoria (nombres sin ir a la base)
+    from .catalog import init_catalog
+    init_catalog(app)
+
+    from .cli import skillmatch_cli
+    app.cli.add_command(skillmatch_cli)
+
     @app.route("/")
     def health():
         return "Flask listo ✅"
@@ -0,0 +1,347 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlencode
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import generate_etag, parse_accept_header, parse_etags
+
+from . import create_app
+from .cache import match_cache
+from .catalog import skill_catalog
+from .http_cache import version_etag
+from .matching import MAX_TOP_K, top_k_offers
+from .models import JobOffer, JobSkillRequirement, User, UserSkill
+from .pagination import (
+    DEFAULT_PAGE_LIMIT,
+    FILTER_PARSERS,
+    MAX_PAGE_LIMIT,
+    NDJSON_MIMETYPE,
+    _serialize,
+    parse_bool,
+)
+from .routes import (
+    JOBOFFER_COLUMNS,
+    JOBOFFER_FILTERS,
+    SCORING_MODES,
+    USER_COLUMNS,
+    USER_FILTERS,
+    build_match,
+    joboffer_to_dict,
+    ranking_scores,
+    user_to_dict,
+    with_skill_names,
+)
+
+# Modo de servicio asíncrono (ASGI):
+#
+#     uvicorn --factory app.asgi:create_asgi_app --workers 4
+#
+# Los endpoints más leídos (match usuario-oferta, top K de un usuario y los
+# listados de usuarios y ofertas) tienen una variante async sobre un engine
+# SQLAlchemy asíncrono con pool propio: mientras una request espera a la
+# base, el mismo worker atiende otras, y las queries independientes de una
+# misma request (usuario, oferta, skills, requisitos) salen en paralelo con
+# asyncio.gather, cada una por su conexión del pool.
+#
+# Todo lo demás (escrituras, otros motores, ?scoring=weighted, parámetros
+# inválidos...) lo sigue respondiendo la app Flask de siempre, montada
+# debajo: las respuestas son las mismas en los dos modos.
+
+# Driver async de cada base (la URL sync se traduce sola)
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_database_url(url):
+    """URL de SQLALCHEMY_DATABASE_URI con el driver async que corresponde."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"El modo async soporta: {', '.join(ASYNC_DRIVERS)}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_db_engine(config):
+    """Engine async con el pool dimensionado en la config."""
+    url = make_url(config["ASYNC_DATABASE_URL"] or async_database_url(config["SQLALCHEMY_DATABASE_URI"]))
+    options = {}
+    # SQLite en memoria usa un pool de una sola conexión: no acepta tamaños
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options = {
+            "pool_size": config["ASYNC_DB_POOL_SIZE"],
+            "max_overflow": config["ASYNC_DB_MAX_OVERFLOW"],
+            "pool_timeout": config["ASYNC_DB_POOL_TIMEOUT"],
+            "pool_recycle": config["ASYNC_DB_POOL_RECYCLE"],
+            "pool_pre_ping": True,
+        }
+    return create_async_engine(url, **options)
+
+
+class _Delegate:
+    """Respuesta que pasa la request tal cual a la app Flask montada."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+class AsyncAPI:
+    """Handlers async de la API, con el engine async y la app Flask de respaldo."""
+
+    def __init__(self, flask_app, db_engine, wsgi_app):
+        self.flask_app = flask_app
+        self.db_engine = db_engine
+        self.fallback = _Delegate(wsgi_app)
+
+    # -------------------------
+    # Helpers
+    # -------------------------
+
+    async def fetch(self, statement):
+        # Una conexión del pool por query: así varias pueden ir en paralelo
+        async with self.db_engine.connect() as conn:
+            return (await conn.execute(statement)).all()
+
+    def respond(self, request, endpoint, payload, status=200, headers=None, etag=None, weak=False):
+        """Arma la respuesta como lo haría Flask: JSON, ETag / 304 y Cache-Control."""
+        body = self.flask_app.json.response(payload).get_data()
+        headers = dict(headers or {})
+        if status == 200:
+            if etag is None:
+                etag, weak = generate_etag(body), False
+            headers["ETag"] = f'W/"{etag}"' if weak else f'"{etag}"'
+            if_none_match = parse_etags(request.headers.get("if-none-match"))
+            if if_none_match.contains_weak(etag) if weak else if_none_match.contains(etag):
+                status, body = 304, b""
+            config = self.flask_app.config
+            headers["Cache-Control"] = config["HTTP_CACHE_CONTROL"].get(
+                endpoint, config["HTTP_CACHE_CONTROL_DEFAULT"]
+            )
+        return Response(body, status_code=status, headers=headers, media_type="application/json")
+
+    @contextmanager
+    def app_context(self):
+        """Contexto de la app Flask (cache, catálogo y config), con las invalidaciones al día."""
+        with self.flask_app.app_context():
+            self.flask_app.extensions["invalidation_bus"].sync()
+            yield
+
+    # -------------------------
+    # MATCH: usuario vs oferta
+    # -------------------------
+
+    async def match_user_job_offer(self, request):
+        engine = request.query_params.get("engine", "python")
+        scoring = request.query_params.get("scoring", "count")
+        if engine != "python" or scoring not in SCORING_MODES:
+            return self.fallback
+        user_id = request.path_params["user_id"]
+        offer_id = request.path_params["offer_id"]
+
+        with self.app_context():
+            cache_key = match_cache.key(user_id, offer_id, f"{engine}:{scoring}")
+            etag = version_etag(cache_key, skill_catalog.snapshot().etag)
+            if etag is not None and parse_etags(request.headers.get("if-none-match")).contains_weak(etag):
+                return self.respond(request, "api.match_user_job_offer", None, etag=etag, weak=True)
+
+            result = match_cache.get(cache_key)
+            if result is None:
+                # Las cuatro lecturas son independientes: salen juntas
+                user, offer, user_levels, reqs = await asyncio.gather(
+                    self.fetch(select(User.id).where(User.id == user_id)),
+                    self.fetch(select(JobOffer.id).where(JobOffer.id == offer_id)),
+                    self.fetch(
+                        select(UserSkill.skill_id, UserSkill.level).where(UserSkill.user_id == user_id)
+                    ),
+                    self.fetch(
+                        select(
+                            JobSkillRequirement.skill_id,
+                            JobSkillRequirement.level_required,
+                            JobSkillRequirement.importance,
+                        )
+                        .where(JobSkillRequirement.job_offer_id == offer_id)
+                        .order_by(JobSkillRequirement.id)
+                    ),
+                )
+                if not user:
+                    return self.respond(request, None, {"error": "user not found"}, 404)
+                if not offer:
+                    return self.respond(request, None, {"error": "job offer not found"}, 404)
+                result = build_match(user_id, offer_id, dict(user_levels), reqs, scoring)
+                match_cache.set(cache_key, result)
+            return self.respond(
+                request, "api.match_user_job_offer", with_skill_names(result), etag=etag, weak=True
+            )
+
+    # -------------------------
+    # MATCH: top K ofertas para un usuario
+    # -------------------------
+
+    async def top_matches_for_user(self, request):
+        params = request.query_params
+        k = FILTER_PARSERS[int](params.get("k", "3"))
+        if (
+            params.get("engine", "python") != "python"
+            or params.get("scoring", "count") != "count"
+            or k is None
+            or k < 1
+        ):
+            return self.fallback
+        k = min(k, MAX_TOP_K)
+        user_id = request.path_params["user_id"]
+
+        with self.app_context():
+            user, user_levels, reqs = await asyncio.gather(
+                self.fetch(select(User.id).where(User.id == user_id)),
+                self.fetch(select(UserSkill.skill_id, UserSkill.level).where(UserSkill.user_id == user_id)),
+                self.fetch(
+                    select(
+                        JobSkillRequirement.job_offer_id,
+                        JobSkillRequirement.skill_id,
+                        JobSkillRequirement.level_required,
+                    )
+                    .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+                    .where(JobOffer.is_active.isnot(False))
+                ),
+            )
+            if not user:
+                return self.respond(request, None, {"error": "user not found"}, 404)
+
+            # El ranking recorre todos los requisitos activos: corre en un hilo
+            # para no frenar el event loop (las demás requests siguen)
+            ranking = await asyncio.to_thread(top_k_offers, dict(user_levels), reqs, k)
+            offer_ids = [offer_id for offer_id, _, _, _ in ranking]
+            offers = {
+                row.id: row
+                for row in await self.fetch(select(JobOffer.__table__).where(JobOffer.id.in_(offer_ids)))
+            }
+            return self.respond(request, "api.top_matches_for_user", {
+                "user_id": user_id,
+                "k": k,
+                "scoring": "count",
+                "matches": [
+                    {
+                        "job_offer": joboffer_to_dict(offers[offer_id]),
+                        **ranking_scores(compatibility, score, total, "count"),
+                    }
+                    for offer_id, compatibility, score, total in ranking
+                ],
+            })
+
+    # -------------------------
+    # Listados (paginación por cursor, igual que pagination.paginated_list)
+    # -------------------------
+
+    def listing(self, model, columns, serializer, filters, endpoint):
+        async def handler(request):
+            params = request.query_params
+            after_id = FILTER_PARSERS[int](params.get("after_id", "0"))
+            limit = FILTER_PARSERS[int](params.get("limit", str(DEFAULT_PAGE_LIMIT)))
+            fields = None
+            if params.get("fields"):
+                fields = [f.strip() for f in params["fields"].split(",") if f.strip()]
+                if "id" not in fields:
+                    fields.insert(0, "id")
+            if (
+                after_id is None
+                or after_id < 0
+                or limit is None
+                or not 1 <= limit <= MAX_PAGE_LIMIT
+                or (fields and any(f not in columns for f in fields))
+            ):
+                # Los 400 los arma la app Flask, con los mismos mensajes
+                return self.fallback
+
+            statement = select(*[columns[f] for f in fields]) if fields else select(model.__table__)
+            for param, (column, kind) in filters.items():
+                if param in params:
+                    value = FILTER_PARSERS[kind](params[param])
+                    if value is None:
+                        return self.fallback
+                    statement = statement.where(column == value)
+            statement = statement.where(model.id > after_id).order_by(model.id)
+
+            def to_dict(row):
+                if fields:
+                    return {f: _serialize(value) for f, value in zip(fields, row)}
+                return serializer(row)
+
+            if self.wants_stream(request):
+                return StreamingResponse(self.stream_rows(statement, to_dict), media_type=NDJSON_MIMETYPE)
+
+            rows = await self.fetch(statement.limit(limit + 1))
+            items = [to_dict(row) for row in rows[:limit]]
+            headers = {}
+            if len(rows) > limit:
+                next_after_id = items[-1]["id"]
+                query = urlencode({**dict(params), "after_id": next_after_id})
+                headers["X-Next-After-Id"] = str(next_after_id)
+                headers["Link"] = f'<{request.url.path}?{query}>; rel="next"'
+            return self.respond(request, endpoint, items, headers=headers)
+        return handler
+
+    @staticmethod
+    def wants_stream(request):
+        # Mismo criterio que pagination.wants_stream
+        if parse_bool(request.query_params.get("stream", "false")):
+            return True
+        accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+        return accept.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+    async def stream_rows(self, statement, to_dict):
+        # Cursor del lado del servidor: las filas se envían a medida que llegan
+        async with self.db_engine.connect() as conn:
+            result = await conn.stream(statement)
+            async for row in result:
+                yield json.dumps(to_dict(row)) + "\n"
+
+
+def create_asgi_app():
+    """App ASGI: variantes async de match y listados + la app Flask para el resto."""
+    flask_app = create_app()
+    db_engine = create_db_engine(flask_app.config)
+    # La app Flask corre en un pool de hilos propio (ASGI → WSGI)
+    wsgi_app = WSGIMiddleware(flask_app, workers=flask_app.config["ASGI_WSGI_THREADS"])
+    api = AsyncAPI(flask_app, db_engine, wsgi_app)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await db_engine.dispose()
+
+    routes = [
+        Route(
+            "/api/match/user/{user_id:int}/job_offer/{offer_id:int}",
+            api.match_user_job_offer,
+            methods=["GET"],
+        ),
+        Route("/api/match/user/{user_id:int}/top", api.top_matches_for_user, methods=["GET"]),
+        Route(
+            "/api/users",
+            api.listing(User, USER_COLUMNS, user_to_dict, USER_FILTERS, "api.list_users"),
+            methods=["GET"],
+        ),
+        Route(
+            "/api/job_offers",
+            api.listing(JobOffer, JOBOFFER_COLUMNS, joboffer_to_dict, JOBOFFER_FILTERS, "api.list_job_offers"),
+            methods=["GET"],
+        ),
+        # Escrituras y todo lo demás: la app Flask de siempre
+        Mount("/", app=wsgi_app),
+    ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.flask_app = flask_app
+    app.state.db_engine = db_engine
+    return app
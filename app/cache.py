@@ -0,0 +1,645 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+
+from flask import current_app
+
+from .signals import (
+    job_offers_changed,
+    requirements_changed,
+    skills_changed,
+    user_skills_changed,
+    users_changed,
+)
+
+
+class InvalidationLog:
+    """Contadores de versión y log de eventos de invalidación.
+
+    Las claves de match incluyen la versión del usuario y de la oferta, así
+    que subir una versión invalida todas sus entradas sin tener que
+    buscarlas; los eventos los aplica cada worker a sus estructuras en
+    memoria (ver InvalidationBus).
+
+    Las versiones salen de un contador global que solo sube, y se guardan a
+    lo sumo `max_versions`: al pasarse se descartan las más viejas y su
+    versión pasa a ser el piso que devuelve cualquier nombre sin entrada.
+    Así un nombre descartado nunca vuelve a un valor que ya tuvo (las claves
+    viejas quedan inalcanzables) y la memoria no crece con cada usuario u
+    oferta tocados.
+
+    `epoch` identifica la vida del almacenamiento: los contadores de versión
+    vuelven a empezar si se pierde, así que todo lo que se arme con versiones
+    hacia afuera (p. ej. ETags) tiene que incluirlo. `shared` dice si lo ven
+    todos los procesos de la máquina.
+    """
+
+    epoch = None
+    shared = False
+
+    def get_version(self, name):
+        raise NotImplementedError
+
+    def bump_version(self, name):
+        raise NotImplementedError
+
+    def publish(self, kind, payload):
+        """Agrega un evento de invalidación al log; devuelve su número de secuencia."""
+        raise NotImplementedError
+
+    def poll(self, after_seq):
+        """Eventos posteriores a `after_seq` como (seq, kind, payload).
+
+        Devuelve None si el log ya descartó eventos que el lector no vio:
+        en ese caso hay que invalidar todo.
+        """
+        raise NotImplementedError
+
+    def latest_seq(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class LocalInvalidationLog(InvalidationLog):
+    """Versiones y eventos en memoria: solo sirve con un único proceso (tests, scripts)."""
+
+    def __init__(self, max_events=10000, max_versions=100000):
+        self.max_versions = max_versions
+        self._versions = OrderedDict()  # name -> versión, de la más vieja a la más nueva
+        self._counter = 0
+        self._floor = 0
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._lock = Lock()
+        self.epoch = secrets.token_hex(4)
+
+    def get_version(self, name):
+        return self._versions.get(name, self._floor)
+
+    def bump_version(self, name):
+        with self._lock:
+            self._counter += 1
+            self._versions.pop(name, None)
+            self._versions[name] = self._counter
+            while len(self._versions) > self.max_versions:
+                _, self._floor = self._versions.popitem(last=False)
+
+    def stats(self):
+        return {"versions": len(self._versions), "max_versions": self.max_versions}
+
+    def publish(self, kind, payload):
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, kind, payload))
+            return self._seq
+
+    def poll(self, after_seq):
+        with self._lock:
+            if self._events and self._events[0][0] > after_seq + 1:
+                return None
+            return [event for event in self._events if event[0] > after_seq]
+
+    def latest_seq(self):
+        return self._seq
+
+
+def _sqlite_connection(local, path):
+    # Una conexión por hilo y por proceso (las conexiones no sobreviven a un fork)
+    conn = getattr(local, "conn", None)
+    if conn is None or local.pid != os.getpid():
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
+
+
+class SqliteInvalidationLog(InvalidationLog):
+    """Versiones y eventos en un archivo SQLite local (modo WAL).
+
+    Todos los workers de Gunicorn de la máquina leen y escriben el mismo
+    archivo: una escritura en cualquiera de ellos sube las versiones y
+    publica el evento para el resto, sea cual sea el backend de resultados.
+    El tope de versiones se revisa cada 100 subidas.
+    """
+
+    shared = True
+
+    # Formato del archivo: si cambia, el archivo se vacía (es solo cache)
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, max_events=10000, max_versions=100000):
+        self.path = path
+        self.max_events = max_events
+        self.max_versions = max_versions
+        self._local = threading.local()
+
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                for table in ("entries", "totals", "versions", "events", "meta"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_versions_version ON versions (version)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            # El primer worker que crea el archivo fija la época para todos
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) VALUES "
+                "('epoch', ?), ('version_counter', 0), ('version_floor', 0)",
+                (secrets.randbits(31),),
+            )
+        (epoch,) = conn.execute("SELECT value FROM meta WHERE name = 'epoch'").fetchone()
+        self.epoch = format(epoch, "x")
+
+    def _conn(self):
+        return _sqlite_connection(self._local, self.path)
+
+    def get_version(self, name):
+        return self._conn().execute(
+            "SELECT COALESCE("
+            "(SELECT version FROM versions WHERE name = ?), "
+            "(SELECT value FROM meta WHERE name = 'version_floor'))",
+            (name,),
+        ).fetchone()[0]
+
+    def bump_version(self, name):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (version,) = conn.execute(
+                "UPDATE meta SET value = value + 1 WHERE name = 'version_counter' RETURNING value"
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO versions (name, version) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET version = excluded.version",
+                (name, version),
+            )
+            if version % 100 == 0:
+                self._trim_versions(conn)
+
+    def _trim_versions(self, conn):
+        (count,) = conn.execute("SELECT COUNT(*) FROM versions").fetchone()
+        if count <= self.max_versions:
+            return
+        (floor,) = conn.execute(
+            "SELECT version FROM versions ORDER BY version LIMIT 1 OFFSET ?",
+            (count - self.max_versions - 1,),
+        ).fetchone()
+        conn.execute("DELETE FROM versions WHERE version <= ?", (floor,))
+        conn.execute("UPDATE meta SET value = ? WHERE name = 'version_floor'", (floor,))
+
+    def stats(self):
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM versions").fetchone()
+        return {"versions": count, "max_versions": self.max_versions}
+
+    def publish(self, kind, payload):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = conn.execute(
+                "INSERT INTO events (kind, payload) VALUES (?, ?)", (kind, json.dumps(payload))
+            ).lastrowid
+            if seq % 100 == 0:
+                conn.execute("DELETE FROM events WHERE seq <= ?", (seq - self.max_events,))
+        return seq
+
+    def poll(self, after_seq):
+        conn = self._conn()
+        oldest = conn.execute("SELECT MIN(seq) FROM events").fetchone()[0]
+        if oldest is not None and oldest > after_seq + 1:
+            return None
+        rows = conn.execute(
+            "SELECT seq, kind, payload FROM events WHERE seq > ? ORDER BY seq", (after_seq,)
+        ).fetchall()
+        return [(seq, kind, json.loads(payload)) for seq, kind, payload in rows]
+
+    def latest_seq(self):
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+
+class CacheBackend:
+    """Interfaz de un backend de cache para resultados JSON-serializables.
+
+    Las versiones y los eventos de invalidación no son del backend sino de
+    su `log` (ver InvalidationLog): los resultados pueden quedar privados de
+    cada proceso, pero las invalidaciones tienen que llegar a todos.
+    """
+
+    name = None
+    log = None
+
+    @property
+    def epoch(self):
+        return self.log.epoch
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_version(self, name):
+        return self.log.get_version(name)
+
+    def bump_version(self, name):
+        self.log.bump_version(name)
+
+    def publish(self, kind, payload):
+        return self.log.publish(kind, payload)
+
+    def poll(self, after_seq):
+        return self.log.poll(after_seq)
+
+    def latest_seq(self):
+        return self.log.latest_seq()
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Cache LRU en memoria, acotado por cantidad de entradas y bytes, con TTL opcional.
+
+    Los valores se guardan serializados en JSON: el tamaño es exacto y nadie
+    puede modificar por accidente un resultado ya cacheado. Las entradas son
+    privadas de cada proceso; sin `log` las versiones también (un solo
+    proceso).
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=None, log=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.log = log or LocalInvalidationLog()
+        self._entries = OrderedDict()  # key -> (payload, expires_at)
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key, value):
+        payload = json.dumps(value, separators=(",", ":"))
+        if len(payload) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (payload, expires_at)
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.name,
+                "shared_invalidation": self.log.shared,
+                **self.log.stats(),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _pop(self, key):
+        payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+
+class SqliteCache(CacheBackend):
+    """Cache compartido entre procesos sobre un archivo SQLite local (modo WAL).
+
+    Todos los workers de Gunicorn de la máquina leen y escriben el mismo
+    archivo, así que además de las invalidaciones comparten los resultados
+    ya calculados. El LRU es aproximado: el último acceso se actualiza como
+    mucho una vez por segundo por entrada para no escribir en cada hit.
+    Los contadores de hits/misses son del proceso que responde.
+    """
+
+    name = "sqlite"
+
+    # Cada cuánto (segundos) se vuelve a marcar el acceso de una entrada
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=None, log=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.log = log or SqliteInvalidationLog(path)
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        conn = self._conn()
+        with conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at);
+                CREATE TABLE IF NOT EXISTS totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    entries INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO totals (id, entries, bytes) VALUES (1, 0, 0);
+                CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+                    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+                    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 1;
+                END;
+                """
+            )
+
+    def _conn(self):
+        return _sqlite_connection(self._local, self.path)
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, value):
+        payload = json.dumps(value, separators=(",", ":"))
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, now),
+            )
+            entries, size = conn.execute("SELECT entries, bytes FROM totals WHERE id = 1").fetchone()
+            while entries > self.max_entries or size > self.max_bytes:
+                # Desalojar en lotes chicos las entradas menos usadas
+                batch = max(entries - self.max_entries, 1)
+                evicted = conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                    (batch,),
+                ).rowcount
+                self.evictions += evicted
+                entries, size = conn.execute("SELECT entries, bytes FROM totals WHERE id = 1").fetchone()
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    def stats(self):
+        entries, size = self._conn().execute("SELECT entries, bytes FROM totals WHERE id = 1").fetchone()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "pid": os.getpid(),
+            "shared_invalidation": self.log.shared,
+            **self.log.stats(),
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+CACHE_BACKENDS = {
+    "memory": lambda config, log: MemoryCache(
+        max_entries=config["MATCH_CACHE_MAX_ENTRIES"],
+        max_bytes=config["MATCH_CACHE_MAX_BYTES"],
+        ttl=config["MATCH_CACHE_TTL"],
+        log=log,
+    ),
+    "sqlite": lambda config, log: SqliteCache(
+        config["CACHE_PATH"],
+        max_entries=config["MATCH_CACHE_MAX_ENTRIES"],
+        max_bytes=config["MATCH_CACHE_MAX_BYTES"],
+        ttl=config["MATCH_CACHE_TTL"],
+        log=log,
+    ),
+}
+
+
+def create_backend(config):
+    """Crea el backend configurado en CACHE_BACKEND.
+
+    Sea cual sea, versiones e invalidaciones van por el archivo compartido
+    de CACHE_PATH: con "memory" cada worker tiene sus propios resultados,
+    pero ninguno se queda con datos viejos después de una escritura en otro.
+    """
+    name = config["CACHE_BACKEND"]
+    if name not in CACHE_BACKENDS:
+        raise ValueError(f"CACHE_BACKEND debe ser uno de: {', '.join(CACHE_BACKENDS)}")
+    log = SqliteInvalidationLog(config["CACHE_PATH"], max_versions=config["CACHE_MAX_VERSIONS"])
+    return CACHE_BACKENDS[name](config, log)
+
+
+# =========================
+# Invalidaciones entre workers
+# =========================
+
+# Handlers locales por tipo de evento: cada proceso aplica los eventos
+# publicados por cualquier worker a sus estructuras en memoria
+_invalidation_handlers = {}
+
+
+def on_invalidation(kind):
+    """Registra un handler local para un tipo de evento (nombre de la señal).
+
+    El handler recibe los kwargs de la señal; si el log se perdió eventos se
+    lo llama sin argumentos, lo que debe interpretarse como "invalidar todo".
+    """
+    def decorator(fn):
+        _invalidation_handlers.setdefault(kind, []).append(fn)
+        return fn
+    return decorator
+
+
+class InvalidationBus:
+    """Aplica en este proceso los eventos de invalidación del backend compartido."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._seq = backend.latest_seq()
+        self._lock = Lock()
+
+    def publish(self, kind, **payload):
+        self.backend.publish(kind, payload)
+
+    def sync(self):
+        with self._lock:
+            events = self.backend.poll(self._seq)
+            if events is None:
+                for handlers in _invalidation_handlers.values():
+                    for handler in handlers:
+                        handler()
+                self._seq = self.backend.latest_seq()
+                return
+            for seq, kind, payload in events:
+                for handler in _invalidation_handlers.get(kind, []):
+                    handler(**payload)
+                self._seq = seq
+
+
+def init_cache(app):
+    """Crea el backend de cache y el bus de invalidaciones de la app."""
+    backend = create_backend(app.config)
+    bus = InvalidationBus(backend)
+    app.extensions["cache"] = backend
+    app.extensions["invalidation_bus"] = bus
+
+    # Antes de cada request se aplican las escrituras hechas por otros workers
+    app.before_request(bus.sync)
+
+
+class MatchCache:
+    """Cache de resultados de match por (user_id, offer_id) con invalidación por versión."""
+
+    @property
+    def backend(self):
+        return current_app.extensions["cache"]
+
+    def key(self, user_id, offer_id, variant):
+        backend = self.backend
+        user_version = backend.get_version(f"user:{user_id}")
+        offer_version = backend.get_version(f"offer:{offer_id}")
+        return f"match:{user_id}:{offer_id}:{variant}:{user_version}:{offer_version}"
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def stats(self):
+        return self.backend.stats()
+
+
+match_cache = MatchCache()
+
+
+def _broadcast(app, kind, versions, **payload):
+    """Sube versiones y publica el evento para el resto de los workers."""
+    backend = app.extensions.get("cache")
+    if backend is None:
+        return
+    prefix, ids = versions
+    for entity_id in ids or []:
+        backend.bump_version(f"{prefix}:{entity_id}")
+    app.extensions["invalidation_bus"].publish(kind, **payload)
+
+
+@user_skills_changed.connect
+def _on_user_skills_changed(sender, user_ids=None, skill_ids=None, **extra):
+    _broadcast(sender, "user_skills_changed", ("user", user_ids), user_ids=user_ids, skill_ids=skill_ids)
+
+
+@users_changed.connect
+def _on_users_changed(sender, user_ids=None, **extra):
+    _broadcast(sender, "users_changed", ("user", user_ids), user_ids=user_ids)
+
+
+@requirements_changed.connect
+def _on_requirements_changed(sender, offer_ids=None, skill_ids=None, **extra):
+    _broadcast(sender, "requirements_changed", ("offer", offer_ids), offer_ids=offer_ids, skill_ids=skill_ids)
+
+
+@job_offers_changed.connect
+def _on_job_offers_changed(sender, offer_ids=None, **extra):
+    _broadcast(sender, "job_offers_changed", ("offer", offer_ids), offer_ids=offer_ids)
+
+
+@skills_changed.connect
+def _on_skills_changed(sender, skill_ids=None, **extra):
+    _broadcast(sender, "skills_changed", ("skill", None), skill_ids=skill_ids)
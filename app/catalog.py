@@ -0,0 +1,156 @@
+import bisect
+import hashlib
+import json
+import re
+import unicodedata
+from collections import namedtuple
+from threading import Lock
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import db
+from .cache import on_invalidation
+from .models import Skill
+
+# Foto inmutable del catálogo de skills:
+# - `ids`: ids ordenados; `names[i]` es el nombre de `ids[i]`
+# - `by_id`: tupla indexada por id (None en los huecos)
+# - `by_name`: nombre exacto → id; `by_folded`: nombre normalizado → id
+# - `prefixes`: tuplas (texto normalizado, id, es_nombre_completo) ordenadas,
+#   una por el nombre completo y una por cada palabra siguiente, para
+#   autocompletar con bisect
+# - `etag`: digest del contenido (estable entre workers y reinicios)
+CatalogSnapshot = namedtuple(
+    "CatalogSnapshot", "etag ids names by_id by_name by_folded prefixes"
+)
+
+# Cuántas sugerencias devuelve como máximo el autocompletado
+MAX_SUGGESTIONS = 50
+
+
+def fold_name(name):
+    """Forma normalizada de un texto: sin tildes ni mayúsculas ("Canción" → "cancion")."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _prefix_entries(skill_id, name):
+    folded = fold_name(name)
+    yield folded, skill_id, True
+    # "Machine Learning" también aparece al escribir "lear"
+    for match in re.finditer(r"[\s\-_/.]+", folded):
+        if match.end() < len(folded):
+            yield folded[match.end():], skill_id, False
+
+
+class SkillCatalog:
+    """Todas las skills en memoria, para resolver nombres sin ir a la base.
+
+    La foto se arma completa y se reemplaza de una vez (una asignación), así
+    los lectores nunca ven un catálogo a medias. Se recarga cuando cualquier
+    worker crea, renombra o borra una skill (evento `skills_changed`).
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = Lock()
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snapshot = self._snapshot
+        return snapshot
+
+    def reload(self):
+        """Arma una foto nueva desde la base y la publica."""
+        with self._lock:
+            self._snapshot = self._load()
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def name(self, skill_id):
+        by_id = self.snapshot().by_id
+        return by_id[skill_id] if 0 <= skill_id < len(by_id) else None
+
+    def names(self, skill_ids):
+        """{skill_id: nombre} para `skill_ids` (None si la skill no existe)."""
+        return {skill_id: self.name(skill_id) for skill_id in skill_ids}
+
+    def find(self, name):
+        """Id de la skill con ese nombre, sin distinguir mayúsculas (o None)."""
+        return self.snapshot().by_folded.get(fold_name(name))
+
+    def suggest(self, query, limit=10):
+        """Skills cuyo nombre (o alguna de sus palabras) empieza con `query`.
+
+        Primero las que empiezan así desde el principio del nombre, después
+        el resto; dentro de cada grupo, en orden alfabético.
+        """
+        snapshot = self.snapshot()
+        prefix = fold_name(query)
+        if not prefix:
+            return []
+
+        start = bisect.bisect_left(snapshot.prefixes, (prefix,))
+        leading, inner = [], []
+        for text, skill_id, full_name in snapshot.prefixes[start:]:
+            if not text.startswith(prefix):
+                break
+            (leading if full_name else inner).append(skill_id)
+
+        seen = set(leading)
+        ranked = leading + [s for s in dict.fromkeys(inner) if s not in seen]
+        return [(skill_id, snapshot.by_id[skill_id]) for skill_id in ranked[:limit]]
+
+    def page(self, after_id, limit):
+        """Hasta `limit` pares (id, nombre) con id > after_id, ordenados por id."""
+        snapshot = self.snapshot()
+        start = bisect.bisect_right(snapshot.ids, after_id)
+        end = start + limit
+        return list(zip(snapshot.ids[start:end], snapshot.names[start:end]))
+
+    @staticmethod
+    def _load():
+        # Si una escritura se cuela mientras se arma la foto, su evento
+        # skills_changed llega en el próximo sync y la foto se vuelve a armar
+        rows = db.session.query(Skill.id, Skill.name).order_by(Skill.id).all()
+
+        by_id = [None] * (rows[-1][0] + 1 if rows else 0)
+        for skill_id, name in rows:
+            by_id[skill_id] = name
+        digest = hashlib.sha1(json.dumps([list(row) for row in rows]).encode()).hexdigest()
+        return CatalogSnapshot(
+            etag=f"skills-{digest[:16]}",
+            ids=tuple(skill_id for skill_id, _ in rows),
+            names=tuple(name for _, name in rows),
+            by_id=tuple(by_id),
+            by_name={name: skill_id for skill_id, name in rows},
+            by_folded={fold_name(name): skill_id for skill_id, name in rows},
+            prefixes=tuple(
+                sorted(entry for skill_id, name in rows for entry in _prefix_entries(skill_id, name))
+            ),
+        )
+
+
+skill_catalog = SkillCatalog()
+
+
+def init_catalog(app):
+    """Carga el catálogo al arrancar (si la base todavía no tiene tablas, queda para después)."""
+    with app.app_context():
+        try:
+            skill_catalog.reload()
+        except SQLAlchemyError:
+            db.session.rollback()
+            skill_catalog.clear()
+            app.logger.warning("No se pudo cargar el catálogo de skills al iniciar; se cargará al primer uso")
+
+
+@on_invalidation("skills_changed")
+def _on_skills_changed(skill_ids=None):
+    skill_catalog.reload()
@@ -0,0 +1,69 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from . import db
+from .models import User
+from .recommendations import enqueue, run_worker
+from .rescore import rescore_all
+from .scores import rebuild_all_scores
+
+# Comandos de mantenimiento: flask skillmatch <comando>
+skillmatch_cli = AppGroup("skillmatch", help="Tareas de mantenimiento de SkillMatch.")
+
+
+@skillmatch_cli.command("rebuild-scores")
+def rebuild_scores_command():
+    """Recalcula la tabla match_scores completa."""
+    count = rebuild_all_scores()
+    click.echo(f"match_scores recalculado para {count} ofertas ✅")
+
+
+@skillmatch_cli.command("recommendations-worker")
+@click.option("--once", is_flag=True, help="Procesa la cola pendiente y termina.")
+@click.option("--interval", type=float, default=None, help="Segundos de espera entre vueltas.")
+@click.option("--batch-size", type=int, default=None, help="Tareas que se toman por tanda.")
+@click.option("--all-users", is_flag=True, help="Encola a todos los usuarios antes de empezar.")
+def recommendations_worker_command(once, interval, batch_size, all_users):
+    """Mantiene user_recommendations al día consumiendo la cola de cambios."""
+    if all_users:
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+        enqueue("user", user_ids)
+        click.echo(f"{len(user_ids)} usuarios encolados")
+    if once:
+        click.echo("Procesando la cola de recomendaciones…")
+    else:
+        click.echo("Worker de recomendaciones escuchando la cola (Ctrl+C para salir)")
+    try:
+        run_worker(interval=interval, batch_size=batch_size, once=once, log=click.echo)
+    except KeyboardInterrupt:
+        pass
+    click.echo("Worker de recomendaciones detenido ✅")
+
+
+@skillmatch_cli.command("rescore")
+@click.option("--workers", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo).")
+@click.option("--shard-size", type=int, default=None, help="Usuarios por shard.")
+@click.option("--batch-size", type=int, default=None, help="Filas por upsert.")
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None, help="Archivo de avance para retomar.")
+@click.option("--restart", is_flag=True, help="Ignora el checkpoint y empieza de cero.")
+def rescore_command(workers, shard_size, batch_size, checkpoint, restart):
+    """Recalcula match_scores en paralelo, por shards de usuarios."""
+    config = current_app.config
+    workers = workers or os.cpu_count() or 1
+    with click.progressbar(length=db.session.query(User.id).count(), label="Usuarios") as bar:
+        summary = rescore_all(
+            workers=workers,
+            shard_size=shard_size or config["RESCORE_SHARD_SIZE"],
+            batch_size=batch_size or config["RESCORE_BATCH_SIZE"],
+            checkpoint_path=checkpoint or config["RESCORE_CHECKPOINT"],
+            restart=restart,
+            progress=bar.update,
+            log=click.echo,
+        )
+    click.echo(
+        f"match_scores recalculado: {summary['users']} usuarios en {summary['shards']} shards, "
+        f"{summary['rows']} filas, {workers} workers, {summary['seconds']}s ✅"
+    )
@@ -1,30 +1,138 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 load_dotenv()
 
+
+def env_bool(name, default):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS según el motor de `url`, desde variables de entorno.
+
+    - Pool: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (segundos de espera
+      por una conexión libre), DB_POOL_RECYCLE y DB_POOL_PRE_PING.
+    - Postgres: DB_STATEMENT_TIMEOUT_MS como statement_timeout de cada conexión
+      (0 = sin límite); por endpoint se ajusta con DB_STATEMENT_TIMEOUTS.
+    - SQLite en memoria usa una sola conexión: no lleva opciones de pool.
+    """
+    if not url:
+        return {}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite:/")):
+        return {}
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": env_bool("DB_POOL_PRE_PING", "true"),
+    }
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    if url.startswith("postgres") and statement_timeout:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from .config import Config
 
-db = SQLAlchemy()
-migrate = Migrate()
+    # Réplica de lectura opcional: los GET de DB_REPLICA_ENDPOINTS leen de ella.
+    # Solo listados y exports, que toleran un poco de retraso; los índices en
+    # memoria y las lecturas después de escribir siguen yendo a la primaria
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    SQLALCHEMY_BINDS = (
+        {"replica": {"url": DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)}}
+        if DATABASE_REPLICA_URL
+        else {}
+    )
+    DB_REPLICA_ENDPOINTS = {
+        "api.list_users",
+        "api.list_job_offers",
+        "api.list_user_skills",
+        "api.list_job_skill_requirements",
+        "api.get_user_recommendations",
+    }
+
+    # Timeout por sentencia (ms) de los endpoints pesados: rankings y
+    # listados / exports. En Postgres es un SET LOCAL statement_timeout; en
+    # SQLite se corta la consulta con un progress handler
+    DB_STATEMENT_TIMEOUTS = {
+        "api.top_matches_for_user": int(os.getenv("DB_RANKING_TIMEOUT_MS", "5000")),
+        "api.top_candidates_for_job_offer": int(os.getenv("DB_RANKING_TIMEOUT_MS", "5000")),
+        "api.list_users": int(os.getenv("DB_EXPORT_TIMEOUT_MS", "30000")),
+        "api.list_job_offers": int(os.getenv("DB_EXPORT_TIMEOUT_MS", "30000")),
+        "api.list_user_skills": int(os.getenv("DB_EXPORT_TIMEOUT_MS", "30000")),
+        "api.list_job_skill_requirements": int(os.getenv("DB_EXPORT_TIMEOUT_MS", "30000")),
+    }
+
+    # Instrumentación opcional del API: tiempo por request, sentencias SQL y
+    # tiempo en la base → Server-Timing y histogramas por ruta en /api/metrics
+    INSTRUMENTATION = env_bool("INSTRUMENTATION", "false")
+    # cProfile de una fracción de los requests (0 = apagado), un .prof por request
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR = os.getenv(
+        "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "skillmatch-profiles")
+    )
+
+    # Backend de cache: "memory" (resultados privados por proceso) o "sqlite"
+    # (archivo local compartido por todos los workers de la máquina). Las
+    # versiones y las invalidaciones van siempre por el archivo de CACHE_PATH,
+    # así que una escritura en un worker llega a todos con cualquiera de los dos
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_PATH = os.getenv(
+        "CACHE_PATH", os.path.join(tempfile.gettempdir(), "skillmatch-cache.sqlite3")
+    )
+    # Contadores de versión (por usuario y por oferta) que se guardan como
+    # máximo: los más viejos se descartan sin riesgo de servir datos viejos
+    CACHE_MAX_VERSIONS = int(os.getenv("CACHE_MAX_VERSIONS", "100000"))
+
+    # Cache de resultados de match (LRU por entradas y bytes, TTL en segundos)
+    MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "10000"))
+    MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    MATCH_CACHE_TTL = int(os.getenv("MATCH_CACHE_TTL", "0")) or None
 
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
+    # Recuperación aproximada (engine=lsh): firmas MinHash de NUM_PERM hashes
+    # partidas en BANDS bandas. Más bandas → más recall y más candidatos
+    LSH_NUM_PERM = int(os.getenv("LSH_NUM_PERM", "64"))
+    LSH_BANDS = int(os.getenv("LSH_BANDS", "32"))
 
-    db.init_app(app)
-    migrate.init_app(app, db)
+    # Recomendaciones precalculadas (flask skillmatch recommendations-worker):
+    # cuántas ofertas se guardan por usuario, cuántas tareas toma el worker
+    # por tanda y cada cuántos segundos revisa la cola
+    RECOMMENDATIONS_TOP_N = int(os.getenv("RECOMMENDATIONS_TOP_N", "10"))
+    RECOMMENDATIONS_BATCH_SIZE = int(os.getenv("RECOMMENDATIONS_BATCH_SIZE", "500"))
+    RECOMMENDATIONS_POLL_INTERVAL = float(os.getenv("RECOMMENDATIONS_POLL_INTERVAL", "2"))
 
-    from . import models  # importante: este import va DENTRO de la función
+    # Recalculo masivo en paralelo (flask skillmatch rescore): usuarios por
+    # shard, filas por upsert y dónde se guarda el avance para retomar
+    RESCORE_SHARD_SIZE = int(os.getenv("RESCORE_SHARD_SIZE", "5000"))
+    RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "5000"))
+    RESCORE_CHECKPOINT = os.getenv(
+        "RESCORE_CHECKPOINT", os.path.join(tempfile.gettempdir(), "skillmatch-rescore.json")
+    )
 
-    @app.route("/")
-    def health():
-        return "Flask listo ✅"
+    # Modo ASGI (app.asgi): engine async propio. Por defecto la misma base que
+    # DATABASE_URL con el driver async (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "10"))
+    ASYNC_DB_POOL_TIMEOUT = float(os.getenv("ASYNC_DB_POOL_TIMEOUT", "10"))
+    ASYNC_DB_POOL_RECYCLE = int(os.getenv("ASYNC_DB_POOL_RECYCLE", "1800"))
+    # Hilos para los endpoints que siguen siendo sync (app Flask montada)
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "10"))
 
-    return app
+    # Cache-Control de las respuestas GET: por defecto los clientes pueden
+    # guardarlas pero revalidan cada vez (ETag / 304); por endpoint se puede
+    # dar más margen
+    HTTP_CACHE_CONTROL_DEFAULT = os.getenv("HTTP_CACHE_CONTROL_DEFAULT", "private, no-cache")
+    HTTP_CACHE_CONTROL = {
+        "api.api_health": "no-store",
+        "api.cache_stats": "no-store",
+        "api.metrics": "no-store",
+        "api.list_skills": "public, max-age=60",
+        "api.get_skill": "public, max-age=60",
+    }
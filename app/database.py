@@ -0,0 +1,125 @@
+import time
+
+from flask import current_app, g, has_request_context, jsonify, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from .metrics import InstrumentedQueuePool, statement_timeouts
+
+REPLICA_BIND = "replica"
+
+# Cada cuántas instrucciones de SQLite se revisa el deadline de la sentencia
+SQLITE_PROGRESS_STEPS = 10000
+
+
+class RoutingSession(Session):
+    """Sesión que manda las lecturas a la réplica cuando el request lo permite.
+
+    Solo se enruta lo que no tiene bind propio y no es parte de un flush:
+    las escrituras siempre van a la primaria.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _use_replica():
+    return has_request_context() and g.get("db_replica", False)
+
+
+def _statement_timeout_ms():
+    return g.get("statement_timeout_ms") if has_request_context() else None
+
+
+def configure_engines(app):
+    """Pool instrumentado para la primaria y la réplica (antes de db.init_app)."""
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    if "pool_size" in options:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {**options, "poolclass": InstrumentedQueuePool}
+
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    replica = binds.get(REPLICA_BIND)
+    if isinstance(replica, dict) and "pool_size" in replica:
+        binds[REPLICA_BIND] = {**replica, "poolclass": InstrumentedQueuePool}
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def _set_local_timeout(session, transaction, connection):
+    # Postgres: el timeout vale para toda la transacción del request
+    ms = _statement_timeout_ms()
+    if ms and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+
+
+def _sqlite_deadline(conn, cursor, statement, parameters, context, executemany):
+    # SQLite no tiene statement_timeout: un progress handler corta la
+    # sentencia (sqlite3.OperationalError "interrupted") al pasar el deadline
+    driver = conn.connection.driver_connection
+    ms = _statement_timeout_ms()
+    if not ms:
+        driver.set_progress_handler(None, 0)
+        return
+    deadline = [time.monotonic() + ms / 1000]
+    g.sqlite_deadline = (deadline, ms)
+    driver.set_progress_handler(lambda: time.monotonic() > deadline[0], SQLITE_PROGRESS_STEPS)
+
+
+def restart_statement_deadline():
+    """Vuelve a contar el timeout de la sentencia SQLite en curso desde cero.
+
+    Para los exports en stream: el deadline corre por cada lectura del
+    cursor, no por todo el body (el tiempo que tarda el cliente en leer no
+    cuenta). En Postgres cada FETCH del cursor ya es una sentencia aparte.
+    """
+    current = g.get("sqlite_deadline") if has_request_context() else None
+    if current is not None:
+        deadline, ms = current
+        deadline[0] = time.monotonic() + ms / 1000
+
+
+def is_statement_timeout(error):
+    orig = getattr(error, "orig", None)
+    if getattr(orig, "pgcode", None) == "57014":  # query_canceled
+        return True
+    return "interrupted" in str(orig)
+
+
+def init_database(app):
+    """Réplica de lectura, timeouts por endpoint y 503 cuando se cortan.
+
+    Se registra después de init_cache: la sincronización de invalidaciones
+    del before_request sigue leyendo de la primaria.
+    """
+    db = app.extensions["sqlalchemy"]
+    replica_endpoints = app.config.get("DB_REPLICA_ENDPOINTS", set())
+    timeouts = app.config.get("DB_STATEMENT_TIMEOUTS", {})
+
+    if not event.contains(RoutingSession, "after_begin", _set_local_timeout):
+        event.listen(RoutingSession, "after_begin", _set_local_timeout)
+    with app.app_context():
+        has_replica = REPLICA_BIND in db.engines
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "before_cursor_execute", _sqlite_deadline)
+
+    @app.before_request
+    def route_database():
+        endpoint = request.endpoint
+        if has_replica and request.method in ("GET", "HEAD") and endpoint in replica_endpoints:
+            g.db_replica = True
+        if timeouts.get(endpoint):
+            g.statement_timeout_ms = timeouts[endpoint]
+
+    @app.errorhandler(OperationalError)
+    def statement_timeout(error):
+        if not is_statement_timeout(error):
+            raise error
+        db.session.rollback()
+        statement_timeouts.record(request.endpoint)
+        current_app.logger.warning("Statement timeout en %s: %s", request.endpoint, error.orig)
+        return jsonify({"error": "statement timeout"}), 503
@@ -0,0 +1,381 @@
+from threading import Lock
+
+import numpy as np
+
+from . import db
+from .cache import on_invalidation
+from .matching import (
+    DEFAULT_IMPORTANCE,
+    LEVEL_NAMES,
+    LEVEL_SCALE,
+    level_name,
+    weighted_compatibility,
+    weighted_credit,
+)
+from .models import JobOffer, JobSkillRequirement, UserSkill
+
+
+def _csr(rows, cols, n_rows, levels, *values):
+    """Arma una matriz CSR (indptr, cols, levels, *values) a partir de tripletas."""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return (
+        indptr,
+        cols[order].astype(np.int32),
+        levels[order].astype(np.int8),
+        *(v[order] for v in values),
+    )
+
+
+def _gather(indptr, segments):
+    """Índices planos de todas las filas `segments` de una matriz CSR."""
+    starts = indptr[segments]
+    lengths = indptr[segments + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(lengths.sum()) + offsets, lengths
+
+
+class MatchEngine:
+    """Motor de matching vectorizado sobre matrices compactas de niveles.
+
+    Guarda los niveles de usuarios (usuarios × skills) y los niveles mínimos
+    de ofertas (ofertas × skills) como matrices CSR de `int8`, más una copia
+    por columna (skill -> usuarios) para el ranking inverso. Todas las
+    comparaciones `nivel_usuario >= nivel_requerido` se hacen con NumPy.
+    Cada requisito guarda además su importancia para el scoring ponderado.
+    """
+
+    def __init__(self, skill_ids, user_ids, user_csr, offer_ids, offer_csr, offer_active):
+        self.skill_ids = skill_ids
+        self.user_ids = user_ids
+        self.u_indptr, self.u_cols, self.u_levels = user_csr
+        self.offer_ids = offer_ids
+        self.o_indptr, self.o_cols, self.o_levels, self.o_weights = offer_csr
+        self.offer_active = offer_active
+
+        self.n_skills = self.skill_ids.size
+        self.o_totals = np.diff(self.o_indptr)
+        self.o_rows = np.repeat(np.arange(self.offer_ids.size), self.o_totals)
+        # Peso total por oferta precalculado, en unidades de LEVEL_SCALE
+        self.o_weights = self.o_weights.astype(np.int64) * LEVEL_SCALE
+        self.o_total_weights = np.bincount(
+            self.o_rows, weights=self.o_weights, minlength=self.offer_ids.size
+        ).astype(np.int64)
+
+        # Copia por columnas (CSC) para puntuar todos los usuarios contra una oferta
+        u_rows = np.repeat(np.arange(self.user_ids.size), np.diff(self.u_indptr))
+        self.s_indptr, self.s_rows, self.s_levels = _csr(
+            self.u_cols.astype(np.int64), u_rows, self.n_skills, self.u_levels
+        )
+
+    @classmethod
+    def from_db(cls):
+        us = np.array(
+            db.session.query(UserSkill.user_id, UserSkill.skill_id, UserSkill.level).all(),
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        reqs = np.array(
+            db.session.query(
+                JobSkillRequirement.job_offer_id,
+                JobSkillRequirement.skill_id,
+                JobSkillRequirement.level_required,
+                db.func.coalesce(JobSkillRequirement.importance, DEFAULT_IMPORTANCE),
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 4)
+        offers = db.session.query(JobOffer.id, JobOffer.is_active).order_by(JobOffer.id).all()
+
+        skill_ids = np.union1d(us[:, 1], reqs[:, 1])
+
+        user_ids = np.unique(us[:, 0])
+        user_rows = np.searchsorted(user_ids, us[:, 0])
+        user_cols = np.searchsorted(skill_ids, us[:, 1])
+        # Si un usuario repite una skill, gana el nivel más alto
+        dedup = np.lexsort((-us[:, 2], user_cols, user_rows))
+        keep = np.ones(dedup.size, dtype=bool)
+        keep[1:] = (np.diff(user_rows[dedup]) != 0) | (np.diff(user_cols[dedup]) != 0)
+        dedup = dedup[keep]
+
+        offer_ids = np.array([offer_id for offer_id, _ in offers], dtype=np.int64)
+        offer_active = np.array([is_active is not False for _, is_active in offers], dtype=bool)
+        # Requisitos huérfanos (oferta inexistente) no se puntúan
+        reqs = reqs[np.isin(reqs[:, 0], offer_ids)]
+
+        return cls(
+            skill_ids,
+            user_ids,
+            _csr(user_rows[dedup], user_cols[dedup], user_ids.size, us[dedup, 2]),
+            offer_ids,
+            _csr(
+                np.searchsorted(offer_ids, reqs[:, 0]),
+                np.searchsorted(skill_ids, reqs[:, 1]),
+                offer_ids.size,
+                reqs[:, 2],
+                reqs[:, 3],
+            ),
+            offer_active,
+        )
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    @staticmethod
+    def _row(ids, value):
+        row = np.searchsorted(ids, value)
+        if row < ids.size and ids[row] == value:
+            return int(row)
+        return None
+
+    def user_vector(self, user_id):
+        """Niveles del usuario como vector denso por skill (-1 si no la tiene)."""
+        vector = np.full(self.n_skills, -1, dtype=np.int8)
+        row = self._row(self.user_ids, user_id)
+        if row is not None:
+            start, end = self.u_indptr[row], self.u_indptr[row + 1]
+            vector[self.u_cols[start:end]] = self.u_levels[start:end]
+        return vector
+
+    def user_block(self, user_ids):
+        """Matriz densa (len(user_ids) × skills) con los niveles de un bloque de usuarios."""
+        block = np.full((len(user_ids), self.n_skills), -1, dtype=np.int8)
+        for i, user_id in enumerate(user_ids):
+            row = self._row(self.user_ids, user_id)
+            if row is not None:
+                start, end = self.u_indptr[row], self.u_indptr[row + 1]
+                block[i, self.u_cols[start:end]] = self.u_levels[start:end]
+        return block
+
+    # -------------------------
+    # Scoring
+    # -------------------------
+
+    @staticmethod
+    def compatibility(matched, totals, weighted=False):
+        """Mismo redondeo que el endpoint: int((matched / total) * 100).
+
+        En modo ponderado es la división entera exacta de `weighted_compatibility`.
+        """
+        if weighted:
+            return np.where(totals > 0, matched * 100 // np.maximum(totals, 1), 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            compat = (matched / totals) * 100
+        return np.where(totals > 0, compat, 0).astype(np.int64)
+
+    @staticmethod
+    def _credit(user_levels, required, weights, weighted):
+        """1/0 por requisito cumplido, o crédito ponderado (ver `weighted_credit`)."""
+        met = user_levels >= required
+        if not weighted:
+            return met
+        levels = user_levels.astype(np.int64)
+        partial = np.where(levels > 0, weights * levels // np.maximum(required, 1), 0)
+        return np.where(met, weights, partial)
+
+    def totals(self, weighted=False):
+        """Denominador por oferta: cantidad de requisitos o peso total."""
+        return self.o_total_weights if weighted else self.o_totals
+
+    def score_user(self, user_id, weighted=False):
+        """Score de un usuario en cada oferta (vector por oferta)."""
+        credit = self._credit(
+            self.user_vector(user_id)[self.o_cols], self.o_levels, self.o_weights, weighted
+        )
+        return np.bincount(self.o_rows, weights=credit, minlength=self.offer_ids.size).astype(np.int64)
+
+    def score_users_block(self, user_ids, weighted=False):
+        """Scores de un bloque de usuarios × todas las ofertas."""
+        credit = self._credit(
+            self.user_block(user_ids)[:, self.o_cols],
+            self.o_levels[np.newaxis, :],
+            self.o_weights[np.newaxis, :],
+            weighted,
+        )
+        cumulative = np.zeros((credit.shape[0], credit.shape[1] + 1), dtype=np.int64)
+        np.cumsum(credit, axis=1, out=cumulative[:, 1:])
+        return cumulative[:, self.o_indptr[1:]] - cumulative[:, self.o_indptr[:-1]]
+
+    def score_offer(self, offer_id, weighted=False):
+        """Score de cada usuario del motor para una oferta, más el total de la oferta."""
+        scores = np.zeros(self.user_ids.size, dtype=np.int64)
+        row = self._row(self.offer_ids, offer_id)
+        if row is None:
+            return scores, 0
+        start, end = self.o_indptr[row], self.o_indptr[row + 1]
+        cols = self.o_cols[start:end].astype(np.int64)
+        idx, lengths = _gather(self.s_indptr, cols)
+        credit = self._credit(
+            self.s_levels[idx],
+            np.repeat(self.o_levels[start:end], lengths),
+            np.repeat(self.o_weights[start:end], lengths),
+            weighted,
+        )
+        scores += np.bincount(
+            self.s_rows[idx], weights=credit, minlength=self.user_ids.size
+        ).astype(np.int64)
+        return scores, int(self.totals(weighted)[row])
+
+    # -------------------------
+    # Rankings
+    # -------------------------
+
+    def top_offers(self, user_id, k, weighted=False):
+        """Top K ofertas activas para un usuario: (offer_id, compat, score, total)."""
+        scores = self.score_user(user_id, weighted)
+        totals = self.totals(weighted)
+        compat = self.compatibility(scores, totals, weighted)
+        candidates = np.flatnonzero(self.offer_active & (self.o_totals > 0))
+        # Mismo orden que el ranking en Python: compat, score, id más antiguo
+        order = np.lexsort((self.offer_ids[candidates], -scores[candidates], -compat[candidates]))
+        top = candidates[order[:k]]
+        return [
+            (int(self.offer_ids[i]), int(compat[i]), int(scores[i]), int(totals[i]))
+            for i in top
+        ]
+
+    def top_users(self, offer_id, k, weighted=False):
+        """Top K usuarios con score positivo: ([(user_id, score)], total)."""
+        scores, total = self.score_offer(offer_id, weighted)
+        candidates = np.flatnonzero(scores > 0)
+        order = np.lexsort((self.user_ids[candidates], -scores[candidates]))
+        top = candidates[order[:k]]
+        return [(int(self.user_ids[i]), int(scores[i])) for i in top], total
+
+    def skill_gaps(self, user_id, threshold, k, weighted=False):
+        """Qué skill (y a qué nivel) pasaría más ofertas activas sobre `threshold`.
+
+        Una sola pasada por todos los requisitos: para cada requisito no
+        cumplido de una oferta bajo el umbral se calcula si cumplirlo alcanza
+        para superarlo, y se cuentan con `bincount` por (skill, nivel
+        requerido). Llegar al nivel L cumple todos los requisitos de nivel
+        <= L, así que el acumulado por nivel da las ofertas que destraba.
+
+        Devuelve ([(skill_id, nivel_actual, nivel_objetivo, ofertas)], ofertas bajo el umbral),
+        con nivel_actual -1 si el usuario no tiene la skill.
+        """
+        user = self.user_vector(user_id)
+        user_levels = user[self.o_cols]
+        credit = self._credit(user_levels, self.o_levels, self.o_weights, weighted).astype(np.int64)
+        scores = np.bincount(self.o_rows, weights=credit, minlength=self.offer_ids.size).astype(np.int64)
+        totals = self.totals(weighted)
+        below = (
+            self.offer_active
+            & (totals > 0)
+            & (self.compatibility(scores, totals, weighted) < threshold)
+        )
+
+        # Cumplir un requisito suma su peso completo (1 en modo conteo)
+        gain = (self.o_weights if weighted else 1) - credit
+        unlocks = (
+            (user_levels < self.o_levels)
+            & below[self.o_rows]
+            & (
+                self.compatibility(scores[self.o_rows] + gain, totals[self.o_rows], weighted)
+                >= threshold
+            )
+        )
+        n_levels = max(LEVEL_NAMES) + 1
+        counts = np.bincount(
+            self.o_cols[unlocks].astype(np.int64) * n_levels + self.o_levels[unlocks],
+            minlength=self.n_skills * n_levels,
+        ).reshape(self.n_skills, n_levels)
+        unlocked = np.cumsum(counts, axis=1)
+
+        # Solo los niveles que destraban algo nuevo respecto del anterior
+        cols, levels = np.nonzero(counts)
+        order = np.lexsort((self.skill_ids[cols], levels, -unlocked[cols, levels]))[:k]
+        gaps = [
+            (int(self.skill_ids[c]), int(user[c]), int(lv), int(unlocked[c, lv]))
+            for c, lv in zip(cols[order], levels[order])
+        ]
+        return gaps, int(below.sum())
+
+    def match(self, user_id, offer_id, weighted=False):
+        """Detalle de un match con la misma estructura que el endpoint clásico."""
+        row = self._row(self.offer_ids, offer_id)
+        start, end = (self.o_indptr[row], self.o_indptr[row + 1]) if row is not None else (0, 0)
+        cols = self.o_cols[start:end]
+        required = self.o_levels[start:end]
+        weights = self.o_weights[start:end] // LEVEL_SCALE
+        user_levels = self.user_vector(user_id)[cols]
+        skill_ids = self.skill_ids[cols]
+
+        matched_skills = []
+        missing_skills = []
+        credit = 0
+        for skill_id, user_level, required_level, importance in zip(
+            skill_ids, user_levels, required, weights
+        ):
+            credit += weighted_credit(int(user_level), int(required_level), int(importance))
+            if user_level < 0:
+                entry = {
+                    "skill_id": int(skill_id),
+                    "required_min_level": level_name(required_level),
+                    "reason": "user_missing_skill",
+                }
+                missing_skills.append(entry)
+            elif user_level >= required_level:
+                entry = {
+                    "skill_id": int(skill_id),
+                    "user_level": level_name(user_level),
+                    "required_min_level": level_name(required_level),
+                    "status": "ok",
+                }
+                matched_skills.append(entry)
+            else:
+                entry = {
+                    "skill_id": int(skill_id),
+                    "user_level": level_name(user_level),
+                    "required_min_level": level_name(required_level),
+                    "reason": "level_too_low",
+                }
+                missing_skills.append(entry)
+            if weighted:
+                entry["importance"] = int(importance)
+
+        result = {
+            "compatibility": int(self.compatibility(np.array([len(matched_skills)]), np.array([cols.size]))[0]),
+            "matched_skills": matched_skills,
+            "missing_skills": missing_skills,
+            "total_requirements": int(cols.size),
+            "matched_requirements": len(matched_skills),
+        }
+        if weighted:
+            total_weight = int(weights.sum()) * LEVEL_SCALE
+            result.update({
+                "scoring": "weighted",
+                "compatibility": weighted_compatibility(credit, total_weight),
+                "matched_weight": round(credit / LEVEL_SCALE, 2),
+                "total_weight": total_weight // LEVEL_SCALE,
+            })
+        return result
+
+
+_engine = None
+_generation = 0
+_engine_lock = Lock()
+
+
+def get_engine():
+    """Devuelve el motor del proceso, reconstruyéndolo si hubo escrituras."""
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            generation = _generation
+            engine = _engine or MatchEngine.from_db()
+            # Si hubo una escritura mientras se construía, no lo dejamos cacheado
+            if generation == _generation:
+                _engine = engine
+    return engine
+
+
+def invalidate_engine(*args, **kwargs):
+    global _engine, _generation
+    _generation += 1
+    _engine = None
+
+
+for _kind in ("user_skills_changed", "requirements_changed", "job_offers_changed"):
+    on_invalidation(_kind)(invalidate_engine)
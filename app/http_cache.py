@@ -0,0 +1,82 @@
+from flask import current_app, request
+
+# Validadores HTTP (ETag / Last-Modified) y Cache-Control de las respuestas GET.
+#
+# - Recursos sueltos: ETag y Last-Modified a partir de `updated_at`.
+# - Match y recursos con relaciones: ETag débil armado con los contadores de
+#   versión del cache (más la época del backend, porque los contadores
+#   vuelven a empezar si se pierde el almacenamiento). Solo si esas versiones
+#   las comparten todos los workers: con un log privado del proceso, un
+#   worker que no vio una escritura seguiría dando el ETag viejo.
+# - El resto de los GET (listados, rankings): ETag con el hash del cuerpo.
+#
+# En todos los casos un If-None-Match / If-Modified-Since que coincide
+# responde 304 sin cuerpo.
+
+
+def row_etag(prefix, row):
+    """ETag fuerte de una fila a partir de su id y su `updated_at`."""
+    stamp = row.updated_at.strftime("%Y%m%d%H%M%S%f") if row.updated_at else "0"
+    return f"{prefix}-{row.id}-{stamp}"
+
+
+def version_etag(*parts):
+    """ETag débil con las versiones del cache (incluye la época del backend).
+
+    None si las versiones son privadas del proceso: la respuesta se queda
+    con el ETag por hash del cuerpo.
+    """
+    backend = current_app.extensions["cache"]
+    if not backend.log.shared:
+        return None
+    return "-".join(str(part) for part in (backend.epoch, *parts))
+
+
+def not_modified(etag, weak=False):
+    """Respuesta 304 si el cliente ya tiene esta versión; None si no.
+
+    Sirve para cortar antes de calcular el cuerpo (p. ej. un match).
+    """
+    if etag is None:
+        return None
+    if weak:
+        matches = request.if_none_match.contains_weak(etag)
+    else:
+        matches = request.if_none_match.contains(etag)
+    if not matches:
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag, weak=weak)
+    return response
+
+
+def with_validators(response, etag=None, last_modified=None, weak=False):
+    """Agrega ETag / Last-Modified a una respuesta ya armada."""
+    if etag is not None:
+        response.set_etag(etag, weak=weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def _finalize(response):
+    if request.method != "GET":
+        return response
+
+    if response.status_code == 200 and not response.is_streamed:
+        # Sin validador propio: hash del cuerpo
+        if "ETag" not in response.headers:
+            response.add_etag()
+        response.make_conditional(request)
+
+    if response.status_code in (200, 304) and "Cache-Control" not in response.headers:
+        policies = current_app.config["HTTP_CACHE_CONTROL"]
+        response.headers["Cache-Control"] = policies.get(
+            request.endpoint, current_app.config["HTTP_CACHE_CONTROL_DEFAULT"]
+        )
+    return response
+
+
+def init_http_cache(app):
+    """Registra el hook que completa validadores, 304 y Cache-Control."""
+    app.after_request(_finalize)
@@ -0,0 +1,103 @@
+import cProfile
+import os
+import random
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from .metrics import request_metrics
+
+# Instrumentación opcional del API (INSTRUMENTATION=1):
+#
+# - Por request: duración total, cantidad de sentencias SQL y tiempo en la
+#   base (eventos before/after_cursor_execute de los engines).
+# - Server-Timing en la respuesta: `app;dur=…, db;dur=…;desc="N queries"`,
+#   así un N+1 se ve en el navegador y en los tests sin mirar logs.
+# - Histogramas por ruta en /api/metrics (JSON o texto de Prometheus).
+#
+# Aparte, PROFILE_SAMPLE_RATE > 0 corre cProfile en esa fracción de los
+# requests y deja un .prof por request en PROFILE_DIR (se lee con pstats o
+# snakeviz).
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_statements" in g:
+        g.sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_started" in g:
+        g.sql_seconds += time.perf_counter() - g.pop("sql_started")
+        g.sql_statements += 1
+
+
+def start_request():
+    g.request_started = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+
+def add_server_timing(response):
+    if "request_started" not in g:
+        return response
+    # Para respuestas en streaming es lo que llevó armar la respuesta; el
+    # histograma de /api/metrics sí incluye el cuerpo completo
+    elapsed_ms = (time.perf_counter() - g.request_started) * 1000
+    g.response_status = response.status_code
+    response.headers.add(
+        "Server-Timing",
+        f'app;dur={elapsed_ms:.1f}, db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_statements} queries"',
+    )
+    return response
+
+
+def record_request(exc):
+    if "request_started" not in g:
+        return
+    request_metrics.observe(
+        request.endpoint or "unknown",
+        request.method,
+        g.get("response_status", 500),
+        time.perf_counter() - g.request_started,
+        g.sql_statements,
+        g.sql_seconds,
+    )
+
+
+def start_profile():
+    if random.random() >= current_app.config["PROFILE_SAMPLE_RATE"]:
+        return
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+
+def dump_profile(exc):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+    profiler.disable()
+    name = f"{request.endpoint or 'unknown'}-{time.time_ns() // 1_000_000}-{os.getpid()}.prof"
+    profiler.dump_stats(os.path.join(current_app.config["PROFILE_DIR"], name))
+
+
+def init_instrumentation(app):
+    """Registra los hooks según INSTRUMENTATION y PROFILE_SAMPLE_RATE.
+
+    Va antes que el resto de los hooks para que el tiempo medido incluya
+    la sincronización del cache y el cálculo de ETags.
+    """
+    if app.config["INSTRUMENTATION"]:
+        db = app.extensions["sqlalchemy"]
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(start_request)
+        app.after_request(add_server_timing)
+        app.teardown_request(record_request)
+
+    if app.config["PROFILE_SAMPLE_RATE"] > 0:
+        os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+        app.before_request(start_profile)
+        app.teardown_request(dump_profile)
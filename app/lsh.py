@@ -0,0 +1,188 @@
+from threading import Lock
+
+import numpy as np
+from flask import current_app
+
+from . import db
+from .cache import on_invalidation
+from .matching import top_k_offers, top_k_offers_weighted
+from .models import JobOffer, JobSkillRequirement, UserSkill
+from .weights import offer_weights
+
+# Recuperación aproximada de ofertas para catálogos muy grandes:
+#
+# 1. Cada oferta se resume con una firma MinHash de su conjunto de skills
+#    requeridas (NUM_PERM mínimos de funciones hash universales).
+# 2. La firma se parte en BANDS bandas de NUM_PERM / BANDS filas; cada banda
+#    es una clave de bucket (LSH). Dos conjuntos con Jaccard J comparten al
+#    menos un bucket con probabilidad 1 - (1 - J^filas)^bandas.
+# 3. Para un usuario solo se rescorean (con la semántica exacta de siempre)
+#    las ofertas que caen en alguno de sus buckets.
+#
+# Más bandas (menos filas por banda) → más recall y más candidatos a rescorear.
+
+# Primo de Mersenne 2^31 - 1: a * skill_id + b entra holgado en int64
+_PRIME = (1 << 31) - 1
+
+# Cuántos requisitos se hashean por tanda al armar las firmas (acota la memoria)
+_CHUNK = 200_000
+
+
+class MinHasher:
+    """Firmas MinHash de conjuntos de enteros con `num_perm` hashes (a·x + b) mod p."""
+
+    def __init__(self, num_perm, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _PRIME, num_perm, dtype=np.int64)[:, None]
+        self.b = rng.integers(0, _PRIME, num_perm, dtype=np.int64)[:, None]
+
+    def signature(self, items):
+        items = np.asarray(items, dtype=np.int64)
+        return ((self.a * items + self.b) % _PRIME).min(axis=1)
+
+    def signatures(self, indptr, items):
+        """Firmas de muchos conjuntos en formato CSR (ninguno vacío): matriz conjuntos × num_perm."""
+        n_sets = indptr.size - 1
+        out = np.empty((n_sets, self.num_perm), dtype=np.int64)
+        start = 0
+        while start < n_sets:
+            # Tanda de conjuntos cuyo total de elementos ronda _CHUNK
+            end = int(np.searchsorted(indptr, indptr[start] + _CHUNK, side="right"))
+            end = min(max(end - 1, start + 1), n_sets)
+            lo, hi = indptr[start], indptr[end]
+            hashed = (self.a * items[lo:hi] + self.b) % _PRIME
+            out[start:end] = np.minimum.reduceat(hashed, indptr[start:end] - lo, axis=1).T
+            start = end
+        return out
+
+
+class LSHIndex:
+    """Buckets LSH de las ofertas activas con requisitos, por banda de su firma MinHash.
+
+    Se arma completo la primera vez que se usa (con NUM_PERM y BANDS de la
+    config) y después solo se rehashean las ofertas que cambian.
+    """
+
+    def __init__(self):
+        self._buckets = None
+        self._keys = {}
+        self._hasher = None
+        self._bands = None
+        self._lock = Lock()
+
+    def candidates(self, skill_ids):
+        """Ofertas que comparten al menos un bucket con el conjunto `skill_ids`."""
+        with self._lock:
+            if self._buckets is None:
+                self._build()
+            if not skill_ids:
+                return set()
+            found = set()
+            for key in self._band_keys(self._hasher.signature(sorted(skill_ids))):
+                found |= self._buckets.get(key, set())
+            return found
+
+    def refresh(self, offer_ids):
+        """Rehashea `offer_ids` (si el índice ya estaba armado)."""
+        with self._lock:
+            if offer_ids is None:
+                self._buckets = None
+            if self._buckets is None or not offer_ids:
+                return
+            for offer_id in offer_ids:
+                for key in self._keys.pop(offer_id, ()):
+                    bucket = self._buckets[key]
+                    bucket.discard(offer_id)
+                    if not bucket:
+                        del self._buckets[key]
+            self._add(*self._load(offer_ids))
+
+    def clear(self):
+        with self._lock:
+            self._buckets = None
+
+    def _band_keys(self, signature):
+        rows = signature.size // self._bands
+        return [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(self._bands)
+        ]
+
+    def _build(self):
+        config = current_app.config
+        num_perm, bands = config["LSH_NUM_PERM"], config["LSH_BANDS"]
+        if num_perm % bands:
+            raise ValueError("LSH_NUM_PERM debe ser múltiplo de LSH_BANDS")
+        self._hasher = MinHasher(num_perm)
+        self._bands = bands
+        self._buckets = {}
+        self._keys = {}
+        self._add(*self._load())
+
+    @staticmethod
+    def _load(offer_ids=None):
+        """Requisitos de las ofertas activas en CSR: (offer_ids, indptr, skill_ids)."""
+        query = (
+            db.session.query(JobSkillRequirement.job_offer_id, JobSkillRequirement.skill_id)
+            .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+            .filter(JobOffer.is_active.isnot(False))
+        )
+        if offer_ids is not None:
+            query = query.filter(JobSkillRequirement.job_offer_id.in_(list(offer_ids)))
+        pairs = np.array(query.all(), dtype=np.int64).reshape(-1, 2)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+        ids, starts = np.unique(pairs[:, 0], return_index=True)
+        indptr = np.append(starts, pairs.shape[0])
+        return ids, indptr, pairs[:, 1]
+
+    def _add(self, offer_ids, indptr, skill_ids):
+        if not offer_ids.size:
+            return
+        for offer_id, signature in zip(offer_ids.tolist(), self._hasher.signatures(indptr, skill_ids)):
+            keys = self._band_keys(signature)
+            self._keys[offer_id] = keys
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(offer_id)
+
+
+lsh_index = LSHIndex()
+
+
+def top_offers(user_id, k, weighted=False):
+    """Top K ofertas entre los candidatos LSH, puntuadas con la semántica exacta.
+
+    Mismo formato que MatchEngine.top_offers: (offer_id, compat, score, total).
+    Puede devolver menos de K si pocas ofertas se parecen al usuario.
+    """
+    user_levels = dict(
+        db.session.query(UserSkill.skill_id, UserSkill.level).filter(UserSkill.user_id == user_id)
+    )
+    profiles = offer_weights.profiles()
+    candidates = [
+        (offer_id, profiles[offer_id])
+        for offer_id in lsh_index.candidates(user_levels)
+        if offer_id in profiles
+    ]
+    if weighted:
+        return top_k_offers_weighted(user_levels, candidates, k)
+    return top_k_offers(
+        user_levels,
+        (
+            (offer_id, skill_id, level)
+            for offer_id, profile in candidates
+            for skill_id, level in zip(profile.skill_ids, profile.levels)
+        ),
+        k,
+    )
+
+
+@on_invalidation("requirements_changed")
+def _on_requirements_changed(offer_ids=None, skill_ids=None):
+    lsh_index.refresh(offer_ids)
+
+
+@on_invalidation("job_offers_changed")
+def _on_job_offers_changed(offer_ids=None):
+    lsh_index.refresh(offer_ids)
@@ -0,0 +1,115 @@
+import heapq
+
+# Niveles de texto que acepta la API y su código numérico (lo que se guarda)
+LEVEL_ORDER = {
+    "beginner": 1,
+    "junior": 1,
+    "intermediate": 2,
+    "mid": 2,
+    "advanced": 3,
+    "senior": 3,
+}
+
+# Nombre canónico de cada nivel numérico (lo que emite la API)
+LEVEL_NAMES = {
+    1: "beginner",
+    2: "intermediate",
+    3: "advanced",
+}
+
+# Cuántas ofertas devuelve como máximo un ranking
+MAX_TOP_K = 100
+
+# Importancia de un requisito cuando no viene definida (escala 1–5)
+DEFAULT_IMPORTANCE = 3
+
+# Escala del crédito ponderado: múltiplo común de todos los niveles, así
+# el crédito parcial (importancia * nivel_usuario / nivel_requerido) es
+# siempre un entero y todos los motores rankean exactamente igual
+LEVEL_SCALE = 6
+
+
+def parse_level(level):
+    """Convierte un nivel de texto de la API a su código numérico (None si no se reconoce)."""
+    if not isinstance(level, str):
+        return None
+    return LEVEL_ORDER.get(level.strip().lower())
+
+
+def level_name(level_num: int) -> str:
+    """Nombre canónico de un nivel numérico ("unknown" si no se reconoce)."""
+    return LEVEL_NAMES.get(int(level_num), "unknown")
+
+
+def weighted_credit(user_level: int, required: int, importance: int) -> int:
+    """Crédito de un requisito en unidades de LEVEL_SCALE.
+
+    Completo (importancia) si el usuario cumple el nivel, proporcional a
+    nivel_usuario / nivel_requerido si le falta nivel y 0 si no tiene la skill
+    (`user_level` negativo).
+    """
+    if user_level < 0:
+        return 0
+    if user_level >= required:
+        return importance * LEVEL_SCALE
+    return importance * LEVEL_SCALE * user_level // required
+
+
+def weighted_compatibility(credit: int, total_weight: int) -> int:
+    """Porcentaje ponderado; `total_weight` ya viene en unidades de LEVEL_SCALE."""
+    return credit * 100 // total_weight if total_weight else 0
+
+
+def score_offers(user_levels: dict, requirements):
+    """Puntúa un usuario contra todas las ofertas de `requirements` en una pasada.
+
+    `user_levels` es {skill_id: nivel numérico} del usuario y `requirements`
+    un iterable de (job_offer_id, skill_id, nivel requerido numérico).
+    Devuelve tuplas (job_offer_id, compatibility, matched, total).
+    """
+    matched_by_offer = {}
+    total_by_offer = {}
+
+    for offer_id, skill_id, required in requirements:
+        total_by_offer[offer_id] = total_by_offer.get(offer_id, 0) + 1
+        # Si el usuario no tiene la skill nunca cuenta como cumplida
+        if user_levels.get(skill_id, -1) >= required:
+            matched_by_offer[offer_id] = matched_by_offer.get(offer_id, 0) + 1
+
+    for offer_id, total in total_by_offer.items():
+        matched = matched_by_offer.get(offer_id, 0)
+        yield offer_id, int((matched / total) * 100), matched, total
+
+
+def top_k_offers(user_levels: dict, requirements, k: int):
+    """Rankea ofertas para un usuario en una sola pasada (ver `score_offers`).
+
+    Devuelve hasta `k` tuplas (job_offer_id, compatibility, matched, total)
+    ordenadas de mayor a menor compatibilidad.
+    """
+    # Heap de tamaño k: empates se resuelven por más requisitos cumplidos
+    # y luego por id de oferta más antiguo
+    return heapq.nlargest(
+        k, score_offers(user_levels, requirements), key=lambda r: (r[1], r[2], -r[0])
+    )
+
+
+def top_k_offers_weighted(user_levels: dict, profiles, k: int):
+    """Versión ponderada de `top_k_offers` sobre perfiles precalculados.
+
+    `profiles` es un iterable de (job_offer_id, OfferProfile). Devuelve hasta
+    `k` tuplas (job_offer_id, compatibility, credit, total_weight).
+    """
+    def scored():
+        for offer_id, profile in profiles:
+            credit = 0
+            for skill_id, required, weight in zip(profile.skill_ids, profile.levels, profile.weights):
+                credit += weighted_credit(user_levels.get(skill_id, -1), required, weight)
+            yield (
+                offer_id,
+                weighted_compatibility(credit, profile.total_weight),
+                credit,
+                profile.total_weight,
+            )
+
+    return heapq.nlargest(k, scored(), key=lambda r: (r[1], r[2], -r[0]))
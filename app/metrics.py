@@ -0,0 +1,277 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Límites (ms) del histograma de espera por una conexión del pool
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Límites de los histogramas por ruta: duración (segundos) y sentencias SQL
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Histograma acumulado como en Prometheus (el lock lo pone quien lo usa).
+
+    `cumulative()` devuelve pares [límite, cantidad] con las observaciones
+    hasta ese límite; "+Inf" es el total.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        pairs, running = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            running += count
+            pairs.append([bound, running])
+        return pairs
+
+
+class PoolMetrics:
+    """Contadores de un pool: checkouts, histograma de espera y timeouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.wait_ms_max = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms):
+        with self._lock:
+            self.wait_ms.observe(wait_ms)
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def timed_out(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            checkouts = self.wait_ms.count
+            return {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_sum": round(self.wait_ms.sum, 3),
+                "wait_ms_avg": round(self.wait_ms.sum / checkouts, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "wait_ms_histogram": self.wait_ms.cumulative(),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto tarda cada checkout (espera + conexión + pre-ping)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timed_out()
+            raise
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        # dispose() / invalidaciones recrean el pool: los contadores siguen
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def usage(self):
+        """Ocupación actual: conexiones en uso sobre el máximo (size + overflow)."""
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": checked_out,
+            "overflow": max(self.overflow(), 0),
+            "utilization": round(checked_out / capacity, 3) if capacity > 0 else None,
+        }
+
+
+class StatementTimeouts:
+    """Sentencias cortadas por timeout, por endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, endpoint):
+        with self._lock:
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+statement_timeouts = StatementTimeouts()
+
+
+class RequestMetrics:
+    """Por (endpoint, método): latencia, sentencias SQL, tiempo en la base y status."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, endpoint, method, status, seconds, sql_statements, sql_seconds):
+        with self._lock:
+            route = self._routes.get((endpoint, method))
+            if route is None:
+                route = self._routes[(endpoint, method)] = {
+                    "latency": Histogram(LATENCY_BUCKETS_S),
+                    "sql": Histogram(SQL_STATEMENT_BUCKETS),
+                    "db_seconds": 0.0,
+                    "responses": {},
+                }
+            route["latency"].observe(seconds)
+            route["sql"].observe(sql_statements)
+            route["db_seconds"] += sql_seconds
+            route["responses"][status] = route["responses"].get(status, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "method": method,
+                    "requests": route["latency"].count,
+                    "latency_seconds_sum": round(route["latency"].sum, 6),
+                    "latency_seconds_histogram": route["latency"].cumulative(),
+                    "sql_statements_sum": int(route["sql"].sum),
+                    "sql_statements_histogram": route["sql"].cumulative(),
+                    "db_seconds_sum": round(route["db_seconds"], 6),
+                    "responses": {str(status): n for status, n in sorted(route["responses"].items())},
+                }
+                for (endpoint, method), route in sorted(self._routes.items(), key=lambda item: str(item[0]))
+            ]
+
+
+request_metrics = RequestMetrics()
+
+
+def pool_snapshot(engines):
+    """Estado de los pools de `engines` (bind key → engine) para /api/metrics."""
+    pools = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        name = key or "primary"
+        if isinstance(pool, InstrumentedQueuePool):
+            pools[name] = {**pool.usage(), **pool.metrics.snapshot()}
+        else:
+            # SQLite en memoria (StaticPool) u otro pool sin instrumentar
+            pools[name] = {"pool": type(pool).__name__, "status": pool.status()}
+    return pools
+
+
+# =========================
+# Formato de texto de Prometheus
+# =========================
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name, pairs, total, count, divisor=1, **labels):
+    lines = [
+        f"{name}_bucket{_labels(**labels, le=bound if divisor == 1 or bound == '+Inf' else bound / divisor)} {n}"
+        for bound, n in pairs
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {total if divisor == 1 else total / divisor}")
+    lines.append(f"{name}_count{_labels(**labels)} {count}")
+    return lines
+
+
+def render_prometheus(engines):
+    """Métricas del proceso en el formato de exposición de texto de Prometheus."""
+    lines = [
+        "# HELP skillmatch_http_request_duration_seconds Duración de los requests por ruta.",
+        "# TYPE skillmatch_http_request_duration_seconds histogram",
+    ]
+    routes = request_metrics.snapshot()
+    for route in routes:
+        lines += _histogram_lines(
+            "skillmatch_http_request_duration_seconds", route["latency_seconds_histogram"],
+            route["latency_seconds_sum"], route["requests"],
+            endpoint=route["endpoint"], method=route["method"],
+        )
+    lines += [
+        "# HELP skillmatch_http_request_sql_statements Sentencias SQL por request.",
+        "# TYPE skillmatch_http_request_sql_statements histogram",
+    ]
+    for route in routes:
+        lines += _histogram_lines(
+            "skillmatch_http_request_sql_statements", route["sql_statements_histogram"],
+            route["sql_statements_sum"], route["requests"],
+            endpoint=route["endpoint"], method=route["method"],
+        )
+    lines += [
+        "# HELP skillmatch_http_request_db_seconds_total Tiempo en la base por ruta.",
+        "# TYPE skillmatch_http_request_db_seconds_total counter",
+    ]
+    for route in routes:
+        labels = _labels(endpoint=route["endpoint"], method=route["method"])
+        lines.append(f"skillmatch_http_request_db_seconds_total{labels} {route['db_seconds_sum']}")
+    lines += [
+        "# HELP skillmatch_http_responses_total Respuestas por ruta y status.",
+        "# TYPE skillmatch_http_responses_total counter",
+    ]
+    for route in routes:
+        for status, n in route["responses"].items():
+            labels = _labels(endpoint=route["endpoint"], method=route["method"], status=status)
+            lines.append(f"skillmatch_http_responses_total{labels} {n}")
+
+    pools = {
+        name: pool for name, pool in pool_snapshot(engines).items() if "checkouts" in pool
+    }
+    lines += [
+        "# HELP skillmatch_db_pool_checkout_wait_seconds Espera por una conexión del pool.",
+        "# TYPE skillmatch_db_pool_checkout_wait_seconds histogram",
+    ]
+    for name, pool in pools.items():
+        lines += _histogram_lines(
+            "skillmatch_db_pool_checkout_wait_seconds", pool["wait_ms_histogram"],
+            pool["wait_ms_sum"], pool["checkouts"], divisor=1000, pool=name,
+        )
+    for metric, kind, field, help_text in (
+        ("skillmatch_db_pool_timeouts_total", "counter", "timeouts", "Checkouts que agotaron pool_timeout."),
+        ("skillmatch_db_pool_size", "gauge", "size", "Conexiones persistentes del pool."),
+        ("skillmatch_db_pool_checked_out", "gauge", "checked_out", "Conexiones en uso."),
+        ("skillmatch_db_pool_overflow", "gauge", "overflow", "Conexiones por encima de pool_size."),
+        ("skillmatch_db_pool_utilization", "gauge", "utilization", "En uso sobre size + max_overflow."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, pool in pools.items():
+            if pool[field] is not None:
+                lines.append(f"{metric}{_labels(pool=name)} {pool[field]}")
+
+    lines += [
+        "# HELP skillmatch_db_statement_timeouts_total Sentencias cortadas por timeout.",
+        "# TYPE skillmatch_db_statement_timeouts_total counter",
+    ]
+    for endpoint, n in sorted(statement_timeouts.snapshot().items()):
+        lines.append(f"skillmatch_db_statement_timeouts_total{_labels(endpoint=endpoint)} {n}")
+    return "\n".join(lines) + "\n"
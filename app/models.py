@@ -22,6 +22,7 @@ class User(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relación con las skills del usuario
     skills = db.relationship(
@@ -42,6 +43,7 @@ class Skill(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Usuarios que tienen esta skill
     users = db.relationship(
@@ -78,8 +80,9 @@ class UserSkill(db.Model):
         db.ForeignKey("skills.id"),
         nullable=False,
     )
-    # Ej: "beginner", "intermediate", "advanced"
-    level = db.Column(db.String(20), nullable=False)
+    # 1=beginner, 2=intermediate, 3=advanced (ver matching.LEVEL_NAMES)
+    level = db.Column(db.SmallInteger, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = db.relationship("User", back_populates="skills")
     skill = db.relationship("Skill", back_populates="users")
@@ -101,6 +104,7 @@ class JobOffer(db.Model):
     location = db.Column(db.String(100))  # "Remote", "Santiago", etc.
     seniority = db.Column(db.String(50))  # "junior", "mid", "senior"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
     # Skills requeridas por esta oferta
@@ -131,10 +135,11 @@ class JobSkillRequirement(db.Model):
         db.ForeignKey("skills.id"),
         nullable=False,
     )
-    # Ej: "beginner", "intermediate", "advanced"
-    level_required = db.Column(db.String(20), nullable=False)
+    # 1=beginner, 2=intermediate, 3=advanced (ver matching.LEVEL_NAMES)
+    level_required = db.Column(db.SmallInteger, nullable=False)
     # 1–5 qué tan importante es esta skill
     importance = db.Column(db.Integer, default=3)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     job_offer = db.relationship("JobOffer", back_populates="skill_requirements")
     skill = db.relationship("Skill", back_populates="job_requirements")
@@ -144,3 +149,137 @@ class JobSkillRequirement(db.Model):
             f"<JobSkillRequirement job={self.job_offer_id} "
             f"skill={self.skill_id} level={self.level_required} importance={self.importance}>"
         )
+
+
+#
+# 📊 Compatibilidad precalculada usuario-oferta
+#
+class MatchScore(db.Model):
+    __tablename__ = "match_scores"
+
+    # Solo se guardan pares con al menos un requisito cumplido:
+    # si no hay fila, la compatibilidad es 0
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    job_offer_id = db.Column(
+        db.Integer,
+        db.ForeignKey("job_offers.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    compatibility = db.Column(db.SmallInteger, nullable=False)
+    matched_count = db.Column(db.Integer, nullable=False)
+    total_reqs = db.Column(db.Integer, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return (
+            f"<MatchScore user={self.user_id} job={self.job_offer_id} "
+            f"compatibility={self.compatibility}>"
+        )
+
+
+#
+# ⭐ Recomendaciones precalculadas (top N ofertas por usuario)
+#
+class UserRecommendation(db.Model):
+    __tablename__ = "user_recommendations"
+
+    # La PK (user_id, rank) deja las N filas de un usuario juntas y ordenadas:
+    # leerlas es un solo recorrido del índice primario
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    # Sin FK: si se borra la oferta el worker tiene que poder encontrar a
+    # quiénes se la recomendaba para recalcularlos
+    job_offer_id = db.Column(db.Integer, nullable=False)
+    compatibility = db.Column(db.SmallInteger, nullable=False)
+    matched_count = db.Column(db.Integer, nullable=False)
+    total_reqs = db.Column(db.Integer, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserRecommendation user={self.user_id} rank={self.rank} "
+            f"job={self.job_offer_id}>"
+        )
+
+
+#
+# 📬 Cola de recomendaciones pendientes de recalcular
+#
+class RecommendationTask(db.Model):
+    __tablename__ = "recommendation_queue"
+
+    # Una fila por entidad sucia: encolar dos veces lo mismo no duplica trabajo
+    kind = db.Column(db.String(10), primary_key=True)  # "user" o "offer"
+    entity_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    enqueued_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<RecommendationTask {self.kind}={self.entity_id}>"
+
+
+# Índices para servir los rankings (por usuario y por oferta) con una sola lectura
+db.Index(
+    "ix_match_scores_user_rank",
+    MatchScore.user_id,
+    MatchScore.compatibility.desc(),
+    MatchScore.matched_count.desc(),
+    MatchScore.job_offer_id,
+)
+db.Index(
+    "ix_match_scores_offer_rank",
+    MatchScore.job_offer_id,
+    MatchScore.compatibility.desc(),
+    MatchScore.matched_count.desc(),
+    MatchScore.user_id,
+)
+
+
+# Índices del matching: las skills de un usuario y los requisitos de una oferta
+# se leen solo desde el índice (INCLUDE en Postgres), y los únicos evitan
+# filas duplicadas que inflarían los conteos de compatibilidad
+db.Index(
+    "uq_user_skills_user_skill",
+    UserSkill.user_id,
+    UserSkill.skill_id,
+    unique=True,
+    postgresql_include=["level"],
+)
+db.Index(
+    "ix_user_skills_skill_user",
+    UserSkill.skill_id,
+    UserSkill.user_id,
+)
+db.Index(
+    "uq_job_skill_requirements_offer_skill",
+    JobSkillRequirement.job_offer_id,
+    JobSkillRequirement.skill_id,
+    unique=True,
+    postgresql_include=["level_required", "importance"],
+)
+# Parcial: los motores solo cargan ofertas activas. El predicado es el mismo
+# que usan sus consultas (`is_active IS NOT false`, un NULL cuenta como
+# activa); con otro el planner no puede usar el índice
+db.Index(
+    "ix_job_offers_active",
+    JobOffer.id,
+    postgresql_where=JobOffer.is_active.isnot(False),
+    sqlite_where=JobOffer.is_active.isnot(False),
+)
+# Quiénes tienen recomendada una oferta (para recalcularlos si cambia) y
+# orden de llegada de la cola
+db.Index(
+    "ix_user_recommendations_offer",
+    UserRecommendation.job_offer_id,
+)
+db.Index(
+    "ix_recommendation_queue_enqueued_at",
+    RecommendationTask.enqueued_at,
+)
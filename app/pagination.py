@@ -0,0 +1,142 @@
+from datetime import datetime
+
+import json
+
+from flask import Response, jsonify, request, stream_with_context, url_for
+
+from . import db
+from .database import restart_statement_deadline
+
+# Paginación por cursor (keyset): ?after_id=&limit=
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+# Modo export: filas que trae el cursor del servidor por cada vuelta
+STREAM_BATCH_SIZE = 1000
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def parse_bool(value):
+    """Convierte "true"/"false"/"1"/"0" de un query param a bool (None si no se reconoce)."""
+    return {"true": True, "1": True, "false": False, "0": False}.get(value.lower())
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+# Parsers de filtros por tipo
+FILTER_PARSERS = {
+    int: parse_int,
+    bool: parse_bool,
+    str: lambda value: value,
+}
+
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def wants_stream():
+    """El cliente pide el export completo (?stream=1 o Accept: application/x-ndjson)."""
+    if parse_bool(request.args.get("stream", "false")):
+        return True
+    # JSON primero: con Accept: */* (o sin Accept) se sigue respondiendo JSON
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_rows(query, to_dict):
+    """Devuelve la consulta como NDJSON, una fila por línea y sin armar la lista.
+
+    `yield_per` activa el cursor del lado del servidor (stream_results), así
+    la memoria queda acotada a un lote sin importar el tamaño de la tabla.
+    El timeout del endpoint corre por lectura del cursor, no por el body.
+    """
+    def generate():
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            yield json.dumps(to_dict(row)) + "\n"
+            restart_statement_deadline()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def parse_page_args(columns):
+    """Lee ?after_id=&limit=&fields=; devuelve ((after_id, limit, fields), error)."""
+    after_id = request.args.get("after_id", default=0, type=int)
+    limit = request.args.get("limit", default=DEFAULT_PAGE_LIMIT, type=int)
+    if after_id is None or after_id < 0:
+        return None, (jsonify({"error": "after_id debe ser un entero >= 0"}), 400)
+    if limit is None or not 1 <= limit <= MAX_PAGE_LIMIT:
+        return None, (jsonify({"error": f"limit debe estar entre 1 y {MAX_PAGE_LIMIT}"}), 400)
+
+    fields = None
+    if request.args.get("fields"):
+        fields = [f.strip() for f in request.args["fields"].split(",") if f.strip()]
+        unknown = [f for f in fields if f not in columns]
+        if unknown:
+            return None, (jsonify({"error": f"fields desconocidos: {', '.join(unknown)}"}), 400)
+        # El id siempre viaja: es el cursor de la página siguiente
+        if "id" not in fields:
+            fields.insert(0, "id")
+    return (after_id, limit, fields), None
+
+
+def page_response(items, has_more):
+    """Arreglo JSON de la página + headers con el cursor de la siguiente."""
+    response = jsonify(items)
+    if has_more:
+        next_after_id = items[-1]["id"]
+        args = {**request.args.to_dict(), "after_id": next_after_id}
+        response.headers["X-Next-After-Id"] = str(next_after_id)
+        response.headers["Link"] = f'<{url_for(request.endpoint, **request.view_args, **args)}>; rel="next"'
+    return response
+
+
+def paginated_list(model, columns, serializer, filters):
+    """Responde un listado ordenado por id, una página acotada a la vez.
+
+    - `columns`: {nombre público: columna} con los campos que acepta ?fields=
+    - `serializer`: helper *_to_dict para la respuesta completa
+    - `filters`: {query param: (columna, tipo)} para filtrar en SQL
+
+    El cuerpo sigue siendo un arreglo JSON; si hay más filas, el cursor de
+    la página siguiente va en `X-Next-After-Id` y en el header `Link`.
+    En modo export (ver `wants_stream`) se ignora `limit` y se transmite
+    toda la tabla como NDJSON.
+    """
+    page, error = parse_page_args(columns)
+    if error:
+        return error
+    after_id, limit, fields = page
+
+    if fields:
+        query = db.session.query(*[columns[f] for f in fields])
+    else:
+        query = model.query
+
+    for param, (column, kind) in filters.items():
+        raw = request.args.get(param)
+        if raw is None:
+            continue
+        value = FILTER_PARSERS[kind](raw)
+        if value is None:
+            return jsonify({"error": f"{param} tiene un valor inválido"}), 400
+        query = query.filter(column == value)
+
+    def to_dict(row):
+        if fields:
+            return {f: _serialize(value) for f, value in zip(fields, row)}
+        return serializer(row)
+
+    query = query.filter(model.id > after_id).order_by(model.id)
+    if wants_stream():
+        return stream_rows(query, to_dict)
+
+    # Una fila de más para saber si existe una página siguiente
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    return page_response([to_dict(row) for row in rows[:limit]], has_more)
@@ -0,0 +1,181 @@
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from . import db
+from .engine import get_engine, invalidate_engine
+from .models import RecommendationTask, UserRecommendation
+from .signals import job_offers_changed, requirements_changed, user_skills_changed
+
+# Recomendaciones precalculadas: top N ofertas por usuario en la tabla
+# `user_recommendations`, mantenida por un worker en segundo plano.
+#
+# - Las rutas de escritura no calculan nada: solo marcan usuarios u ofertas
+#   como sucios en `recommendation_queue` (vía señales).
+# - La cola tiene una fila por entidad, así que una ráfaga de cambios sobre
+#   el mismo usuario deja una sola tarea pendiente.
+# - El worker toma tandas de la cola, reconstruye el motor NumPy una vez por
+#   tanda y recalcula a cada usuario afectado una sola vez.
+
+
+def _insert_ignoring_duplicates(model):
+    """INSERT que no falla si la fila ya existe (la PK hace de deduplicación)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(model).on_conflict_do_nothing()
+
+
+def enqueue(kind, entity_ids):
+    """Marca usuarios ("user") u ofertas ("offer") para recalcular."""
+    entity_ids = set(entity_ids or [])
+    if not entity_ids:
+        return
+    now = datetime.utcnow()
+    statement = _insert_ignoring_duplicates(RecommendationTask)
+    if statement is None:
+        # Otros motores: solo se insertan las que no estaban pendientes
+        pending = {
+            entity_id for entity_id, in db.session.query(RecommendationTask.entity_id)
+            .filter(RecommendationTask.kind == kind)
+            .filter(RecommendationTask.entity_id.in_(list(entity_ids)))
+        }
+        entity_ids -= pending
+        if not entity_ids:
+            return
+        statement = insert(RecommendationTask)
+    db.session.execute(
+        statement,
+        [{"kind": kind, "entity_id": entity_id, "enqueued_at": now} for entity_id in entity_ids],
+    )
+    db.session.commit()
+
+
+def claim_batch(limit):
+    """Saca de la cola hasta `limit` tareas, las más viejas primero: (user_ids, offer_ids).
+
+    Las filas se borran antes de recalcular: un cambio que llegue mientras
+    tanto vuelve a encolar su entidad y se procesa en la tanda siguiente.
+    """
+    rows = db.session.execute(
+        select(RecommendationTask.kind, RecommendationTask.entity_id)
+        .order_by(RecommendationTask.enqueued_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    claimed = {"user": set(), "offer": set()}
+    for kind, entity_id in rows:
+        claimed.setdefault(kind, set()).add(entity_id)
+    for kind, entity_ids in claimed.items():
+        if entity_ids:
+            db.session.execute(
+                delete(RecommendationTask)
+                .where(RecommendationTask.kind == kind)
+                .where(RecommendationTask.entity_id.in_(list(entity_ids)))
+            )
+    db.session.commit()
+    return claimed["user"], claimed["offer"]
+
+
+def affected_users(engine, offer_ids):
+    """Usuarios cuyo top N puede cambiar si cambian `offer_ids`.
+
+    Los que cumplen algún requisito de la oferta (puede entrar a su top) y
+    los que ya la tenían recomendada (puede salir o cambiar de puesto).
+    """
+    user_ids = set()
+    for offer_id in offer_ids:
+        scores, _ = engine.score_offer(offer_id)
+        user_ids.update(engine.user_ids[scores > 0].tolist())
+    if offer_ids:
+        user_ids.update(
+            user_id for user_id, in db.session.query(UserRecommendation.user_id)
+            .filter(UserRecommendation.job_offer_id.in_(list(offer_ids)))
+            .distinct()
+        )
+    return user_ids
+
+
+def refresh_recommendations(engine, user_ids, top_n, chunk_size=500):
+    """Reemplaza las filas de `user_ids` con su top N actual. Devuelve cuántos recalculó."""
+    user_ids = sorted(user_ids)
+    now = datetime.utcnow()
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        rows = []
+        for user_id in chunk:
+            # Solo ofertas con al menos un requisito cumplido
+            ranking = [row for row in engine.top_offers(user_id, top_n) if row[2] > 0]
+            rows.extend(
+                {
+                    "user_id": user_id,
+                    "rank": rank,
+                    "job_offer_id": offer_id,
+                    "compatibility": compatibility,
+                    "matched_count": matched,
+                    "total_reqs": total,
+                    "computed_at": now,
+                }
+                for rank, (offer_id, compatibility, matched, total) in enumerate(ranking, start=1)
+            )
+        db.session.execute(delete(UserRecommendation).where(UserRecommendation.user_id.in_(chunk)))
+        if rows:
+            db.session.execute(insert(UserRecommendation), rows)
+        db.session.commit()
+    return len(user_ids)
+
+
+def process_batch(batch_size, top_n):
+    """Procesa una tanda de la cola. Devuelve (tareas tomadas, usuarios recalculados)."""
+    user_ids, offer_ids = claim_batch(batch_size)
+    if not user_ids and not offer_ids:
+        return 0, 0
+    # El motor del proceso puede no haber visto las escrituras de los workers web
+    invalidate_engine()
+    engine = get_engine()
+    users = set(user_ids) | affected_users(engine, offer_ids)
+    return len(user_ids) + len(offer_ids), refresh_recommendations(engine, users, top_n)
+
+
+def run_worker(interval=None, batch_size=None, once=False, log=print):
+    """Loop del worker: vacía la cola por tandas y espera `interval` segundos entre vueltas.
+
+    Con `once` procesa lo pendiente y termina (útil para cron).
+    """
+    config = current_app.config
+    interval = config["RECOMMENDATIONS_POLL_INTERVAL"] if interval is None else interval
+    batch_size = batch_size or config["RECOMMENDATIONS_BATCH_SIZE"]
+    top_n = config["RECOMMENDATIONS_TOP_N"]
+
+    while True:
+        while True:
+            started = time.perf_counter()
+            tasks, users = process_batch(batch_size, top_n)
+            if not tasks:
+                break
+            log(f"{tasks} tareas → {users} usuarios recalculados en {time.perf_counter() - started:.2f}s")
+        if once:
+            return
+        # La espera también agrupa ráfagas de cambios en una sola tanda
+        time.sleep(interval)
+
+
+@user_skills_changed.connect
+def _on_user_skills_changed(sender, user_ids=None, skill_ids=None, **extra):
+    enqueue("user", user_ids)
+
+
+@requirements_changed.connect
+def _on_requirements_changed(sender, offer_ids=None, skill_ids=None, **extra):
+    enqueue("offer", offer_ids)
+
+
+@job_offers_changed.connect
+def _on_job_offers_changed(sender, offer_ids=None, **extra):
+    enqueue("offer", offer_ids)
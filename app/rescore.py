@@ -0,0 +1,301 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.pool import NullPool
+
+from . import db
+from .engine import MatchEngine, _gather
+from .models import JobOffer, JobSkillRequirement, MatchScore, User, UserSkill
+
+# Recalculo masivo de `match_scores` (flask skillmatch rescore).
+#
+# - Los usuarios se parten en shards de ids consecutivos; cada shard es una
+#   tarea de un ProcessPoolExecutor.
+# - La matriz de requisitos de las ofertas activas se arma una sola vez, por
+#   skill (skill → ofertas que la piden y con qué nivel), y se guarda en .npy:
+#   cada worker la abre con mmap, así todos comparten las mismas páginas en
+#   solo lectura.
+# - Un worker lee las skills de su shard, cruza cada (usuario, skill) con las
+#   ofertas que piden esa skill y cuenta requisitos cumplidos: solo toca los
+#   pares con algo en común, que son los únicos que se guardan.
+# - Escribe con upserts por tandas y al final borra las filas del shard que
+#   no se tocaron en esta corrida (`computed_at` anterior al inicio), todo en
+#   una transacción por shard.
+# - Un checkpoint JSON guarda los shards terminados: si se corta, la próxima
+#   corrida sigue desde ahí con el mismo `computed_at`.
+
+# Entradas (usuario, requisito) que se cruzan de una vez dentro de un shard
+BLOCK_ENTRIES = 4_000_000
+
+MATRIX_ARRAYS = ("skill_ids", "indptr", "offer_rows", "levels", "offer_ids", "totals")
+
+
+def build_offer_matrix(directory):
+    """Guarda en `directory` la matriz de requisitos por skill de las ofertas activas."""
+    reqs = np.array(
+        db.session.query(
+            JobSkillRequirement.job_offer_id,
+            JobSkillRequirement.skill_id,
+            JobSkillRequirement.level_required,
+        )
+        .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+        .filter(JobOffer.is_active.isnot(False))
+        .all(),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+
+    offer_ids, offer_rows, totals = np.unique(reqs[:, 0], return_inverse=True, return_counts=True)
+    skill_ids, skill_cols = np.unique(reqs[:, 1], return_inverse=True)
+    order = np.lexsort((offer_rows, skill_cols))
+    indptr = np.zeros(skill_ids.size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(skill_cols, minlength=skill_ids.size), out=indptr[1:])
+
+    arrays = {
+        "skill_ids": skill_ids,
+        "indptr": indptr,
+        "offer_rows": offer_rows[order].astype(np.int32),
+        "levels": reqs[order, 2].astype(np.int8),
+        "offer_ids": offer_ids,
+        "totals": totals.astype(np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    return {"offers": int(offer_ids.size), "requirements": int(reqs.shape[0])}
+
+
+def plan_shards(shard_size):
+    """[(primer_id, último_id, usuarios)] con `shard_size` usuarios por shard."""
+    user_ids = [user_id for user_id, in db.session.query(User.id).order_by(User.id)]
+    return [
+        (chunk[0], chunk[-1], len(chunk))
+        for chunk in (
+            user_ids[start:start + shard_size] for start in range(0, len(user_ids), shard_size)
+        )
+    ]
+
+
+# =========================
+# Checkpoint
+# =========================
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    # Escritura atómica: un corte a mitad no deja un JSON roto
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+# =========================
+# Worker (un proceso por núcleo)
+# =========================
+
+_worker = {}
+
+
+def _init_worker(database_url, matrix_dir, batch_size):
+    connect_args = {"timeout": 60} if database_url.startswith("sqlite") else {}
+    _worker["engine"] = create_engine(database_url, poolclass=NullPool, connect_args=connect_args)
+    _worker["matrix"] = {
+        name: np.load(os.path.join(matrix_dir, f"{name}.npy"), mmap_mode="r")
+        for name in MATRIX_ARRAYS
+    }
+    _worker["batch_size"] = batch_size
+
+
+def _upsert_statement(dialect):
+    """INSERT … ON CONFLICT DO UPDATE sobre la PK (user_id, job_offer_id)."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(MatchScore)
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "job_offer_id"],
+        set_={
+            column: statement.excluded[column]
+            for column in ("compatibility", "matched_count", "total_reqs", "computed_at")
+        },
+    )
+
+
+def score_shard(matrix, user_skills):
+    """Pares con al menos un requisito cumplido: (user_ids, offer_ids, matched, totals, compat).
+
+    `user_skills` es un array (usuario, skill, nivel) ordenado por usuario.
+    """
+    skill_ids, indptr = matrix["skill_ids"], matrix["indptr"]
+    # Skills que ninguna oferta activa pide no suman
+    cols = np.searchsorted(skill_ids, user_skills[:, 1])
+    known = cols < skill_ids.size
+    known[known] = skill_ids[cols[known]] == user_skills[known, 1]
+    user_skills, cols = user_skills[known], cols[known]
+
+    results = []
+    n_offers = matrix["offer_ids"].size
+    lengths = indptr[cols + 1] - indptr[cols]
+    # Bloques de usuarios completos con a lo sumo BLOCK_ENTRIES cruces cada uno
+    user_starts = np.flatnonzero(np.r_[True, user_skills[1:, 0] != user_skills[:-1, 0]])
+    bounds = np.r_[user_starts, user_skills.shape[0]]
+    cumulative = np.r_[0, np.cumsum(lengths)]
+    user_ends = cumulative[bounds[1:]]
+    block_start = 0
+    while block_start < user_starts.size:
+        limit = cumulative[bounds[block_start]] + BLOCK_ENTRIES
+        block_end = max(block_start + 1, int(np.searchsorted(user_ends, limit, side="right")))
+        rows = slice(bounds[block_start], bounds[block_end])
+        block_start = block_end
+
+        entries, block_lengths = _gather(indptr, cols[rows])
+        users = np.repeat(user_skills[rows, 0], block_lengths)
+        met = np.repeat(user_skills[rows, 2], block_lengths) >= matrix["levels"][entries]
+        keys = users[met] * n_offers + matrix["offer_rows"][entries][met]
+        keys, matched = np.unique(keys, return_counts=True)
+        offer_rows = keys % n_offers
+        totals = matrix["totals"][offer_rows]
+        results.append((
+            keys // n_offers,
+            matrix["offer_ids"][offer_rows],
+            matched,
+            totals,
+            MatchEngine.compatibility(matched, totals),
+        ))
+    if not results:
+        return (np.empty(0, dtype=np.int64),) * 5
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def _rescore_shard(index, first_id, last_id, computed_at):
+    """Recalcula un shard y lo escribe en una transacción. Devuelve (índice, filas)."""
+    engine, matrix, batch_size = _worker["engine"], _worker["matrix"], _worker["batch_size"]
+    in_shard = MatchScore.user_id.between(first_id, last_id)
+    with engine.begin() as connection:
+        user_skills = np.array(
+            connection.execute(
+                select(UserSkill.user_id, UserSkill.skill_id, UserSkill.level)
+                .where(UserSkill.user_id.between(first_id, last_id))
+                .order_by(UserSkill.user_id)
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        user_ids, offer_ids, matched, totals, compat = score_shard(matrix, user_skills)
+
+        statement = _upsert_statement(engine.dialect.name)
+        if statement is None:
+            # Otros motores: se reemplaza el shard entero
+            connection.execute(delete(MatchScore).where(in_shard))
+            statement = insert(MatchScore)
+        for start in range(0, user_ids.size, batch_size):
+            end = start + batch_size
+            connection.execute(statement, [
+                {
+                    "user_id": user_id,
+                    "job_offer_id": offer_id,
+                    "compatibility": compatibility,
+                    "matched_count": matched_count,
+                    "total_reqs": total,
+                    "computed_at": computed_at,
+                }
+                for user_id, offer_id, matched_count, total, compatibility in zip(
+                    user_ids[start:end].tolist(),
+                    offer_ids[start:end].tolist(),
+                    matched[start:end].tolist(),
+                    totals[start:end].tolist(),
+                    compat[start:end].tolist(),
+                )
+            ])
+        # Lo que no se tocó en esta corrida ya no tiene requisitos cumplidos
+        connection.execute(
+            delete(MatchScore).where(in_shard).where(MatchScore.computed_at < computed_at)
+        )
+    return index, int(user_ids.size)
+
+
+# =========================
+# Coordinador
+# =========================
+
+def rescore_all(workers, shard_size, batch_size, checkpoint_path, restart=False, progress=None, log=print):
+    """Recalcula match_scores para todos los usuarios en paralelo.
+
+    `progress(usuarios)` se llama al terminar cada shard. Devuelve un
+    resumen con usuarios, filas escritas y segundos.
+    """
+    started = time.perf_counter()
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        checkpoint = {
+            "computed_at": datetime.utcnow().isoformat(),
+            "shards": plan_shards(shard_size),
+            "done": [],
+        }
+        save_checkpoint(checkpoint_path, checkpoint)
+    else:
+        log(f"Retomando desde {checkpoint_path}: "
+            f"{len(checkpoint['done'])}/{len(checkpoint['shards'])} shards hechos")
+
+    computed_at = datetime.fromisoformat(checkpoint["computed_at"])
+    done = set(checkpoint["done"])
+    pending = [
+        (index, first_id, last_id)
+        for index, (first_id, last_id, _) in enumerate(checkpoint["shards"])
+        if index not in done
+    ]
+    if progress is not None:
+        progress(sum(checkpoint["shards"][index][2] for index in done))
+
+    matrix_dir = tempfile.mkdtemp(prefix="skillmatch-rescore-")
+    rows_written = 0
+    try:
+        stats = build_offer_matrix(matrix_dir)
+        log(f"Matriz de requisitos: {stats['offers']} ofertas activas, {stats['requirements']} requisitos")
+        # Los workers abren sus propias conexiones: las del proceso padre no se heredan
+        database_url = db.engine.url.render_as_string(hide_password=False)
+        db.session.remove()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(database_url, matrix_dir, batch_size),
+        ) as executor:
+            futures = [
+                executor.submit(_rescore_shard, index, first_id, last_id, computed_at)
+                for index, first_id, last_id in pending
+            ]
+            for future in as_completed(futures):
+                index, rows = future.result()
+                rows_written += rows
+                done.add(index)
+                checkpoint["done"] = sorted(done)
+                save_checkpoint(checkpoint_path, checkpoint)
+                if progress is not None:
+                    progress(checkpoint["shards"][index][2])
+    finally:
+        shutil.rmtree(matrix_dir, ignore_errors=True)
+
+    # Corrida completa: el próximo rescore empieza de cero
+    os.remove(checkpoint_path)
+    return {
+        "users": sum(users for _, _, users in checkpoint["shards"]),
+        "shards": len(checkpoint["shards"]),
+        "rows": rows_written,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
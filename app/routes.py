@@ -9,8 +9,48 @@ def api_health():
     """Endpoint simple para probar que la API funciona."""
     return jsonify({"status": "ok", "message": "API SkillMatch lista ✅"})
 
-from flask import request
-from .models import User, Skill, JobOffer, UserSkill, JobSkillRequirement
+from flask import current_app, request
+from sqlalchemy import case, delete, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from .models import (
+    User,
+    Skill,
+    JobOffer,
+    UserSkill,
+    JobSkillRequirement,
+    MatchScore,
+    UserRecommendation,
+)
+from .matching import (
+    DEFAULT_IMPORTANCE,
+    LEVEL_NAMES,
+    LEVEL_SCALE,
+    MAX_TOP_K,
+    level_name,
+    parse_level,
+    top_k_offers,
+    top_k_offers_weighted,
+    weighted_compatibility,
+    weighted_credit,
+)
+from .cache import match_cache
+from .engine import get_engine
+from .catalog import MAX_SUGGESTIONS, skill_catalog
+from .http_cache import not_modified, row_etag, version_etag, with_validators
+from .pagination import page_response, paginated_list, parse_page_args, wants_stream
+from . import lsh, sql_engine
+from .signals import (
+    job_offers_changed,
+    requirements_changed,
+    skills_changed,
+    user_skills_changed,
+    users_changed,
+)
+from .search import MAX_SEARCH_RESULTS, offer_search
+from .skill_index import skill_index, top_k_candidates
+from .weights import offer_weights
+from .metrics import pool_snapshot, render_prometheus, request_metrics, statement_timeouts
 from . import db
 
 
@@ -46,7 +86,7 @@ def user_skill_to_dict(us: UserSkill):
         "id": us.id,
         "user_id": us.user_id,
         "skill_id": us.skill_id,
-        "level": us.level,
+        "level": level_name(us.level),
     }
 
 def job_skill_req_to_dict(jsr: JobSkillRequirement):
@@ -54,30 +94,191 @@ def job_skill_req_to_dict(jsr: JobSkillRequirement):
         "id": jsr.id,
         "job_offer_id": jsr.job_offer_id,
         "skill_id": jsr.skill_id,
-        "min_level": jsr.level_required,  # 👈 usamos el campo real del modelo
+        "min_level": level_name(jsr.level_required),  # 👈 usamos el campo real del modelo
+        "importance": jsr.importance,
     }
 
-# Helper para convertir niveles de texto a un orden numérico
-LEVEL_ORDER = {
-    "beginner": 1,
-    "junior": 1,
-    "intermediate": 2,
-    "mid": 2,
-    "advanced": 3,
-    "senior": 3,
+# Helper: {skill_id: nombre} de muchas skills, desde el catálogo en memoria
+def skill_names(skill_ids):
+    return skill_catalog.names(set(skill_ids))
+
+# Helper para leer ?include= (None si pide algo que el recurso no tiene)
+def get_include_param(allowed):
+    include = {value.strip() for value in request.args.get("include", "").split(",") if value.strip()}
+    return include if include <= set(allowed) else None
+
+def include_error(allowed):
+    return jsonify({"error": f"include debe ser uno de: {', '.join(allowed)}"}), 400
+
+# Los niveles se guardan como entero: en ?fields= se traducen en SQL a su nombre
+def level_name_column(column):
+    return case(LEVEL_NAMES, value=column, else_="unknown")
+
+# Columnas que se pueden pedir con ?fields= (nombre público → columna)
+USER_COLUMNS = {
+    "id": User.id,
+    "name": User.name,
+    "email": User.email,
+    "created_at": User.created_at,
+}
+
+SKILL_COLUMNS = {
+    "id": Skill.id,
+    "name": Skill.name,
+}
+
+JOBOFFER_COLUMNS = {
+    "id": JobOffer.id,
+    "title": JobOffer.title,
+    "company": JobOffer.company,
+    "description": JobOffer.description,
+    "location": JobOffer.location,
+    "seniority": JobOffer.seniority,
+    "created_at": JobOffer.created_at,
+    "is_active": JobOffer.is_active,
+}
+
+# Filtros de los listados (query param → (columna, tipo))
+USER_FILTERS = {"email": (User.email, str)}
+
+JOBOFFER_FILTERS = {
+    "is_active": (JobOffer.is_active, bool),
+    "seniority": (JobOffer.seniority, str),
+    "location": (JobOffer.location, str),
+    "company": (JobOffer.company, str),
+}
+
+USER_SKILL_COLUMNS = {
+    "id": UserSkill.id,
+    "user_id": UserSkill.user_id,
+    "skill_id": UserSkill.skill_id,
+    "level": level_name_column(UserSkill.level),
+}
+
+JOB_SKILL_REQ_COLUMNS = {
+    "id": JobSkillRequirement.id,
+    "job_offer_id": JobSkillRequirement.job_offer_id,
+    "skill_id": JobSkillRequirement.skill_id,
+    "min_level": level_name_column(JobSkillRequirement.level_required),
+    "importance": JobSkillRequirement.importance,
 }
 
+# Helper para el 400 de un nivel que no se reconoce
+def level_error_message(field):
+    return f"{field} debe ser uno de: {', '.join(LEVEL_NAMES.values())}"
+
+# Helper para validar la importancia de un requisito (1–5)
+def parse_importance(value):
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= 5:
+        return None
+    return value
+
+# Helper para validar un id que viene en el JSON (entero positivo)
+def is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+# Helper: ¿el IntegrityError es un único violado? (Postgres 23505 / SQLite)
+def is_unique_violation(error):
+    orig = error.orig
+    return getattr(orig, "pgcode", None) == "23505" or "UNIQUE constraint failed" in str(orig)
+
+# Helper para un IntegrityError al guardar: 409 solo si se viola el único
+# (usuario, skill) u (oferta, skill); cualquier otra restricción es un 400
+def integrity_error(error, message):
+    db.session.rollback()
+    if is_unique_violation(error):
+        return jsonify({"error": message}), 409
+    return jsonify({"error": "el payload no cumple las restricciones de la base"}), 400
+
+USER_SKILL_CONFLICT = "el usuario ya tiene asignada esa skill"
+REQUIREMENT_CONFLICT = "la oferta ya tiene un requisito para esa skill"
+
+# Helper: ids de `ids` que no existen en la tabla de `model` (una sola consulta)
+def missing_ids(model, ids):
+    ids = set(ids)
+    found = {row[0] for row in db.session.query(model.id).filter(model.id.in_(ids))}
+    return ids - found
+
+# Helper para el 400 cuando el payload referencia filas que no existen
+def missing_error(label, ids):
+    return jsonify({"error": f"{label} no encontrados: {', '.join(map(str, sorted(ids)))}"}), 400
+
+# Helper para avisar a índices y caches que cambiaron skills de usuarios
+def notify_user_skills_changed(user_ids, skill_ids):
+    user_skills_changed.send(
+        current_app._get_current_object(),
+        user_ids=list(user_ids),
+        skill_ids=list(skill_ids),
+    )
+
+# Helper para avisar que se creó, editó o borró un usuario
+def notify_users_changed(user_ids):
+    users_changed.send(current_app._get_current_object(), user_ids=list(user_ids))
+
+# Helper para avisar que se creó, renombró o borró una skill
+def notify_skills_changed(skill_ids):
+    skills_changed.send(current_app._get_current_object(), skill_ids=list(skill_ids))
+
+# Helper para avisar que cambiaron requisitos de ofertas
+def notify_requirements_changed(offer_ids, skill_ids):
+    requirements_changed.send(
+        current_app._get_current_object(),
+        offer_ids=list(offer_ids),
+        skill_ids=list(skill_ids),
+    )
+
+# Helper para avisar que se creó, editó o borró una oferta
+def notify_job_offers_changed(offer_ids):
+    job_offers_changed.send(current_app._get_current_object(), offer_ids=list(offer_ids))
+
+# Motores de matching disponibles (?engine=)
+MATCH_ENGINES = ("python", "numpy")
+# Los rankings además se pueden calcular con una consulta agregada en la base
+# ("sql") o leer de la tabla match_scores ("materialized")
+RANKING_ENGINES = MATCH_ENGINES + ("sql", "materialized")
+# Ofertas para un usuario: también recuperación aproximada por MinHash/LSH
+USER_RANKING_ENGINES = RANKING_ENGINES + ("lsh",)
+
+def get_match_engine_param(engines=MATCH_ENGINES):
+    engine = request.args.get("engine", "python")
+    return engine if engine in engines else None
+
+def engine_error(engines=MATCH_ENGINES):
+    return jsonify({"error": f"engine debe ser uno de: {', '.join(engines)}"}), 400
+
+# Modos de scoring disponibles (?scoring=)
+SCORING_MODES = ("count", "weighted")
+
+def get_scoring_param():
+    scoring = request.args.get("scoring", "count")
+    return scoring if scoring in SCORING_MODES else None
+
+def scoring_error():
+    return jsonify({"error": f"scoring debe ser uno de: {', '.join(SCORING_MODES)}"}), 400
+
+# Helper para los campos de puntaje de un ranking según el modo de scoring
+def ranking_scores(compatibility, score, total, scoring):
+    if scoring == "weighted":
+        return {
+            "compatibility": compatibility,
+            "matched_weight": round(score / LEVEL_SCALE, 2),
+            "total_weight": total // LEVEL_SCALE,
+        }
+    return {
+        "compatibility": compatibility,
+        "matched_requirements": score,
+        "total_requirements": total,
+    }
 
 
 # =========================
 # CRUD de Users
 # =========================
 
-# GET /api/users  → lista todos los usuarios
+# GET /api/users  → lista usuarios (?after_id=&limit=&fields=&email=)
 @api_bp.route("/users", methods=["GET"])
 def list_users():
-    users = User.query.order_by(User.id).all()
-    return jsonify([user_to_dict(u) for u in users])
+    return paginated_list(User, USER_COLUMNS, user_to_dict, USER_FILTERS)
 
 
 # POST /api/users  → crea un usuario
@@ -94,16 +295,44 @@ def create_user():
     user = User(name=name, email=email)
     db.session.add(user)
     db.session.commit()
+    notify_users_changed([user.id])
 
     return jsonify(user_to_dict(user)), 201
 
-# GET /api/users/<id>  → obtener usuario por id
+# GET /api/users/<id>  → obtener usuario por id (?include=skills)
 @api_bp.route("/users/<int:user_id>", methods=["GET"])
 def get_user(user_id):
-    user = User.query.get(user_id)
+    include = get_include_param(("skills",))
+    if include is None:
+        return include_error(("skills",))
+
+    etag = None
+    if "skills" in include:
+        # La versión del usuario sube con cualquier cambio en él o en sus skills
+        etag = version_etag(
+            "user", user_id, match_cache.backend.get_version(f"user:{user_id}"),
+            skill_catalog.snapshot().etag,
+        )
+        cached = not_modified(etag, weak=True)
+        if cached is not None:
+            return cached
+
+    query = User.query
+    if "skills" in include:
+        # Skills y sus nombres en una query extra, sin importar cuántas sean
+        query = query.options(selectinload(User.skills).joinedload(UserSkill.skill))
+    user = query.get(user_id)
     if user is None:
         return jsonify({"error": "user not found"}), 404
-    return jsonify(user_to_dict(user))
+
+    data = user_to_dict(user)
+    if "skills" in include:
+        data["skills"] = [
+            {**user_skill_to_dict(us), "skill_name": us.skill.name}
+            for us in sorted(user.skills, key=lambda us: us.id)
+        ]
+        return with_validators(jsonify(data), etag, weak=True)
+    return with_validators(jsonify(data), row_etag("user", user), user.updated_at)
 
 
 # PUT /api/users/<id>  → actualizar usuario
@@ -123,6 +352,7 @@ def update_user(user_id):
     user.email = email
 
     db.session.commit()
+    notify_users_changed([user_id])
     return jsonify(user_to_dict(user))
 
 
@@ -133,19 +363,71 @@ def delete_user(user_id):
     if user is None:
         return jsonify({"error": "user not found"}), 404
 
+    skill_ids = [us.skill_id for us in user.skills]
+
     db.session.delete(user)
     db.session.commit()
+    notify_users_changed([user_id])
+    notify_user_skills_changed([user_id], skill_ids)
     return jsonify({"status": "deleted", "id": user_id})
 
 # =========================
 # CRUD de Skills
 # =========================
 
-# GET /api/skills → lista todas las skills
+# GET /api/skills → lista skills (?after_id=&limit=&fields=&name=)
+# Se sirve desde el catálogo en memoria, con ETag para responder 304
 @api_bp.route("/skills", methods=["GET"])
 def list_skills():
-    skills = Skill.query.order_by(Skill.id).all()
-    return jsonify([skill_to_dict(s) for s in skills])
+    if wants_stream():
+        return paginated_list(
+            Skill,
+            SKILL_COLUMNS,
+            skill_to_dict,
+            {"name": (Skill.name, str)},
+        )
+
+    snapshot = skill_catalog.snapshot()
+    cached = not_modified(snapshot.etag)
+    if cached is not None:
+        return cached
+
+    page, error = parse_page_args(SKILL_COLUMNS)
+    if error:
+        return error
+    after_id, limit, fields = page
+
+    name = request.args.get("name")
+    if name is not None:
+        skill_id = snapshot.by_name.get(name)
+        rows = [(skill_id, name)] if skill_id is not None and skill_id > after_id else []
+    else:
+        # Una fila de más para saber si existe una página siguiente
+        rows = skill_catalog.page(after_id, limit + 1)
+
+    items = []
+    for skill_id, skill_name in rows[:limit]:
+        item = {"id": skill_id, "name": skill_name}
+        items.append({f: item[f] for f in fields} if fields else item)
+
+    response = page_response(items, len(rows) > limit)
+    response.set_etag(snapshot.etag)
+    return response
+
+
+# GET /api/skills/suggest?q=&limit= → autocompletado de nombres de skills
+# (sin tildes ni mayúsculas; también por palabra: "lear" → "Machine Learning")
+@api_bp.route("/skills/suggest", methods=["GET"])
+def suggest_skills():
+    q = request.args.get("q", "")
+    limit = request.args.get("limit", default=10, type=int)
+    if limit is None or not 1 <= limit <= MAX_SUGGESTIONS:
+        return jsonify({"error": f"limit debe estar entre 1 y {MAX_SUGGESTIONS}"}), 400
+
+    return jsonify([
+        {"id": skill_id, "name": name}
+        for skill_id, name in skill_catalog.suggest(q, limit)
+    ])
 
 
 # POST /api/skills → crea una skill
@@ -161,6 +443,7 @@ def create_skill():
     skill = Skill(name=name)
     db.session.add(skill)
     db.session.commit()
+    notify_skills_changed([skill.id])
 
     return jsonify(skill_to_dict(skill)), 201
 
@@ -171,7 +454,9 @@ def get_skill(skill_id):
     skill = Skill.query.get(skill_id)
     if skill is None:
         return jsonify({"error": "skill not found"}), 404
-    return jsonify(skill_to_dict(skill))
+    return with_validators(
+        jsonify(skill_to_dict(skill)), row_etag("skill", skill), skill.updated_at
+    )
 
 
 # PUT /api/skills/<id> → actualizar skill
@@ -186,6 +471,7 @@ def update_skill(skill_id):
     skill.name = data.get("name", skill.name)
 
     db.session.commit()
+    notify_skills_changed([skill_id])
     return jsonify(skill_to_dict(skill))
 
 
@@ -196,8 +482,14 @@ def delete_skill(skill_id):
     if skill is None:
         return jsonify({"error": "skill not found"}), 404
 
+    user_ids = [us.user_id for us in skill.users]
+    offer_ids = [jsr.job_offer_id for jsr in skill.job_requirements]
+
     db.session.delete(skill)
     db.session.commit()
+    notify_skills_changed([skill_id])
+    notify_user_skills_changed(user_ids, [skill_id])
+    notify_requirements_changed(offer_ids, [skill_id])
     return jsonify({"status": "deleted", "id": skill_id})
 
 # =========================
@@ -205,10 +497,28 @@ def delete_skill(skill_id):
 # =========================
 
 # GET /api/job_offers → listar ofertas
+# (?after_id=&limit=&fields=&is_active=&seniority=&location=&company=)
 @api_bp.route("/job_offers", methods=["GET"])
 def list_job_offers():
-    offers = JobOffer.query.order_by(JobOffer.id).all()
-    return jsonify([joboffer_to_dict(o) for o in offers])
+    return paginated_list(JobOffer, JOBOFFER_COLUMNS, joboffer_to_dict, JOBOFFER_FILTERS)
+
+
+# GET /api/job_offers/search?q=&location=&seniority=&limit= → buscador de ofertas activas
+# (todas las palabras de q en título, empresa o descripción; la última como prefijo)
+@api_bp.route("/job_offers/search", methods=["GET"])
+def search_job_offers():
+    limit = request.args.get("limit", default=20, type=int)
+    if limit is None or not 1 <= limit <= MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"limit debe estar entre 1 y {MAX_SEARCH_RESULTS}"}), 400
+
+    offer_ids = offer_search.search(
+        request.args.get("q", ""),
+        location=request.args.get("location"),
+        seniority=request.args.get("seniority"),
+        limit=limit,
+    )
+    offers = {o.id: o for o in JobOffer.query.filter(JobOffer.id.in_(offer_ids))}
+    return jsonify([joboffer_to_dict(offers[o]) for o in offer_ids if o in offers])
 
 
 # POST /api/job_offers → crear oferta
@@ -230,16 +540,45 @@ def create_job_offer():
     )
     db.session.add(offer)
     db.session.commit()
+    notify_job_offers_changed([offer.id])
     return jsonify(joboffer_to_dict(offer)), 201
 
 
-# GET /api/job_offers/<id> → obtener oferta por id
+# GET /api/job_offers/<id> → obtener oferta por id (?include=requirements)
 @api_bp.route("/job_offers/<int:offer_id>", methods=["GET"])
 def get_job_offer(offer_id):
-    offer = JobOffer.query.get(offer_id)
+    include = get_include_param(("requirements",))
+    if include is None:
+        return include_error(("requirements",))
+
+    etag = None
+    if "requirements" in include:
+        # La versión de la oferta sube con cualquier cambio en ella o en sus requisitos
+        etag = version_etag(
+            "offer", offer_id, match_cache.backend.get_version(f"offer:{offer_id}"),
+            skill_catalog.snapshot().etag,
+        )
+        cached = not_modified(etag, weak=True)
+        if cached is not None:
+            return cached
+
+    query = JobOffer.query
+    if "requirements" in include:
+        query = query.options(
+            selectinload(JobOffer.skill_requirements).joinedload(JobSkillRequirement.skill)
+        )
+    offer = query.get(offer_id)
     if offer is None:
         return jsonify({"error": "job offer not found"}), 404
-    return jsonify(joboffer_to_dict(offer))
+
+    data = joboffer_to_dict(offer)
+    if "requirements" in include:
+        data["requirements"] = [
+            {**job_skill_req_to_dict(jsr), "skill_name": jsr.skill.name}
+            for jsr in sorted(offer.skill_requirements, key=lambda jsr: jsr.id)
+        ]
+        return with_validators(jsonify(data), etag, weak=True)
+    return with_validators(jsonify(data), row_etag("job_offer", offer), offer.updated_at)
 
 
 # PUT /api/job_offers/<id> → actualizar oferta
@@ -259,6 +598,7 @@ def update_job_offer(offer_id):
     offer.is_active = data.get("is_active", offer.is_active)
 
     db.session.commit()
+    notify_job_offers_changed([offer_id])
     return jsonify(joboffer_to_dict(offer))
 
 
@@ -271,17 +611,26 @@ def delete_job_offer(offer_id):
 
     db.session.delete(offer)
     db.session.commit()
+    notify_job_offers_changed([offer_id])
     return jsonify({"status": "deleted", "id": offer_id})
 
 # =========================
 # CRUD de UserSkills
 # =========================
 
-# GET /api/user_skills → lista todas las relaciones usuario-skill
+# GET /api/user_skills → lista relaciones usuario-skill
+# (?after_id=&limit=&fields=&user_id=&skill_id=)
 @api_bp.route("/user_skills", methods=["GET"])
 def list_user_skills():
-    items = UserSkill.query.order_by(UserSkill.id).all()
-    return jsonify([user_skill_to_dict(us) for us in items])
+    return paginated_list(
+        UserSkill,
+        USER_SKILL_COLUMNS,
+        user_skill_to_dict,
+        {
+            "user_id": (UserSkill.user_id, int),
+            "skill_id": (UserSkill.skill_id, int),
+        },
+    )
 
 
 # POST /api/user_skills → asignar una skill a un usuario
@@ -289,16 +638,25 @@ def list_user_skills():
 def create_user_skill():
     data = request.get_json() or {}
 
-    user_id = data.get("user_id")
-    skill_id = data.get("skill_id")
-    level = data.get("level")
-
-    if not user_id or not skill_id or not level:
-        return jsonify({"error": "user_id, skill_id y level son obligatorios"}), 400
-
-    us = UserSkill(user_id=user_id, skill_id=skill_id, level=level)
+    row, error = user_skill_item(data)
+    if error:
+        return jsonify({"error": error}), 400
+    # Se valida antes de insertar: SQLite sin foreign_keys no rechaza ids
+    # que no existen
+    missing = missing_ids(User, [row["user_id"]])
+    if missing:
+        return missing_error("users", missing)
+    missing = missing_ids(Skill, [row["skill_id"]])
+    if missing:
+        return missing_error("skills", missing)
+
+    us = UserSkill(**row)
     db.session.add(us)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        return integrity_error(exc, USER_SKILL_CONFLICT)
+    notify_user_skills_changed([us.user_id], [us.skill_id])
 
     return jsonify(user_skill_to_dict(us)), 201
 
@@ -309,7 +667,9 @@ def get_user_skill(user_skill_id):
     us = UserSkill.query.get(user_skill_id)
     if us is None:
         return jsonify({"error": "user_skill not found"}), 404
-    return jsonify(user_skill_to_dict(us))
+    return with_validators(
+        jsonify(user_skill_to_dict(us)), row_etag("user_skill", us), us.updated_at
+    )
 
 
 # PUT /api/user_skills/<id> → actualizar nivel de una skill de usuario
@@ -321,8 +681,13 @@ def update_user_skill(user_skill_id):
 
     data = request.get_json() or {}
 
-    us.level = data.get("level", us.level)
+    if "level" in data:
+        level = parse_level(data["level"])
+        if level is None:
+            return jsonify({"error": level_error_message("level")}), 400
+        us.level = level
     db.session.commit()
+    notify_user_skills_changed([us.user_id], [us.skill_id])
     return jsonify(user_skill_to_dict(us))
 
 
@@ -335,17 +700,26 @@ def delete_user_skill(user_skill_id):
 
     db.session.delete(us)
     db.session.commit()
+    notify_user_skills_changed([us.user_id], [us.skill_id])
     return jsonify({"status": "deleted", "id": user_skill_id})
 
 # =========================
 # CRUD de JobSkillRequirements
 # =========================
 
-# GET /api/job_skill_requirements → lista todo
+# GET /api/job_skill_requirements → lista requisitos
+# (?after_id=&limit=&fields=&job_offer_id=&skill_id=)
 @api_bp.route("/job_skill_requirements", methods=["GET"])
 def list_job_skill_requirements():
-    items = JobSkillRequirement.query.order_by(JobSkillRequirement.id).all()
-    return jsonify([job_skill_req_to_dict(i) for i in items])
+    return paginated_list(
+        JobSkillRequirement,
+        JOB_SKILL_REQ_COLUMNS,
+        job_skill_req_to_dict,
+        {
+            "job_offer_id": (JobSkillRequirement.job_offer_id, int),
+            "skill_id": (JobSkillRequirement.skill_id, int),
+        },
+    )
 
 
 # POST /api/job_skill_requirements → crear requisito
@@ -354,21 +728,29 @@ def create_job_skill_requirement():
     data = request.get_json() or {}
 
     job_offer_id = data.get("job_offer_id")
-    skill_id = data.get("skill_id")
-    min_level = data.get("min_level")
 
-    if not job_offer_id or not skill_id or not min_level:
+    if not job_offer_id or not data.get("skill_id") or not data.get("min_level"):
         return jsonify({"error": "job_offer_id, skill_id y min_level son obligatorios"}), 400
-
-    jsr = JobSkillRequirement(
-        job_offer_id=job_offer_id,
-        skill_id=skill_id,
-        level_required=min_level,  # 👈 nombre correcto del campo
-    )
-
-
+    if not is_id(job_offer_id):
+        return jsonify({"error": "job_offer_id debe ser un entero positivo"}), 400
+
+    row, error = requirement_item(data, job_offer_id=job_offer_id)
+    if error:
+        return jsonify({"error": error}), 400
+    missing = missing_ids(JobOffer, [job_offer_id])
+    if missing:
+        return missing_error("job_offers", missing)
+    missing = missing_ids(Skill, [row["skill_id"]])
+    if missing:
+        return missing_error("skills", missing)
+
+    jsr = JobSkillRequirement(**row)
     db.session.add(jsr)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        return integrity_error(exc, REQUIREMENT_CONFLICT)
+    notify_requirements_changed([jsr.job_offer_id], [jsr.skill_id])
 
     return jsonify(job_skill_req_to_dict(jsr)), 201
 
@@ -379,7 +761,9 @@ def get_job_skill_requirement(jsr_id):
     jsr = JobSkillRequirement.query.get(jsr_id)
     if jsr is None:
         return jsonify({"error": "job_skill_requirement not found"}), 404
-    return jsonify(job_skill_req_to_dict(jsr))
+    return with_validators(
+        jsonify(job_skill_req_to_dict(jsr)), row_etag("job_skill_req", jsr), jsr.updated_at
+    )
 
 
 # PUT /api/job_skill_requirements/<id> → actualizar
@@ -391,10 +775,21 @@ def update_job_skill_requirement(jsr_id):
 
     data = request.get_json() or {}
 
-    jsr.level_required = data.get("min_level", jsr.level_required)
+    if "min_level" in data:
+        min_level = parse_level(data["min_level"])
+        if min_level is None:
+            return jsonify({"error": level_error_message("min_level")}), 400
+        jsr.level_required = min_level
+
+    if "importance" in data:
+        importance = parse_importance(data["importance"])
+        if importance is None:
+            return jsonify({"error": "importance debe ser un entero entre 1 y 5"}), 400
+        jsr.importance = importance
 
 
     db.session.commit()
+    notify_requirements_changed([jsr.job_offer_id], [jsr.skill_id])
     return jsonify(job_skill_req_to_dict(jsr))
 
 
@@ -407,80 +802,379 @@ def delete_job_skill_requirement(jsr_id):
 
     db.session.delete(jsr)
     db.session.commit()
+    notify_requirements_changed([jsr.job_offer_id], [jsr.skill_id])
     return jsonify({"status": "deleted", "id": jsr_id})
 
+# =========================
+# Cargas masivas
+# =========================
+
+# Máximo de ítems por request en los endpoints bulk
+MAX_BULK_ITEMS = 1000
+
+# Helper para validar un payload bulk completo antes de escribir nada.
+# `validate` recibe (índice, ítem) y devuelve (fila, error); con `unique_key`
+# también falla cada fila cuya clave repite la de un ítem anterior. Si algún
+# ítem falla se responde 400 con los errores por ítem y no se toca la base.
+def validate_bulk(items, validate, unique_key=None):
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": "se esperaba una lista no vacía de ítems"}), 400)
+    if len(items) > MAX_BULK_ITEMS:
+        return None, (jsonify({"error": f"máximo {MAX_BULK_ITEMS} ítems por request"}), 400)
+
+    rows, errors, seen = [], [], {}
+    for index, item in enumerate(items):
+        row, error = validate(index, item) if isinstance(item, dict) else (None, "cada ítem debe ser un objeto")
+        if not error and unique_key is not None:
+            key = unique_key(row)
+            if key in seen:
+                error = f"repite el ítem {seen[key]}"
+            else:
+                seen[key] = index
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            rows.append(row)
+    if errors:
+        return None, (jsonify({"error": "payload inválido", "items": errors}), 400)
+    return rows, None
+
+# Helper: inserta todas las filas en un solo executemany y devuelve los ids
+# en el mismo orden del payload
+def insert_returning_ids(model, rows):
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(stmt, rows))
+
+def user_skill_item(item, user_id=None):
+    user_id = item.get("user_id") if user_id is None else user_id
+    skill_id = item.get("skill_id")
+    level = item.get("level")
+
+    if not user_id or not skill_id or not level:
+        return None, "user_id, skill_id y level son obligatorios"
+    if not is_id(user_id) or not is_id(skill_id):
+        return None, "user_id y skill_id deben ser enteros positivos"
+    level = parse_level(level)
+    if level is None:
+        return None, level_error_message("level")
+    return {"user_id": user_id, "skill_id": skill_id, "level": level}, None
+
+def user_skill_key(row):
+    return row["user_id"], row["skill_id"]
+
+# Helper: índices de las filas cuyo (user_id, skill_id) ya está en la base
+# (una sola consulta)
+def existing_user_skills(rows):
+    pairs = {user_skill_key(row) for row in rows}
+    existing = set(
+        db.session.query(UserSkill.user_id, UserSkill.skill_id)
+        .filter(tuple_(UserSkill.user_id, UserSkill.skill_id).in_(pairs))
+    )
+    return [index for index, row in enumerate(rows) if user_skill_key(row) in existing]
+
+def requirement_item(item, job_offer_id=None):
+    skill_id = item.get("skill_id")
+    min_level = item.get("min_level")
+
+    if not skill_id or not min_level:
+        return None, "skill_id y min_level son obligatorios"
+    if not is_id(skill_id):
+        return None, "skill_id debe ser un entero positivo"
+    min_level = parse_level(min_level)
+    if min_level is None:
+        return None, level_error_message("min_level")
+    importance = parse_importance(item.get("importance", DEFAULT_IMPORTANCE))
+    if importance is None:
+        return None, "importance debe ser un entero entre 1 y 5"
+    return {
+        "job_offer_id": job_offer_id,
+        "skill_id": skill_id,
+        "level_required": min_level,
+        "importance": importance,
+    }, None
+
+def text_field_error(field, value, required=False):
+    """Error del campo de texto `field` de una oferta (None si es válido)."""
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value.strip()):
+        return f"{field} debe ser un texto no vacío" if required else f"{field} debe ser un texto"
+    max_length = JobOffer.__table__.c[field].type.length
+    if max_length is not None and len(value) > max_length:
+        return f"{field} admite como máximo {max_length} caracteres"
+    return None
+
+def job_offer_item(index, item):
+    for field in ("title", "company"):
+        if field not in item:
+            return None, f"{field} es obligatorio"
+    for field, required in (("title", True), ("company", True), ("description", False), ("location", False), ("seniority", False)):
+        error = text_field_error(field, item.get(field), required)
+        if error:
+            return None, error
+    is_active = item.get("is_active", True)
+    if not isinstance(is_active, bool):
+        return None, "is_active debe ser true o false"
+
+    requirements = []
+    for req in item.get("requirements") or []:
+        row, error = requirement_item(req) if isinstance(req, dict) else (None, "cada requisito debe ser un objeto")
+        if error:
+            return None, f"requirements: {error}"
+        if any(r["skill_id"] == row["skill_id"] for r in requirements):
+            return None, f"requirements: skill_id {row['skill_id']} repetido"
+        requirements.append(row)
+
+    offer = {
+        "title": item["title"],
+        "company": item["company"],
+        "description": item.get("description"),
+        "location": item.get("location"),
+        "seniority": item.get("seniority"),
+        "is_active": is_active,
+    }
+    return (offer, requirements), None
+
+
+# POST /api/user_skills/bulk → asignar muchas skills (a uno o varios usuarios)
+@api_bp.route("/user_skills/bulk", methods=["POST"])
+def bulk_create_user_skills():
+    rows, error = validate_bulk(
+        request.get_json(silent=True), lambda index, item: user_skill_item(item), user_skill_key
+    )
+    if error:
+        return error
+
+    user_ids = {r["user_id"] for r in rows}
+    skill_ids = {r["skill_id"] for r in rows}
+    missing = missing_ids(User, user_ids)
+    if missing:
+        return missing_error("users", missing)
+    missing = missing_ids(Skill, skill_ids)
+    if missing:
+        return missing_error("skills", missing)
+    existing = existing_user_skills(rows)
+    if existing:
+        return jsonify({
+            "error": USER_SKILL_CONFLICT,
+            "items": [{"index": index, "error": USER_SKILL_CONFLICT} for index in existing],
+        }), 409
+
+    try:
+        ids = insert_returning_ids(UserSkill, rows)
+        db.session.commit()
+    except IntegrityError as exc:
+        return integrity_error(exc, USER_SKILL_CONFLICT)
+    notify_user_skills_changed(user_ids, skill_ids)
+
+    return jsonify([
+        {"index": index, "status": "created", "id": us_id}
+        for index, us_id in enumerate(ids)
+    ]), 201
+
+
+# PUT /api/users/<id>/skills → reemplaza todas las skills del usuario
+@api_bp.route("/users/<int:user_id>/skills", methods=["PUT"])
+def replace_user_skills(user_id):
+    user = User.query.get(user_id)
+    if user is None:
+        return jsonify({"error": "user not found"}), 404
+
+    rows, error = validate_bulk(
+        request.get_json(silent=True),
+        lambda index, item: user_skill_item(item, user_id=user_id),
+        user_skill_key,
+    )
+    if error:
+        return error
+
+    new_skill_ids = [r["skill_id"] for r in rows]
+    missing = missing_ids(Skill, new_skill_ids)
+    if missing:
+        return missing_error("skills", missing)
+
+    old_skill_ids = [
+        row[0] for row in db.session.query(UserSkill.skill_id).filter_by(user_id=user_id)
+    ]
+    db.session.execute(delete(UserSkill).where(UserSkill.user_id == user_id))
+    ids = insert_returning_ids(UserSkill, rows)
+    db.session.commit()
+    notify_user_skills_changed([user_id], set(old_skill_ids) | set(new_skill_ids))
+
+    return jsonify([
+        {
+            "index": index,
+            "status": "created",
+            "id": us_id,
+            "user_id": user_id,
+            "skill_id": row["skill_id"],
+            "level": level_name(row["level"]),
+        }
+        for index, (us_id, row) in enumerate(zip(ids, rows))
+    ])
+
+
+# POST /api/job_offers/bulk → crear muchas ofertas con sus requisitos
+@api_bp.route("/job_offers/bulk", methods=["POST"])
+def bulk_create_job_offers():
+    items, error = validate_bulk(request.get_json(silent=True), job_offer_item)
+    if error:
+        return error
+
+    skill_ids = {r["skill_id"] for _, reqs in items for r in reqs}
+    missing = missing_ids(Skill, skill_ids)
+    if missing:
+        return missing_error("skills", missing)
+
+    # Ofertas y requisitos en la misma transacción: dos executemany en total
+    try:
+        offer_ids = insert_returning_ids(JobOffer, [offer for offer, _ in items])
+        requirements = []
+        for offer_id, (_, reqs) in zip(offer_ids, items):
+            requirements.extend({**r, "job_offer_id": offer_id} for r in reqs)
+        req_ids = insert_returning_ids(JobSkillRequirement, requirements) if requirements else []
+        db.session.commit()
+    except IntegrityError as exc:
+        return integrity_error(exc, REQUIREMENT_CONFLICT)
+
+    # Una sola señal por tanda: las ofertas son nuevas, así que quien escucha
+    # job_offers_changed ya recalcula todo lo de cada una (requisitos incluidos)
+    notify_job_offers_changed(offer_ids)
+
+    results = []
+    req_ids = iter(req_ids)
+    for index, (offer_id, (_, reqs)) in enumerate(zip(offer_ids, items)):
+        results.append({
+            "index": index,
+            "status": "created",
+            "id": offer_id,
+            "requirement_ids": [next(req_ids) for _ in reqs],
+        })
+    return jsonify(results), 201
+
 # =========================
 # MATCH: usuario vs oferta
 # =========================
 
-@api_bp.route("/match/user/<int:user_id>/job_offer/<int:offer_id>", methods=["GET"])
-def match_user_job_offer(user_id, offer_id):
+def no_requirements_match(user_id, offer_id):
+    return {
+        "user_id": user_id,
+        "job_offer_id": offer_id,
+        "compatibility": 0,
+        "reason": "La oferta no tiene requisitos de skills definidos",
+        "matched_skills": [],
+        "missing_skills": []
+    }
+
+# Helper: agrega el nombre de cada skill a las listas de un match. Va fuera
+# del cache para que renombrar una skill no deje respuestas viejas
+def with_skill_names(result):
+    entries = result["matched_skills"] + result["missing_skills"]
+    names = skill_names(entry["skill_id"] for entry in entries)
+    return {
+        **result,
+        "matched_skills": [
+            {**entry, "skill_name": names.get(entry["skill_id"])}
+            for entry in result["matched_skills"]
+        ],
+        "missing_skills": [
+            {**entry, "skill_name": names.get(entry["skill_id"])}
+            for entry in result["missing_skills"]
+        ],
+    }
+
+def compute_match(user_id, offer_id, engine, scoring):
+    """Calcula el match usuario-oferta; devuelve (payload, status)."""
     # 1) Traer usuario y oferta
     user = User.query.get(user_id)
     offer = JobOffer.query.get(offer_id)
 
     if user is None:
-        return jsonify({"error": "user not found"}), 404
+        return {"error": "user not found"}, 404
     if offer is None:
-        return jsonify({"error": "job offer not found"}), 404
+        return {"error": "job offer not found"}, 404
+
+    if engine == "numpy":
+        result = get_engine().match(user_id, offer_id, weighted=scoring == "weighted")
+        if result["total_requirements"]:
+            return {"user_id": user_id, "job_offer_id": offer_id, **result}, 200
+        return no_requirements_match(user_id, offer_id), 200
 
     # 2) Traer skills del usuario
-    user_skills = UserSkill.query.filter_by(user_id=user_id).all()
-    user_skills_by_id = {us.skill_id: us for us in user_skills}
+    user_levels = dict(
+        db.session.query(UserSkill.skill_id, UserSkill.level).filter_by(user_id=user_id)
+    )
 
     # 3) Traer requisitos de la oferta
-    reqs = JobSkillRequirement.query.filter_by(job_offer_id=offer_id).all()
+    reqs = (
+        db.session.query(
+            JobSkillRequirement.skill_id,
+            JobSkillRequirement.level_required,
+            JobSkillRequirement.importance,
+        )
+        .filter_by(job_offer_id=offer_id)
+        .order_by(JobSkillRequirement.id)
+        .all()
+    )
+    return build_match(user_id, offer_id, user_levels, reqs, scoring), 200
 
+def build_match(user_id, offer_id, user_levels, reqs, scoring):
+    """Detalle del match a partir de {skill_id: nivel} y los requisitos
+    (skill_id, level_required, importance) de la oferta."""
     if not reqs:
-        return jsonify({
-            "user_id": user_id,
-            "job_offer_id": offer_id,
-            "compatibility": 0,
-            "reason": "La oferta no tiene requisitos de skills definidos",
-            "matched_skills": [],
-            "missing_skills": []
-        })
+        return no_requirements_match(user_id, offer_id)
 
     total_reqs = len(reqs)
     matched_count = 0
     matched_skills = []
     missing_skills = []
+    weighted = scoring == "weighted"
+    credit = 0
+    total_weight = 0
 
-    for req in reqs:
-        user_skill = user_skills_by_id.get(req.skill_id)
+    for skill_id, level_required, importance in reqs:
+        user_level = user_levels.get(skill_id)
+        importance = importance or DEFAULT_IMPORTANCE
+        total_weight += importance * LEVEL_SCALE
 
-        if not user_skill:
+        if user_level is None:
             # El usuario no tiene esta skill
-            missing_skills.append({
-                "skill_id": req.skill_id,
-                "required_min_level": req.level_required,
+            entry = {
+                "skill_id": skill_id,
+                "required_min_level": level_name(level_required),
                 "reason": "user_missing_skill",
-            })
+            }
+            if weighted:
+                entry["importance"] = importance
+            missing_skills.append(entry)
             continue
 
         # Comparar niveles
-        user_level_num = LEVEL_ORDER.get(user_skill.level.lower(), 0)
-        required_level_num = LEVEL_ORDER.get(req.level_required.lower(), 0)
+        credit += weighted_credit(user_level, level_required, importance)
 
-        if user_level_num >= required_level_num:
+        if user_level >= level_required:
             matched_count += 1
-            matched_skills.append({
-                "skill_id": req.skill_id,
-                "user_level": user_skill.level,
-                "required_min_level": req.level_required,
+            entry = {
+                "skill_id": skill_id,
+                "user_level": level_name(user_level),
+                "required_min_level": level_name(level_required),
                 "status": "ok",
-            })
+            }
+            matched_skills.append(entry)
         else:
-            missing_skills.append({
-                "skill_id": req.skill_id,
-                "user_level": user_skill.level,
-                "required_min_level": req.level_required,
+            entry = {
+                "skill_id": skill_id,
+                "user_level": level_name(user_level),
+                "required_min_level": level_name(level_required),
                 "reason": "level_too_low",
-            })
+            }
+            missing_skills.append(entry)
+        if weighted:
+            entry["importance"] = importance
 
     compatibility = int((matched_count / total_reqs) * 100)
 
-    return jsonify({
+    result = {
         "user_id": user_id,
         "job_offer_id": offer_id,
         "compatibility": compatibility,
@@ -488,4 +1182,342 @@ def match_user_job_offer(user_id, offer_id):
         "missing_skills": missing_skills,
         "total_requirements": total_reqs,
         "matched_requirements": matched_count,
+    }
+    if weighted:
+        # Crédito completo por skill cumplida, parcial según la brecha de nivel
+        result.update({
+            "scoring": "weighted",
+            "compatibility": weighted_compatibility(credit, total_weight),
+            "matched_weight": round(credit / LEVEL_SCALE, 2),
+            "total_weight": total_weight // LEVEL_SCALE,
+        })
+    return result
+
+
+@api_bp.route("/match/user/<int:user_id>/job_offer/<int:offer_id>", methods=["GET"])
+def match_user_job_offer(user_id, offer_id):
+    engine = get_match_engine_param()
+    if engine is None:
+        return engine_error()
+    scoring = get_scoring_param()
+    if scoring is None:
+        return scoring_error()
+
+    # Las claves llevan la versión del usuario y de la oferta: cualquier
+    # escritura sobre ellos deja las entradas viejas inalcanzables
+    cache_key = match_cache.key(user_id, offer_id, f"{engine}:{scoring}")
+
+    # Mismo criterio para el cliente: ETag débil con esas versiones (y la del
+    # catálogo, por los nombres de skills); si no cambió, ni siquiera se lee el cache
+    etag = version_etag(cache_key, skill_catalog.snapshot().etag)
+    cached = not_modified(etag, weak=True)
+    if cached is not None:
+        return cached
+
+    result = match_cache.get(cache_key)
+    if result is None:
+        result, status = compute_match(user_id, offer_id, engine, scoring)
+        if status != 200:
+            return jsonify(result), status
+        match_cache.set(cache_key, result)
+    return with_validators(jsonify(with_skill_names(result)), etag, weak=True)
+
+
+# =========================
+# MATCH: top K ofertas para un usuario
+# =========================
+
+# GET /api/match/user/<id>/top?k=N → ranking de ofertas activas
+@api_bp.route("/match/user/<int:user_id>/top", methods=["GET"])
+def top_matches_for_user(user_id):
+    engine = get_match_engine_param(USER_RANKING_ENGINES)
+    if engine is None:
+        return engine_error(USER_RANKING_ENGINES)
+    scoring = get_scoring_param()
+    if scoring is None:
+        return scoring_error()
+    if engine == "materialized" and scoring == "weighted":
+        return jsonify({"error": "engine materialized solo soporta scoring count"}), 400
+
+    user = User.query.get(user_id)
+    if user is None:
+        return jsonify({"error": "user not found"}), 404
+
+    k = request.args.get("k", default=3, type=int)
+    if k is None or k < 1:
+        return jsonify({"error": "k debe ser un entero positivo"}), 400
+    k = min(k, MAX_TOP_K)
+
+    if engine == "numpy":
+        ranking = get_engine().top_offers(user_id, k, weighted=scoring == "weighted")
+    elif engine == "sql":
+        ranking = sql_engine.top_offers(user_id, k, weighted=scoring == "weighted")
+    elif engine == "lsh":
+        ranking = lsh.top_offers(user_id, k, weighted=scoring == "weighted")
+    elif engine == "materialized":
+        # Una lectura sobre el índice (user_id, compatibility, matched_count)
+        ranking = (
+            db.session.query(
+                MatchScore.job_offer_id,
+                MatchScore.compatibility,
+                MatchScore.matched_count,
+                MatchScore.total_reqs,
+            )
+            .filter(MatchScore.user_id == user_id)
+            .order_by(
+                MatchScore.compatibility.desc(),
+                MatchScore.matched_count.desc(),
+                MatchScore.job_offer_id,
+            )
+            .limit(k)
+            .all()
+        )
+    else:
+        # 1) Skills del usuario en una sola query
+        user_levels = dict(
+            db.session.query(UserSkill.skill_id, UserSkill.level)
+            .filter(UserSkill.user_id == user_id)
+        )
+
+        if scoring == "weighted":
+            # 2) Perfiles ponderados precalculados de las ofertas activas
+            ranking = top_k_offers_weighted(user_levels, offer_weights.profiles().items(), k)
+        else:
+            # 2) Requisitos de todas las ofertas activas en una sola query
+            reqs = (
+                db.session.query(
+                    JobSkillRequirement.job_offer_id,
+                    JobSkillRequirement.skill_id,
+                    JobSkillRequirement.level_required,
+                )
+                .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+                .filter(JobOffer.is_active.isnot(False))
+            )
+
+            ranking = top_k_offers(user_levels, reqs, k)
+
+    # 3) Detalle solo de las K ofertas ganadoras
+    offer_ids = [offer_id for offer_id, _, _, _ in ranking]
+    offers = {o.id: o for o in JobOffer.query.filter(JobOffer.id.in_(offer_ids))}
+
+    return jsonify({
+        "user_id": user_id,
+        "k": k,
+        "scoring": scoring,
+        "matches": [
+            {
+                "job_offer": joboffer_to_dict(offers[offer_id]),
+                **ranking_scores(compatibility, score, total, scoring),
+            }
+            for offer_id, compatibility, score, total in ranking
+        ],
+    })
+
+
+# =========================
+# MATCH: mejores candidatos para una oferta
+# =========================
+
+# GET /api/match/job_offer/<id>/candidates?k=N → ranking de usuarios
+# (409 si la oferta está inactiva, con cualquier motor)
+@api_bp.route("/match/job_offer/<int:offer_id>/candidates", methods=["GET"])
+def top_candidates_for_job_offer(offer_id):
+    engine = get_match_engine_param(RANKING_ENGINES)
+    if engine is None:
+        return engine_error(RANKING_ENGINES)
+    scoring = get_scoring_param()
+    if scoring is None:
+        return scoring_error()
+    if engine == "materialized" and scoring == "weighted":
+        return jsonify({"error": "engine materialized solo soporta scoring count"}), 400
+    weighted = scoring == "weighted"
+
+    offer = JobOffer.query.get(offer_id)
+    if offer is None:
+        return jsonify({"error": "job offer not found"}), 404
+    # Misma regla para todos los motores: una oferta inactiva no se rankea
+    # (tampoco aparece en los top de usuarios ni en match_scores)
+    if offer.is_active is False:
+        return jsonify({"error": "la oferta no está activa"}), 409
+
+    k = request.args.get("k", default=10, type=int)
+    if k is None or k < 1:
+        return jsonify({"error": "k debe ser un entero positivo"}), 400
+    k = min(k, MAX_TOP_K)
+
+    if engine == "numpy":
+        ranking, total = get_engine().top_users(offer_id, k, weighted=weighted)
+    elif engine == "sql":
+        ranking, total = sql_engine.top_users(offer_id, k, weighted=weighted)
+    elif engine == "materialized":
+        # Una lectura sobre el índice (job_offer_id, compatibility, matched_count)
+        rows = (
+            db.session.query(MatchScore.user_id, MatchScore.matched_count, MatchScore.total_reqs)
+            .filter(MatchScore.job_offer_id == offer_id)
+            .order_by(
+                MatchScore.compatibility.desc(),
+                MatchScore.matched_count.desc(),
+                MatchScore.user_id,
+            )
+            .limit(k)
+            .all()
+        )
+        ranking = [(user_id, matched) for user_id, matched, _ in rows]
+        total = rows[0].total_reqs if rows else 0
+    else:
+        profile = offer_weights.get(offer_id)
+        ranking, total = [], 0
+        if profile is not None:
+            # Cada requisito aporta 1 (o su importancia): solo sus posting lists
+            postings = skill_index.postings(profile.skill_ids)
+            ranking = top_k_candidates(
+                [
+                    (*postings[skill_id], level, weight * LEVEL_SCALE if weighted else 1)
+                    for skill_id, level, weight in zip(
+                        profile.skill_ids, profile.levels, profile.weights
+                    )
+                ],
+                k,
+                partial=weighted,
+            )
+            total = profile.total_weight if weighted else len(profile.skill_ids)
+
+    user_ids = [user_id for user_id, _ in ranking]
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))}
+
+    def compatibility(score):
+        if weighted:
+            return weighted_compatibility(score, total)
+        return int((score / total) * 100)
+
+    return jsonify({
+        "job_offer_id": offer_id,
+        "k": k,
+        "scoring": scoring,
+        "candidates": [
+            {
+                "user": user_to_dict(users[user_id]),
+                **ranking_scores(compatibility(score), score, total, scoring),
+            }
+            for user_id, score in ranking
+        ],
+    })
+
+
+# =========================
+# Recomendaciones precalculadas
+# =========================
+
+# GET /api/users/<id>/recommendations?k=N → top N precalculado por el worker
+# (flask skillmatch recommendations-worker); no calcula nada al vuelo
+@api_bp.route("/users/<int:user_id>/recommendations", methods=["GET"])
+def get_user_recommendations(user_id):
+    top_n = current_app.config["RECOMMENDATIONS_TOP_N"]
+    k = request.args.get("k", default=3, type=int)
+    if k is None or k < 1:
+        return jsonify({"error": "k debe ser un entero positivo"}), 400
+    k = min(k, top_n)
+
+    # Una sola lectura por la PK (user_id, rank), con la oferta ya unida
+    rows = (
+        db.session.query(UserRecommendation, JobOffer)
+        .join(JobOffer, JobOffer.id == UserRecommendation.job_offer_id)
+        .filter(UserRecommendation.user_id == user_id)
+        .order_by(UserRecommendation.rank)
+        .limit(k)
+        .all()
+    )
+    if not rows and db.session.get(User, user_id) is None:
+        return jsonify({"error": "user not found"}), 404
+
+    return jsonify({
+        "user_id": user_id,
+        "k": k,
+        "computed_at": rows[0][0].computed_at.isoformat() if rows else None,
+        "recommendations": [
+            {
+                "job_offer": joboffer_to_dict(offer),
+                **ranking_scores(rec.compatibility, rec.matched_count, rec.total_reqs, "count"),
+            }
+            for rec, offer in rows
+        ],
+    })
+
+
+# =========================
+# Brechas de skills
+# =========================
+
+# Compatibilidad mínima (0–100) para considerar que una oferta "se destraba"
+DEFAULT_GAP_THRESHOLD = 50
+
+# GET /api/users/<id>/skill_gaps?k=N&threshold=T&scoring= → qué skill (o subida
+# de nivel) pasaría más ofertas activas por encima del umbral
+@api_bp.route("/users/<int:user_id>/skill_gaps", methods=["GET"])
+def get_user_skill_gaps(user_id):
+    scoring = get_scoring_param()
+    if scoring is None:
+        return scoring_error()
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return jsonify({"error": "user not found"}), 404
+
+    k = request.args.get("k", default=10, type=int)
+    if k is None or k < 1:
+        return jsonify({"error": "k debe ser un entero positivo"}), 400
+    k = min(k, MAX_TOP_K)
+    threshold = request.args.get("threshold", default=DEFAULT_GAP_THRESHOLD, type=int)
+    if threshold is None or not 1 <= threshold <= 100:
+        return jsonify({"error": "threshold debe ser un entero entre 1 y 100"}), 400
+
+    gaps, below = get_engine().skill_gaps(user_id, threshold, k, weighted=scoring == "weighted")
+    names = skill_names(skill_id for skill_id, _, _, _ in gaps)
+    return jsonify({
+        "user_id": user_id,
+        "threshold": threshold,
+        "scoring": scoring,
+        "offers_below_threshold": below,
+        "gaps": [
+            {
+                "skill_id": skill_id,
+                "skill_name": names.get(skill_id),
+                "current_level": level_name(current) if current > 0 else None,
+                "target_level": level_name(target),
+                "offers_unlocked": unlocked,
+            }
+            for skill_id, current, target, unlocked in gaps
+        ],
+    })
+
+
+# =========================
+# Métricas para dimensionar cache y pools
+# =========================
+
+# GET /api/cache/stats → hits, misses, evictions y tamaño del cache de match
+@api_bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({"match": match_cache.stats()})
+
+
+# GET /api/metrics → latencia y SQL por ruta, pools de conexiones y statement timeouts
+# (JSON; texto de Prometheus con ?format=prometheus o Accept: text/plain)
+@api_bp.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus manda "text/plain;version=0.0.4" (con parámetros): se compara
+    # solo el tipo, y JSON sigue siendo la respuesta para */* o sin Accept
+    accepted = {mimetype.split(";")[0].strip() for mimetype, _ in request.accept_mimetypes}
+    prometheus = request.args.get("format") == "prometheus" or (
+        "application/json" not in accepted
+        and bool(accepted & {"text/plain", "application/openmetrics-text"})
+    )
+    if prometheus:
+        return current_app.response_class(
+            render_prometheus(db.engines), mimetype="text/plain; version=0.0.4"
+        )
+    return jsonify({
+        "requests": request_metrics.snapshot(),
+        "db_pools": pool_snapshot(db.engines),
+        "statement_timeouts": statement_timeouts.snapshot(),
     })
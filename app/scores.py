@@ -0,0 +1,134 @@
+from datetime import datetime
+
+from sqlalchemy import delete, insert
+
+from . import db
+from .models import JobOffer, JobSkillRequirement, MatchScore, UserSkill
+from .signals import job_offers_changed, requirements_changed, user_skills_changed
+
+
+# Ofertas por tanda al reconstruir la tabla completa (una transacción cada una)
+REBUILD_CHUNK_SIZE = 500
+
+
+def _replace_scores(condition, rows):
+    """Reemplaza en una transacción las filas de `match_scores` que cumplen `condition`."""
+    db.session.execute(delete(MatchScore).where(condition))
+    if rows:
+        db.session.execute(insert(MatchScore), rows)
+    db.session.commit()
+
+
+def _score_rows(user_skills, requirements):
+    """Filas de `match_scores` para los pares con al menos un requisito cumplido.
+
+    `user_skills` son (user_id, skill_id, nivel) y `requirements` todos los
+    requisitos (job_offer_id, skill_id, nivel requerido) de las ofertas a
+    puntuar: se cruzan por skill, sin recorrer usuario × oferta.
+    """
+    totals = {}
+    by_skill = {}
+    for offer_id, skill_id, required in requirements:
+        totals[offer_id] = totals.get(offer_id, 0) + 1
+        by_skill.setdefault(skill_id, []).append((offer_id, required))
+
+    matched = {}
+    for user_id, skill_id, level in user_skills:
+        for offer_id, required in by_skill.get(skill_id, ()):
+            if level >= required:
+                matched[user_id, offer_id] = matched.get((user_id, offer_id), 0) + 1
+
+    now = datetime.utcnow()
+    return [
+        {
+            "user_id": user_id,
+            "job_offer_id": offer_id,
+            "compatibility": int((count / totals[offer_id]) * 100),
+            "matched_count": count,
+            "total_reqs": totals[offer_id],
+            "computed_at": now,
+        }
+        for (user_id, offer_id), count in matched.items()
+    ]
+
+
+def _active_requirements():
+    return (
+        db.session.query(
+            JobSkillRequirement.job_offer_id,
+            JobSkillRequirement.skill_id,
+            JobSkillRequirement.level_required,
+        )
+        .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+        .filter(JobOffer.is_active.isnot(False))
+    )
+
+
+def refresh_user_scores(user_ids):
+    """Recalcula la fila completa de cada usuario (todas las ofertas activas) en una transacción."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    user_skills = (
+        db.session.query(UserSkill.user_id, UserSkill.skill_id, UserSkill.level)
+        .filter(UserSkill.user_id.in_(user_ids))
+        .all()
+    )
+
+    # Solo importan las ofertas activas que piden alguna skill de estos usuarios
+    requirements = []
+    skill_ids = {skill_id for _, skill_id, _ in user_skills}
+    if skill_ids:
+        touched_offers = (
+            db.session.query(JobSkillRequirement.job_offer_id)
+            .filter(JobSkillRequirement.skill_id.in_(skill_ids))
+        )
+        requirements = _active_requirements().filter(
+            JobSkillRequirement.job_offer_id.in_(touched_offers)
+        ).all()
+
+    _replace_scores(MatchScore.user_id.in_(user_ids), _score_rows(user_skills, requirements))
+
+
+def refresh_offer_scores(offer_ids):
+    """Recalcula la columna completa de cada oferta (todos los usuarios) en una transacción."""
+    offer_ids = set(offer_ids)
+    if not offer_ids:
+        return
+    # Las ofertas inactivas o borradas se quedan sin filas
+    requirements = _active_requirements().filter(JobSkillRequirement.job_offer_id.in_(offer_ids)).all()
+
+    user_skills = []
+    skill_ids = {skill_id for _, skill_id, _ in requirements}
+    if skill_ids:
+        user_skills = (
+            db.session.query(UserSkill.user_id, UserSkill.skill_id, UserSkill.level)
+            .filter(UserSkill.skill_id.in_(skill_ids))
+            .all()
+        )
+
+    _replace_scores(MatchScore.job_offer_id.in_(offer_ids), _score_rows(user_skills, requirements))
+
+
+def rebuild_all_scores():
+    """Recalcula toda la tabla, por tandas de ofertas. Devuelve cuántas ofertas procesó."""
+    offer_ids = [offer_id for offer_id, in db.session.query(JobOffer.id).order_by(JobOffer.id)]
+    # Las filas de ofertas que ya no existen se limpian por el FK con ON DELETE CASCADE
+    for start in range(0, len(offer_ids), REBUILD_CHUNK_SIZE):
+        refresh_offer_scores(offer_ids[start:start + REBUILD_CHUNK_SIZE])
+    return len(offer_ids)
+
+
+@user_skills_changed.connect
+def _on_user_skills_changed(sender, user_ids=None, skill_ids=None, **extra):
+    refresh_user_scores(user_ids or [])
+
+
+@requirements_changed.connect
+def _on_requirements_changed(sender, offer_ids=None, skill_ids=None, **extra):
+    refresh_offer_scores(offer_ids or [])
+
+
+@job_offers_changed.connect
+def _on_job_offers_changed(sender, offer_ids=None, **extra):
+    refresh_offer_scores(offer_ids or [])
@@ -0,0 +1,172 @@
+import bisect
+import heapq
+import re
+from threading import Lock
+
+from . import db
+from .cache import on_invalidation
+from .catalog import fold_name
+from .models import JobOffer
+
+# Cuántas ofertas devuelve como máximo una búsqueda
+MAX_SEARCH_RESULTS = 100
+
+# La última palabra se busca como prefijo: si las demás condiciones ya dejan
+# a lo sumo esta cantidad de ofertas se revisan sus palabras una por una; si
+# no, se unen las ofertas de todas las palabras del vocabulario con ese prefijo
+PREFIX_SCAN_LIMIT = 2000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Palabras normalizadas (sin tildes ni mayúsculas) de un texto."""
+    return _TOKEN_RE.findall(fold_name(text)) if text else []
+
+
+class OfferSearchIndex:
+    """Índice invertido en memoria de las ofertas activas.
+
+    - token → set de ids de ofertas (título, empresa y descripción)
+    - vocabulario ordenado, para que la última palabra de la consulta
+      funcione como prefijo ("pyth" encuentra "python")
+    - location / seniority normalizados → set de ids, para los filtros
+
+    Se arma completo la primera vez que se usa y después solo se vuelven a
+    indexar las ofertas que cambian (evento `job_offers_changed`).
+    """
+
+    def __init__(self):
+        self._postings = None
+        self._vocabulary = []
+        self._facets = {}
+        self._docs = {}
+        self._lock = Lock()
+
+    def search(self, query="", location=None, seniority=None, limit=20):
+        """Ids de ofertas que contienen todas las palabras de `query`, más nuevas primero."""
+        with self._lock:
+            if self._postings is None:
+                self._build()
+
+            sets = []
+            tokens = tokenize(query)
+            prefix = tokens.pop() if tokens else None
+            for word in tokens:
+                sets.append(self._postings.get(word, set()))
+            if location:
+                sets.append(self._facets.get(("location", fold_name(location)), set()))
+            if seniority:
+                sets.append(self._facets.get(("seniority", fold_name(seniority)), set()))
+
+            if prefix is None:
+                hits = self._intersect(sets) if sets else self._docs.keys()
+            elif sets and min(len(s) for s in sets) <= PREFIX_SCAN_LIMIT:
+                hits = {
+                    offer_id for offer_id in self._intersect(sets)
+                    if any(token.startswith(prefix) for token in self._docs[offer_id][0])
+                }
+            else:
+                hits = self._intersect(sets + [self._prefix_postings(prefix)])
+            return heapq.nlargest(limit, hits)
+
+    def refresh(self, offer_ids):
+        """Vuelve a indexar `offer_ids` (si el índice ya estaba armado)."""
+        with self._lock:
+            if offer_ids is None:
+                self._postings = None
+            if self._postings is None or not offer_ids:
+                return
+            for offer_id in offer_ids:
+                self._remove(offer_id)
+            for offer in self._active_offers(offer_ids):
+                self._add(offer)
+
+    def clear(self):
+        with self._lock:
+            self._postings = None
+
+    @staticmethod
+    def _intersect(sets):
+        # Empezando por el set más chico
+        sets = sorted(sets, key=len)
+        hits = set(sets[0])
+        for other in sets[1:]:
+            hits &= other
+            if not hits:
+                break
+        return hits
+
+    def _prefix_postings(self, prefix):
+        # Las palabras con el prefijo son un tramo contiguo del vocabulario ordenado
+        found = set()
+        for index in range(bisect.bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            token = self._vocabulary[index]
+            if not token.startswith(prefix):
+                break
+            found |= self._postings[token]
+        return found
+
+    def _build(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._facets = {}
+        self._docs = {}
+        for offer in self._active_offers():
+            self._add(offer, keep_sorted=False)
+        self._vocabulary = sorted(self._postings)
+
+    @staticmethod
+    def _active_offers(offer_ids=None):
+        query = db.session.query(
+            JobOffer.id,
+            JobOffer.title,
+            JobOffer.company,
+            JobOffer.description,
+            JobOffer.location,
+            JobOffer.seniority,
+        ).filter(JobOffer.is_active.isnot(False))
+        if offer_ids is not None:
+            query = query.filter(JobOffer.id.in_(list(offer_ids)))
+        return query
+
+    def _add(self, offer, keep_sorted=True):
+        tokens = set(tokenize(offer.title)) | set(tokenize(offer.company)) | set(tokenize(offer.description))
+        facets = set()
+        if offer.location:
+            facets.add(("location", fold_name(offer.location)))
+        if offer.seniority:
+            facets.add(("seniority", fold_name(offer.seniority)))
+
+        self._docs[offer.id] = (tokens, facets)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._vocabulary, token)
+            postings.add(offer.id)
+        for facet in facets:
+            self._facets.setdefault(facet, set()).add(offer.id)
+
+    def _remove(self, offer_id):
+        doc = self._docs.pop(offer_id, None)
+        if doc is None:
+            return
+        tokens, facets = doc
+        for token in tokens:
+            postings = self._postings[token]
+            postings.discard(offer_id)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        for facet in facets:
+            self._facets[facet].discard(offer_id)
+
+
+offer_search = OfferSearchIndex()
+
+
+@on_invalidation("job_offers_changed")
+def _on_job_offers_changed(offer_ids=None):
+    offer_search.refresh(offer_ids)
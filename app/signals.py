@@ -0,0 +1,19 @@
+from blinker import Namespace
+
+# Señales internas para avisar a índices y caches que algo cambió
+_signals = Namespace()
+
+# Cambiaron skills de usuarios: kwargs user_ids, skill_ids
+user_skills_changed = _signals.signal("user-skills-changed")
+
+# Cambiaron requisitos de ofertas: kwargs offer_ids, skill_ids
+requirements_changed = _signals.signal("requirements-changed")
+
+# Se creó, editó o borró una oferta: kwargs offer_ids
+job_offers_changed = _signals.signal("job-offers-changed")
+
+# Se creó, editó o borró un usuario: kwargs user_ids
+users_changed = _signals.signal("users-changed")
+
+# Se creó, renombró o borró una skill: kwargs skill_ids
+skills_changed = _signals.signal("skills-changed")
@@ -0,0 +1,140 @@
+import bisect
+import heapq
+from array import array
+from threading import Lock
+
+from . import db
+from .cache import on_invalidation
+from .models import UserSkill
+
+
+class SkillIndex:
+    """Índice invertido en memoria: skill_id -> postings (user_id, level).
+
+    Cada posting list guarda los user_id ordenados en un `array` y, en
+    paralelo, el nivel numérico de cada usuario para esa skill. Las listas
+    se cargan bajo demanda desde `user_skills` y se invalidan por skill.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._lock = Lock()
+
+    def invalidate(self, skill_ids=None):
+        """Descarta las posting lists de `skill_ids` (o todas si es None)."""
+        with self._lock:
+            if skill_ids is None:
+                self._postings.clear()
+            else:
+                for skill_id in skill_ids:
+                    self._postings.pop(skill_id, None)
+
+    def postings(self, skill_ids):
+        """Devuelve {skill_id: (user_ids, levels)} cargando lo que falte en una query."""
+        with self._lock:
+            missing = [s for s in set(skill_ids) if s not in self._postings]
+            if missing:
+                self._load(missing)
+            return {s: self._postings[s] for s in skill_ids}
+
+    def _load(self, skill_ids):
+        loaded = {s: (array("l"), array("b")) for s in skill_ids}
+        rows = (
+            db.session.query(UserSkill.skill_id, UserSkill.user_id, UserSkill.level)
+            .filter(UserSkill.skill_id.in_(skill_ids))
+            .order_by(UserSkill.skill_id, UserSkill.user_id)
+        )
+        for skill_id, user_id, level in rows:
+            user_ids, levels = loaded[skill_id]
+            # Filas duplicadas del mismo usuario: nos quedamos con el nivel más alto
+            if user_ids and user_ids[-1] == user_id:
+                levels[-1] = max(levels[-1], level)
+                continue
+            user_ids.append(user_id)
+            levels.append(level)
+        self._postings.update(loaded)
+
+
+skill_index = SkillIndex()
+
+
+@on_invalidation("user_skills_changed")
+def _on_user_skills_changed(user_ids=None, skill_ids=None):
+    skill_index.invalidate(skill_ids)
+
+
+class _Cursor:
+    __slots__ = ("user_ids", "levels", "required", "weight", "pos")
+
+    def __init__(self, user_ids, levels, required, weight):
+        self.user_ids = user_ids
+        self.levels = levels
+        self.required = required
+        self.weight = weight
+        self.pos = 0
+
+    @property
+    def current(self):
+        return self.user_ids[self.pos]
+
+    @property
+    def exhausted(self):
+        return self.pos >= len(self.user_ids)
+
+
+def top_k_candidates(lists, k, partial=False):
+    """Rankea usuarios recorriendo posting lists con WAND.
+
+    `lists` es una lista de (user_ids, levels, nivel requerido, peso), una
+    por requisito de la oferta. Solo se visitan usuarios que tienen alguna
+    de las skills requeridas y se saltan (vía bisect) los que, aun
+    cumpliendo todas las listas restantes, no alcanzan al top K actual.
+    Con `partial` un nivel insuficiente suma peso * nivel / requerido
+    (ver `weighted_credit`). Devuelve hasta `k` tuplas (user_id, score) de
+    mayor a menor score.
+    """
+    cursors = [_Cursor(*spec) for spec in lists if len(spec[0])]
+    heap = []  # min-heap de (score, -user_id)
+
+    while cursors:
+        # Un usuario entra solo si supera estrictamente al peor del heap
+        threshold = heap[0][0] if len(heap) >= k else 0
+        cursors.sort(key=lambda c: c.current)
+
+        upper_bound = 0
+        pivot = None
+        for i, cursor in enumerate(cursors):
+            upper_bound += cursor.weight
+            if upper_bound > threshold:
+                pivot = i
+                break
+        if pivot is None:
+            # Ningún usuario pendiente puede entrar al top K
+            break
+
+        pivot_user = cursors[pivot].current
+        if cursors[0].current == pivot_user:
+            score = 0
+            for cursor in cursors:
+                if cursor.current != pivot_user:
+                    break
+                level = cursor.levels[cursor.pos]
+                if level >= cursor.required:
+                    score += cursor.weight
+                elif partial:
+                    score += cursor.weight * level // cursor.required
+                cursor.pos += 1
+            if score > threshold:
+                entry = (score, -pivot_user)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heapreplace(heap, entry)
+        else:
+            # Adelantar las listas previas al pivote sin evaluar a nadie
+            for cursor in cursors[:pivot]:
+                cursor.pos = bisect.bisect_left(cursor.user_ids, pivot_user, cursor.pos)
+
+        cursors = [c for c in cursors if not c.exhausted]
+
+    return [(-neg_user_id, score) for score, neg_user_id in sorted(heap, reverse=True)]
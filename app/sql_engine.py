@@ -0,0 +1,90 @@
+from sqlalchemy import Float, Integer, case, cast, func, select
+
+from . import db
+from .matching import DEFAULT_IMPORTANCE, LEVEL_SCALE
+from .models import JobOffer, JobSkillRequirement, UserSkill
+
+# Motor de matching que deja toda la reducción a la base de datos: una sola
+# consulta agregada por ranking, que devuelve K filas en vez de todos los
+# requisitos. Misma interfaz y orden que MatchEngine (app/engine.py).
+#
+# La compatibilidad se calcula igual que en los otros motores: en modo count
+# con la misma cuenta en punto flotante que int((matched / total) * 100) (con
+# división entera 29/50 daría 58 en vez de 57), en modo ponderado con
+# división entera.
+
+requirements = JobSkillRequirement.__table__
+user_skills = UserSkill.__table__
+
+
+def _score(user_level, weighted):
+    """Aporte de un requisito; `user_level` es NULL si el usuario no tiene la skill."""
+    required = requirements.c.level_required
+    if not weighted:
+        return case((user_level >= required, 1), else_=0)
+    weight = func.coalesce(requirements.c.importance, DEFAULT_IMPORTANCE) * LEVEL_SCALE
+    # Igual que matching.weighted_credit: completo, proporcional o 0
+    return case(
+        (user_level.is_(None), 0),
+        (user_level >= required, weight),
+        else_=weight * user_level // required,
+    )
+
+
+def _compatibility(score, total, weighted):
+    if weighted:
+        return score * 100 // total
+    return cast(func.floor(cast(score, Float) / total * 100), Integer)
+
+
+def _total(weighted):
+    if not weighted:
+        return func.count()
+    return func.sum(func.coalesce(requirements.c.importance, DEFAULT_IMPORTANCE) * LEVEL_SCALE)
+
+
+def top_offers(user_id, k, weighted=False):
+    """Top K ofertas activas para un usuario: (offer_id, compat, score, total)."""
+    levels = (
+        select(user_skills.c.skill_id, user_skills.c.level)
+        .where(user_skills.c.user_id == user_id)
+        .subquery()
+    )
+    score = func.sum(_score(levels.c.level, weighted))
+    total = _total(weighted)
+    compatibility = _compatibility(score, total, weighted)
+
+    stmt = (
+        select(requirements.c.job_offer_id, compatibility, score, total)
+        .select_from(
+            requirements.join(JobOffer, JobOffer.id == requirements.c.job_offer_id)
+            .outerjoin(levels, levels.c.skill_id == requirements.c.skill_id)
+        )
+        .where(JobOffer.is_active.isnot(False))
+        .group_by(requirements.c.job_offer_id)
+        .order_by(compatibility.desc(), score.desc(), requirements.c.job_offer_id)
+        .limit(k)
+    )
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
+def top_users(offer_id, k, weighted=False):
+    """Top K usuarios con score positivo: ([(user_id, score)], total)."""
+    score = func.sum(_score(user_skills.c.level, weighted))
+
+    # Solo los usuarios que tienen alguna skill pedida (JOIN interno)
+    stmt = (
+        select(user_skills.c.user_id, score)
+        .select_from(
+            requirements.join(user_skills, user_skills.c.skill_id == requirements.c.skill_id)
+        )
+        .where(requirements.c.job_offer_id == offer_id)
+        .group_by(user_skills.c.user_id)
+        .having(score > 0)
+        .order_by(score.desc(), user_skills.c.user_id)
+        .limit(k)
+    )
+    total = db.session.execute(
+        select(_total(weighted)).where(requirements.c.job_offer_id == offer_id)
+    ).scalar()
+    return [tuple(row) for row in db.session.execute(stmt)], int(total or 0)
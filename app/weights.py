@@ -0,0 +1,102 @@
+from collections import namedtuple
+from threading import Lock
+
+from . import db
+from .cache import on_invalidation
+from .matching import DEFAULT_IMPORTANCE, LEVEL_SCALE
+from .models import JobOffer, JobSkillRequirement
+
+# Requisitos de una oferta listos para puntuar: tuplas paralelas por skill,
+# `weights` = importancia y `total_weight` = suma de importancias * LEVEL_SCALE.
+# El vector normalizado de la oferta es weights[i] * LEVEL_SCALE / total_weight.
+OfferProfile = namedtuple("OfferProfile", "skill_ids levels weights total_weight")
+
+
+class OfferWeights:
+    """Perfiles ponderados de las ofertas activas, precalculados en memoria.
+
+    Se cargan todos en una query la primera vez que se usan y después solo
+    se recalculan las ofertas cuyos requisitos (o estado) cambian.
+    """
+
+    def __init__(self):
+        self._profiles = None
+        self._lock = Lock()
+
+    def profiles(self):
+        """Devuelve {job_offer_id: OfferProfile} para todas las ofertas activas."""
+        with self._lock:
+            if self._profiles is None:
+                self._profiles = self._load()
+            return self._profiles
+
+    def get(self, offer_id):
+        """Perfil de una oferta: del cache si está activa, o calculado al vuelo."""
+        profile = self.profiles().get(offer_id)
+        if profile is None:
+            profile = self._load([offer_id], active_only=False).get(offer_id)
+        return profile
+
+    def refresh(self, offer_ids):
+        """Recalcula los perfiles de `offer_ids` (si el cache ya estaba cargado)."""
+        with self._lock:
+            if offer_ids is None:
+                self._profiles = None
+            if self._profiles is None or not offer_ids:
+                return
+            profiles = dict(self._profiles)
+            for offer_id in offer_ids:
+                profiles.pop(offer_id, None)
+            profiles.update(self._load(offer_ids))
+            # Se reemplaza el dict completo para que los lectores nunca vean uno a medias
+            self._profiles = profiles
+
+    def clear(self):
+        with self._lock:
+            self._profiles = None
+
+    @staticmethod
+    def _load(offer_ids=None, active_only=True):
+        query = (
+            db.session.query(
+                JobSkillRequirement.job_offer_id,
+                JobSkillRequirement.skill_id,
+                JobSkillRequirement.level_required,
+                JobSkillRequirement.importance,
+            )
+            .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+        )
+        if active_only:
+            query = query.filter(JobOffer.is_active.isnot(False))
+        if offer_ids is not None:
+            query = query.filter(JobSkillRequirement.job_offer_id.in_(list(offer_ids)))
+
+        grouped = {}
+        for offer_id, skill_id, level, importance in query.order_by(JobSkillRequirement.id):
+            skill_ids, levels, weights = grouped.setdefault(offer_id, ([], [], []))
+            skill_ids.append(skill_id)
+            levels.append(level)
+            weights.append(importance or DEFAULT_IMPORTANCE)
+
+        return {
+            offer_id: OfferProfile(
+                tuple(skill_ids),
+                tuple(levels),
+                tuple(weights),
+                sum(weights) * LEVEL_SCALE,
+            )
+            for offer_id, (skill_ids, levels, weights) in grouped.items()
+        }
+
+
+offer_weights = OfferWeights()
+
+
+@on_invalidation("requirements_changed")
+def _on_requirements_changed(offer_ids=None, skill_ids=None):
+    offer_weights.refresh(offer_ids)
+
+
+@on_invalidation("job_offers_changed")
+def _on_job_offers_changed(offer_ids=None):
+    offer_weights.refresh(offer_ids)
@@ -0,0 +1,35 @@
+"""Benchmarks reproducibles de SkillMatch.
+
+- `bench.datagen`: datos sintéticos con semilla (popularidad de skills Zipf)
+  y carga masiva, de 10k a 10M filas.
+- `bench.scenarios` / `bench.runner`: escenarios contra el test client de
+  Flask y directo contra las funciones de scoring; resultados en JSON
+  (p50 / p99, throughput, RSS pico del escenario) para comparar entre commits.
+
+Uso:
+    python -m bench load --scale 100k
+    python -m bench run --scale 100k --out before.json
+    python -m bench compare before.json after.json
+
+Los scripts sueltos (index_plans, lsh_recall, async_load) usan el mismo
+generador. Por defecto todo corre sobre una base SQLite temporal; con
+BENCH_DATABASE_URL se puede apuntar a Postgres (¡la base se borra y se
+vuelve a crear!).
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+DEFAULT_DATABASE_URL = "sqlite:///" + os.path.join(
+    tempfile.gettempdir(), "skillmatch-bench.sqlite3"
+)
+
+
+def use_bench_database():
+    """Apunta la app a la base de benchmarks (antes de importar `app`)."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL)
+    return os.environ["DATABASE_URL"]
@@ -0,0 +1,127 @@
+"""python -m bench {load,run,compare} — ver `bench/__init__.py`."""
+import argparse
+import os
+import sys
+
+from . import use_bench_database
+
+
+def add_dataset_args(parser):
+    parser.add_argument("--scale", default="10k", help="10k, 100k, 1m o 10m (filas aproximadas).")
+    parser.add_argument("--users", type=int, help="Pisa la cantidad de usuarios de la escala.")
+    parser.add_argument("--skills", type=int, help="Pisa la cantidad de skills de la escala.")
+    parser.add_argument("--offers", type=int, help="Pisa la cantidad de ofertas de la escala.")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def dataset_spec(args):
+    from .datagen import SCALES
+
+    if args.scale not in SCALES:
+        sys.exit(f"--scale debe ser uno de: {', '.join(SCALES)}")
+    overrides = {
+        field: getattr(args, field)
+        for field in ("users", "skills", "offers")
+        if getattr(args, field) is not None
+    }
+    return SCALES[args.scale]._replace(**overrides)
+
+
+def load_dataset(args, spec):
+    from app import db
+    from .datagen import expected_rows, load
+
+    print(f"Generando ~{expected_rows(spec):,} filas ({args.scale}, seed={args.seed})…")
+    result = load(spec, args.seed)
+    if getattr(args, "scores", False):
+        from app.scores import rebuild_all_scores
+
+        print("  match_scores…")
+        rebuild_all_scores()
+    db.session.commit()
+    print(f"Carga lista en {result['seconds']:.1f}s")
+    return result
+
+
+def load_command(args):
+    from app import create_app
+
+    spec = dataset_spec(args)
+    app = create_app()
+    with app.app_context():
+        load_dataset(args, spec)
+
+
+def run_command(args):
+    from app import create_app
+    from .runner import metadata, run_suite, save
+    from .scenarios import DEFAULT_SCENARIOS, SCENARIOS
+
+    scenarios = args.scenarios.split(",") if args.scenarios else DEFAULT_SCENARIOS
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Escenarios desconocidos: {', '.join(unknown)} (hay: {', '.join(SCENARIOS)})")
+
+    spec = dataset_spec(args)
+    app = create_app()
+    with app.app_context():
+        load_result = None if args.no_load else load_dataset(args, spec)
+        meta = metadata(os.environ["DATABASE_URL"], args.scale, spec, args.seed, load_result)
+        print()
+        results = run_suite(
+            app, spec, scenarios, args.seed, args.requests, args.duration, args.warmup
+        )
+
+    out = args.out or f"bench-{args.scale}-{(meta['commit'] or 'nogit')[:8]}.json"
+    save(out, meta, results)
+    print(f"\nResultados en {out}")
+
+
+def compare_command(args):
+    from .runner import compare
+
+    regressions = compare(args.old, args.new, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} métricas empeoraron más de {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks de SkillMatch.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="Genera y carga el dataset sintético.")
+    add_dataset_args(load)
+    load.add_argument("--scores", action="store_true", help="Calcula también match_scores.")
+    load.set_defaults(handler=load_command)
+
+    run = commands.add_parser("run", help="Carga el dataset y corre los escenarios.")
+    add_dataset_args(run)
+    run.add_argument("--scenarios", help="Lista separada por comas (por defecto todos).")
+    run.add_argument("--requests", type=int, default=500, help="Operaciones medidas por escenario.")
+    run.add_argument("--duration", type=float, default=30, help="Tope de segundos por escenario.")
+    run.add_argument("--warmup", type=int, default=20, help="Operaciones sin medir antes de cada escenario.")
+    run.add_argument("--no-load", action="store_true", help="Usa la base ya cargada (misma escala y seed).")
+    run.add_argument("--scores", action="store_true", help="Calcula match_scores al cargar.")
+    run.add_argument("--cache", action="store_true", help="Deja prendido el cache de match.")
+    run.add_argument("--out", help="Archivo JSON de salida.")
+    run.set_defaults(handler=run_command)
+
+    diff = commands.add_parser("compare", help="Compara dos corridas (sale con 1 si hay regresiones).")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.10, help="Cambio relativo tolerado.")
+    diff.set_defaults(handler=compare_command)
+
+    args = parser.parse_args()
+    if args.command != "compare":
+        # La config se lee al importar `app`: todo esto va antes
+        use_bench_database()
+        if not getattr(args, "cache", False):
+            # Sin cache de match: cada request llega al cálculo
+            os.environ["MATCH_CACHE_MAX_ENTRIES"] = "0"
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
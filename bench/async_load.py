@@ -0,0 +1,169 @@
+"""Prueba de carga: modo sync (Gunicorn + hilos) contra modo async (Uvicorn + app.asgi).
+
+Siembra una base, levanta los dos servidores con la misma cantidad de
+procesos y golpea los endpoints de match y listados con N clientes
+concurrentes durante unos segundos. El cache de match se desactiva en los
+servidores para que cada request vaya a la base.
+
+Uso:
+    python bench/async_load.py [--concurrency 64] [--duration 15] [--workers 2] [--threads 8]
+
+Por defecto usa una base SQLite temporal; con BENCH_DATABASE_URL se puede
+apuntar a Postgres (¡la base se borra y se vuelve a crear!). Necesita
+gunicorn y uvicorn instalados.
+"""
+import argparse
+import http.client
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from bench import use_bench_database  # noqa: E402
+
+use_bench_database()
+
+from app import create_app  # noqa: E402
+from bench.datagen import DatasetSpec, load  # noqa: E402
+
+HOST = "127.0.0.1"
+SYNC_PORT = 8701
+ASYNC_PORT = 8702
+
+
+def scenarios(n_users, n_offers):
+    """Generadores de URLs por escenario (cada llamada devuelve una URL al azar)."""
+    return {
+        "match": lambda rnd: (
+            f"/api/match/user/{rnd.randint(1, n_users)}/job_offer/{rnd.randint(1, n_offers)}"
+        ),
+        "top": lambda rnd: f"/api/match/user/{rnd.randint(1, n_users)}/top?k=5",
+        "list": lambda rnd: f"/api/job_offers?after_id={rnd.randint(0, n_offers)}&limit=50",
+    }
+
+
+def start_server(mode, port, workers, threads):
+    env = {
+        **os.environ,
+        # Sin cache de match: cada request llega a la base
+        "MATCH_CACHE_MAX_ENTRIES": "0",
+    }
+    if mode == "sync":
+        cmd = [
+            sys.executable, "-m", "gunicorn", "app:create_app()",
+            "--bind", f"{HOST}:{port}", "--workers", str(workers),
+            "--threads", str(threads), "--worker-class", "gthread", "--log-level", "warning",
+        ]
+    else:
+        cmd = [
+            sys.executable, "-m", "uvicorn", "--factory", "app.asgi:create_asgi_app",
+            "--host", HOST, "--port", str(port), "--workers", str(workers),
+            "--log-level", "warning", "--no-access-log",
+        ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"El servidor {mode} no arrancó")
+
+
+def run_load(port, make_url, concurrency, duration, seed_value):
+    """N hilos con conexión keep-alive cada uno; devuelve (latencias ms, errores)."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        rnd = random.Random(seed_value + i)
+        conn = http.client.HTTPConnection(HOST, port, timeout=30)
+        local, failed = [], 0
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", make_url(rnd))
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection(HOST, port, timeout=30)
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else (values or [0])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--offers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=2, help="Procesos por servidor.")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos por proceso en modo sync.")
+    parser.add_argument("--scenarios", default="match,top,list")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"Sembrando {args.users} usuarios, {args.offers} ofertas…")
+        spec = DatasetSpec(
+            users=args.users,
+            skills=args.skills,
+            offers=args.offers,
+            skills_per_user=(3, 15),
+            requirements_per_offer=(2, 10),
+        )
+        load(spec, args.seed, log=lambda message: None)
+
+    urls = scenarios(args.users, args.offers)
+    print(
+        f"\n{args.concurrency} clientes, {args.duration:.0f}s por escenario, "
+        f"{args.workers} procesos (sync: {args.threads} hilos c/u)\n"
+    )
+    print(f"{'escenario':<8} {'modo':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for mode, port in (("sync", SYNC_PORT), ("async", ASYNC_PORT)):
+        proc = start_server(mode, port, args.workers, args.threads)
+        try:
+            for name in args.scenarios.split(","):
+                latencies, errors = run_load(port, urls[name], args.concurrency, args.duration, args.seed)
+                print(
+                    f"{name:<8} {mode:<6} {len(latencies) / args.duration:>8.0f} "
+                    f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f} {errors:>8}"
+                )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
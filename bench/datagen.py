@@ -0,0 +1,329 @@
+"""Generador de datos sintéticos y carga masiva para los benchmarks.
+
+Todo sale de una semilla: la misma (spec, seed) produce exactamente las
+mismas filas, con ids explícitos, así los resultados se pueden comparar
+entre commits.
+
+- Popularidad de skills Zipf: la skill de rango r aparece con probabilidad
+  proporcional a 1 / r^exponente (pocas skills muy comunes, cola larga).
+  El rango se mapea a ids al azar para no correlacionar popularidad con id.
+- Con `roles` > 0 cada usuario / oferta pertenece a un rol con su propio
+  pool de skills (como en un catálogo real) más alguna skill suelta.
+- La carga va por tandas: COPY en Postgres, executemany del driver en SQLite. Los
+  índices secundarios se borran antes y se recrean al final.
+"""
+import io
+import time
+from collections import namedtuple
+from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+from sqlalchemy import text
+
+from app import db
+from app import lsh
+from app.cache import match_cache
+from app.catalog import skill_catalog
+from app.engine import invalidate_engine
+from app.models import JobOffer, JobSkillRequirement, Skill, User, UserSkill
+from app.search import offer_search
+from app.skill_index import skill_index
+from app.weights import offer_weights
+
+DatasetSpec = namedtuple(
+    "DatasetSpec",
+    "users skills offers skills_per_user requirements_per_offer active_ratio roles zipf_exponent",
+    defaults=((3, 17), (2, 10), 0.8, 0, 1.1),
+)
+
+# Escalas predefinidas (filas totales aproximadas en las cinco tablas)
+SCALES = {
+    "10k": DatasetSpec(users=800, skills=200, offers=300),
+    "100k": DatasetSpec(users=8_000, skills=500, offers=3_000),
+    "1m": DatasetSpec(users=80_000, skills=2_000, offers=30_000),
+    "10m": DatasetSpec(users=800_000, skills=5_000, offers=300_000),
+}
+
+# Skills de cada pool de rol y skills sueltas (fuera del rol) por fila
+ROLE_POOL_SIZE = 15
+ROLE_EXTRA_SKILLS = (0, 2)
+
+COMPANIES = 500
+LOCATIONS = ("Remote", "Santiago", "Buenos Aires", "Lima", "Bogotá", "Ciudad de México")
+SENIORITIES = ("junior", "mid", "senior")
+
+# Fecha fija para created_at / updated_at: mismos ETags en cada carga
+GENERATED_AT = datetime(2024, 1, 1)
+
+# Filas por tanda al generar y al insertar
+CHUNK_SIZE = 50_000
+
+
+def zipf_weights(n, exponent):
+    """Probabilidad de cada rango 1..n con una ley de Zipf truncada."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def expected_rows(spec):
+    """Filas aproximadas que genera `spec` (para elegir escala)."""
+    per_user = sum(spec.skills_per_user) / 2
+    per_offer = sum(spec.requirements_per_offer) / 2
+    return int(
+        spec.users * (1 + per_user) + spec.offers * (1 + per_offer) + spec.skills
+    )
+
+
+class SkillSampler:
+    """Elige conjuntos de skills sin repetir según la popularidad Zipf (o el rol)."""
+
+    def __init__(self, spec, rng):
+        self.rng = rng
+        self.n = spec.skills
+        self.probabilities = zipf_weights(spec.skills, spec.zipf_exponent)
+        # rango de popularidad → skill_id
+        self.skill_ids = rng.permutation(spec.skills) + 1
+        self.pools = [
+            self.skill_ids[
+                rng.choice(spec.skills, size=min(ROLE_POOL_SIZE, spec.skills), replace=False, p=self.probabilities)
+            ]
+            for _ in range(spec.roles)
+        ]
+
+    def popular(self, rows, counts):
+        """Para cada fila, `counts[i]` skills distintas según Zipf."""
+        width = max(int(counts.max()) * 2, 1) if rows else 1
+        draws = self.skill_ids[
+            self.rng.choice(self.n, size=(rows, width), p=self.probabilities)
+        ]
+        # Con Zipf las skills populares se repiten: se toman las primeras distintas
+        return [list(dict.fromkeys(row.tolist()))[:count] for row, count in zip(draws, counts)]
+
+    def by_role(self, rows, counts):
+        """Skills del pool de un rol al azar más alguna skill suelta."""
+        roles = self.rng.integers(0, len(self.pools), size=rows)
+        extras = self.popular(rows, self.rng.integers(ROLE_EXTRA_SKILLS[0], ROLE_EXTRA_SKILLS[1] + 1, size=rows))
+        picked = []
+        for role, count, extra in zip(roles, counts, extras):
+            pool = self.pools[role]
+            own = self.rng.choice(pool, size=min(int(count), len(pool)), replace=False).tolist()
+            picked.append(list(dict.fromkeys(own + extra)))
+        return picked
+
+    def sample(self, rows, counts):
+        return self.by_role(rows, counts) if self.pools else self.popular(rows, counts)
+
+
+def _ranges(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield start, min(start + chunk_size, total)
+
+
+def generate(spec, seed, chunk_size=CHUNK_SIZE):
+    """Genera (modelo, filas) por tandas, en orden de carga (padres antes que hijos)."""
+    rng = np.random.default_rng(seed)
+    sampler = SkillSampler(spec, rng)
+
+    yield Skill, [
+        {"id": i, "name": f"skill-{i}", "updated_at": GENERATED_AT}
+        for i in range(1, spec.skills + 1)
+    ]
+
+    for start, end in _ranges(spec.users, chunk_size):
+        yield User, [
+            {
+                "id": i,
+                "name": f"user {i}",
+                "email": f"u{i}@bench.local",
+                "created_at": GENERATED_AT,
+                "updated_at": GENERATED_AT,
+            }
+            for i in range(start + 1, end + 1)
+        ]
+
+    company_weights = zipf_weights(COMPANIES, 1.0)
+    for start, end in _ranges(spec.offers, chunk_size):
+        rows = end - start
+        companies = rng.choice(COMPANIES, size=rows, p=company_weights)
+        locations = rng.integers(0, len(LOCATIONS), size=rows)
+        seniorities = rng.integers(0, len(SENIORITIES), size=rows)
+        active = rng.random(rows) < spec.active_ratio
+        yield JobOffer, [
+            {
+                "id": start + i + 1,
+                "title": f"offer {start + i + 1}",
+                "company": f"company-{companies[i] + 1}",
+                "location": LOCATIONS[locations[i]],
+                "seniority": SENIORITIES[seniorities[i]],
+                "is_active": bool(active[i]),
+                "created_at": GENERATED_AT,
+                "updated_at": GENERATED_AT,
+            }
+            for i in range(rows)
+        ]
+
+    next_id = 1
+    low, high = spec.skills_per_user
+    for start, end in _ranges(spec.users, chunk_size):
+        rows = end - start
+        skill_sets = sampler.sample(rows, rng.integers(low, high + 1, size=rows))
+        levels = rng.integers(1, 4, size=sum(len(s) for s in skill_sets)).tolist()
+        chunk = []
+        for offset, skill_ids in enumerate(skill_sets):
+            for skill_id in skill_ids:
+                chunk.append({
+                    "id": next_id,
+                    "user_id": start + offset + 1,
+                    "skill_id": skill_id,
+                    "level": levels[len(chunk)],
+                    "updated_at": GENERATED_AT,
+                })
+                next_id += 1
+        yield UserSkill, chunk
+
+    next_id = 1
+    low, high = spec.requirements_per_offer
+    for start, end in _ranges(spec.offers, chunk_size):
+        rows = end - start
+        skill_sets = sampler.sample(rows, rng.integers(low, high + 1, size=rows))
+        total = sum(len(s) for s in skill_sets)
+        levels = rng.integers(1, 4, size=total).tolist()
+        importances = rng.integers(1, 6, size=total).tolist()
+        chunk = []
+        for offset, skill_ids in enumerate(skill_sets):
+            for skill_id in skill_ids:
+                chunk.append({
+                    "id": next_id,
+                    "job_offer_id": start + offset + 1,
+                    "skill_id": skill_id,
+                    "level_required": levels[len(chunk)],
+                    "importance": importances[len(chunk)],
+                    "updated_at": GENERATED_AT,
+                })
+                next_id += 1
+        yield JobSkillRequirement, chunk
+
+
+def _copy_rows(connection, model, rows):
+    """COPY FROM STDIN (Postgres): varias veces más rápido que los INSERT.
+
+    Formato texto sin escapar: los valores generados no tienen tabs,
+    saltos de línea ni barras invertidas.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(
+            "\\N" if row[c] is None else ("t" if row[c] is True else "f" if row[c] is False else str(row[c]))
+            for c in columns
+        ))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = connection.connection.driver_connection.cursor()
+    cursor.copy_expert(
+        f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN", buffer
+    )
+
+
+def _insert_rows(connection, model, rows):
+    """executemany a nivel driver, sin compilar un INSERT de SQLAlchemy por tanda.
+
+    Los valores pasan por el bind processor del dialecto de cada columna;
+    como se repiten mucho (fechas, booleanos) se memorizan.
+    """
+    table = model.__table__
+    columns = list(rows[0])
+    getter = itemgetter(*columns)
+    processors = [
+        (i, process, {})
+        for i, c in enumerate(columns)
+        if (process := table.c[c].type.dialect_impl(connection.dialect).bind_processor(connection.dialect))
+    ]
+    params = []
+    for row in rows:
+        values = getter(row)
+        if processors:
+            values = list(values)
+            for i, process, memo in processors:
+                value = values[i]
+                if value is not None:
+                    if value not in memo:
+                        memo[value] = process(value)
+                    values[i] = memo[value]
+        params.append(tuple(values))
+    placeholders = ", ".join("?" for _ in columns)
+    connection.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", params
+    )
+
+
+BENCH_TABLES = (Skill, User, JobOffer, UserSkill, JobSkillRequirement)
+
+
+def load(spec, seed, chunk_size=CHUNK_SIZE, log=print):
+    """Borra la base, la vuelve a crear y carga el dataset de `spec`.
+
+    Devuelve {tabla: filas} más los segundos que tardó.
+    """
+    started = time.perf_counter()
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+    engine = db.engine
+    dialect = engine.dialect.name
+    indexes = [ix for model in BENCH_TABLES for ix in model.__table__.indexes]
+    for index in indexes:
+        index.drop(engine)
+
+    counts = {model.__tablename__: 0 for model in BENCH_TABLES}
+    with engine.begin() as connection:
+        if dialect == "sqlite":
+            # Solo durante la carga: si se corta, la base se vuelve a generar
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+            connection.exec_driver_sql("PRAGMA journal_mode = MEMORY")
+        for model, rows in generate(spec, seed, chunk_size):
+            if not rows:
+                continue
+            if dialect == "postgresql":
+                _copy_rows(connection, model, rows)
+            else:
+                _insert_rows(connection, model, rows)
+            counts[model.__tablename__] += len(rows)
+            log(f"  {model.__tablename__}: {counts[model.__tablename__]:,} filas")
+
+        if dialect == "postgresql":
+            # Con ids explícitos las secuencias quedan atrás
+            for model in BENCH_TABLES:
+                table = model.__tablename__
+                connection.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+                )
+
+    # Las conexiones del pool quedaron con los PRAGMA de la carga
+    engine.dispose()
+    log("  índices…")
+    for index in indexes:
+        index.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+    reset_in_memory_state()
+    return {**counts, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def reset_in_memory_state():
+    """Descarta índices y caches en memoria armados antes de la carga.
+
+    La carga no pasa por la API, así que no emite las señales de
+    invalidación: todo lo derivado de la base se vuelve a leer al primer uso.
+    """
+    skill_catalog.clear()
+    skill_index.invalidate()
+    offer_weights.clear()
+    offer_search.clear()
+    lsh.lsh_index.clear()
+    invalidate_engine()
+    match_cache.backend.clear()
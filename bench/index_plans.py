@@ -0,0 +1,150 @@
+"""Planes de consulta y latencias del matching antes/después de los índices.
+
+Siembra una base con datos sintéticos, corre las consultas del matching sin
+los índices de las revisiones 5b2d9e4f7a13 y e8f3b6c2a519, los crea y repite
+la medición.
+
+Uso:
+    python bench/index_plans.py [--users 20000] [--offers 2000] [--runs 200]
+
+Por defecto usa una base SQLite temporal; con BENCH_DATABASE_URL se puede
+apuntar a Postgres (¡la base se borra y se vuelve a crear!).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench import use_bench_database  # noqa: E402
+
+use_bench_database()
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import JobOffer, JobSkillRequirement  # noqa: E402
+from bench.datagen import DatasetSpec, load  # noqa: E402
+
+# Índices que agrega la migración (los mismos que declara models.py)
+MATCHING_INDEXES = (
+    "uq_user_skills_user_skill",
+    "ix_user_skills_skill_user",
+    "uq_job_skill_requirements_offer_skill",
+    "ix_job_offers_active",
+)
+
+# Consultas del matching: (sql, parámetro aleatorio). Las de ofertas activas
+# usan las mismas expresiones que los motores, así el plan es el de la app
+QUERIES = {
+    "skills de un usuario": (
+        "SELECT skill_id, level FROM user_skills WHERE user_id = :id",
+        "user",
+    ),
+    "requisitos de una oferta": (
+        "SELECT skill_id, level_required, importance "
+        "FROM job_skill_requirements WHERE job_offer_id = :id",
+        "offer",
+    ),
+    "usuarios con una skill": (
+        "SELECT user_id, level FROM user_skills WHERE skill_id = :id",
+        "skill",
+    ),
+    "ofertas activas": (
+        select(JobOffer.id).where(JobOffer.is_active.isnot(False)),
+        None,
+    ),
+    "requisitos de ofertas activas": (
+        select(
+            JobSkillRequirement.job_offer_id,
+            JobSkillRequirement.skill_id,
+            JobSkillRequirement.level_required,
+        )
+        .join(JobOffer, JobOffer.id == JobSkillRequirement.job_offer_id)
+        .where(JobOffer.is_active.isnot(False)),
+        None,
+    ),
+}
+
+
+def matching_indexes():
+    tables = db.metadata.tables.values()
+    return [ix for table in tables for ix in table.indexes if ix.name in MATCHING_INDEXES]
+
+
+def statement(sql):
+    return text(sql) if isinstance(sql, str) else sql
+
+
+def explain(sql, params):
+    if not isinstance(sql, str):
+        sql = str(sql.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    if db.engine.dialect.name == "postgresql":
+        rows = db.session.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params)
+        return [row[0] for row in rows]
+    rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql), params)
+    return [row[-1] for row in rows]
+
+
+def measure(label, sizes, runs, rnd):
+    print(f"\n=== {label} ===")
+    for name, (sql, kind) in QUERIES.items():
+        stmt = statement(sql)
+        timings = []
+        for _ in range(runs):
+            params = {"id": rnd.randint(1, sizes[kind])} if kind else {}
+            start = time.perf_counter()
+            db.session.execute(stmt, params).all()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(
+            f"\n{name}: mean={statistics.mean(timings):.3f}ms "
+            f"p50={timings[len(timings) // 2]:.3f}ms "
+            f"p99={timings[int(len(timings) * 0.99) - 1]:.3f}ms"
+        )
+        params = {"id": 1} if kind else {}
+        for line in explain(sql, params):
+            print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--offers", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    sizes = {"user": args.users, "skill": args.skills, "offer": args.offers}
+
+    app = create_app()
+    with app.app_context():
+        print(f"Sembrando {args.users} usuarios, {args.skills} skills y {args.offers} ofertas…")
+        spec = DatasetSpec(
+            users=args.users,
+            skills=args.skills,
+            offers=args.offers,
+            skills_per_user=(5, 30),
+            requirements_per_offer=(3, 15),
+            active_ratio=0.3,
+        )
+        load(spec, args.seed, log=lambda message: None)
+        indexes = matching_indexes()
+        for index in indexes:
+            index.drop(db.engine)
+        db.session.execute(text("ANALYZE"))
+        measure("sin índices", sizes, args.runs, rnd)
+
+        for index in indexes:
+            index.create(db.engine)
+        db.session.execute(text("ANALYZE"))
+        measure("con índices", sizes, args.runs, rnd)
+
+
+if __name__ == "__main__":
+    main()
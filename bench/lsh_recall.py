@@ -0,0 +1,116 @@
+"""Recall y latencia de la recuperación MinHash/LSH contra el top-K exacto.
+
+Siembra ofertas y usuarios agrupados por "rol" (cada rol tiene su pool de
+skills, como en un catálogo real) y, para cada configuración de firmas y
+bandas, compara el top-K de engine=lsh con el ranking exacto.
+
+Uso:
+    python bench/lsh_recall.py [--offers 20000] [--users 2000] [--queries 200] [--k 10]
+
+Por defecto usa una base SQLite temporal; con BENCH_DATABASE_URL se puede
+apuntar a Postgres (¡la base se borra y se vuelve a crear!).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench import use_bench_database  # noqa: E402
+
+use_bench_database()
+
+from app import create_app, db  # noqa: E402
+from app import lsh  # noqa: E402
+from app.matching import top_k_offers  # noqa: E402
+from app.models import UserSkill  # noqa: E402
+from app.weights import offer_weights  # noqa: E402
+from bench.datagen import DatasetSpec, load  # noqa: E402
+
+# (LSH_NUM_PERM, LSH_BANDS) a comparar
+CONFIGS = ((64, 8), (64, 16), (64, 32), (128, 64), (64, 64))
+
+
+def exact_top(user_id, k):
+    user_levels = dict(
+        db.session.query(UserSkill.skill_id, UserSkill.level).filter(UserSkill.user_id == user_id)
+    )
+    requirements = (
+        (offer_id, skill_id, level)
+        for offer_id, profile in offer_weights.profiles().items()
+        for skill_id, level in zip(profile.skill_ids, profile.levels)
+    )
+    return top_k_offers(user_levels, requirements, k)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--offers", type=int, default=20000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--roles", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        print(f"Sembrando {args.users} usuarios y {args.offers} ofertas ({args.roles} roles)…")
+        spec = DatasetSpec(
+            users=args.users,
+            skills=args.skills,
+            offers=args.offers,
+            skills_per_user=(5, 12),
+            requirements_per_offer=(4, 10),
+            active_ratio=1.0,
+            roles=args.roles,
+        )
+        load(spec, args.seed, log=lambda message: None)
+
+        users = rnd.sample(range(1, args.users + 1), min(args.queries, args.users))
+        exact, exact_ms = {}, []
+        for user_id in users:
+            exact[user_id], elapsed = timed(exact_top, user_id, args.k)
+            exact_ms.append(elapsed)
+        print(f"\nexacto: p50={statistics.median(exact_ms):.2f}ms")
+
+        print(f"\n{'perm':>5} {'bandas':>6} {'filas':>5} {'recall@k':>9} {'candidatos':>10} {'p50 ms':>8} {'build s':>8}")
+        for num_perm, bands in CONFIGS:
+            app.config["LSH_NUM_PERM"], app.config["LSH_BANDS"] = num_perm, bands
+            lsh.lsh_index.clear()
+            _, build_ms = timed(lsh.lsh_index.candidates, {1: 1})
+
+            recalls, sizes, latencies = [], [], []
+            for user_id in users:
+                ranking, elapsed = timed(lsh.top_offers, user_id, args.k)
+                latencies.append(elapsed)
+                skill_ids = {
+                    s for (s,) in db.session.query(UserSkill.skill_id).filter(UserSkill.user_id == user_id)
+                }
+                sizes.append(len(lsh.lsh_index.candidates(skill_ids)))
+                # Recall sobre las ofertas del top exacto con alguna skill en común
+                expected = {offer_id for offer_id, compat, _, _ in exact[user_id] if compat > 0}
+                got = {offer_id for offer_id, _, _, _ in ranking}
+                if expected:
+                    recalls.append(len(expected & got) / len(expected))
+
+            print(
+                f"{num_perm:>5} {bands:>6} {num_perm // bands:>5} "
+                f"{statistics.mean(recalls):>9.3f} {statistics.mean(sizes):>10.0f} "
+                f"{statistics.median(latencies):>8.2f} {build_ms / 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
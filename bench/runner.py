@@ -0,0 +1,175 @@
+"""Corre escenarios, mide y guarda / compara resultados en JSON.
+
+Por escenario: warmup sin medir, después operaciones hasta llegar a
+`requests` o a `duration` segundos. Se registra p50 / p99 / media / máximo
+de latencia (ms), throughput (operaciones por segundo de reloj), errores y
+el RSS pico del escenario: en Linux el pico se reinicia antes de cada uno
+(`/proc/self/clear_refs`) y se lee de VmHWM. Donde no se puede, queda el
+pico de todo el proceso (`peak_rss_scope: "process"`) y `compare` no lo usa.
+"""
+import json
+import math
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from . import ROOT
+from .scenarios import SCENARIOS, BenchContext
+
+# Cambios relativos que `compare` marca como regresión (10 %)
+DEFAULT_THRESHOLD = 0.10
+
+
+def percentile(values, p):
+    """Percentil por rango más cercano sobre `values` ya ordenados."""
+    if not values:
+        return 0.0
+    rank = math.ceil(p / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def reset_peak_rss():
+    """Reinicia el pico de RSS del proceso (solo Linux); False si no se pudo."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    """Pico de RSS en KB desde el último reset_peak_rss (o desde que arrancó el proceso)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def measure(ctx, name, seed, requests, duration, warmup):
+    scenario = SCENARIOS[name]
+    rnd = random.Random(f"{seed}:{name}")
+
+    per_scenario = reset_peak_rss()
+    for _ in range(warmup):
+        scenario(ctx, rnd)()
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    deadline = started + duration
+    while len(latencies) < requests and time.perf_counter() < deadline:
+        operation = scenario(ctx, rnd)
+        op_started = time.perf_counter()
+        ok = operation()
+        latencies.append((time.perf_counter() - op_started) * 1000)
+        errors += not ok
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "mean_ms": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 4) if latencies else 0.0,
+        # Sobre el tiempo medido (incluye armar cada operación al azar)
+        "throughput_ops": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_kb": peak_rss_kb(),
+        "peak_rss_scope": "scenario" if per_scenario else "process",
+    }
+
+
+def run_suite(app, spec, scenarios, seed, requests, duration, warmup, log=print):
+    """Corre `scenarios` en orden y devuelve {nombre: resultados}."""
+    ctx = BenchContext(app, spec)
+    results = {}
+    log(f"{'escenario':<24} {'ops':>7} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'RSS MB':>8} {'errores':>7}")
+    for name in scenarios:
+        result = measure(ctx, name, seed, requests, duration, warmup)
+        results[name] = result
+        log(
+            f"{name:<24} {result['operations']:>7} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+            f"{result['throughput_ops']:>9.1f} {result['peak_rss_kb'] / 1024:>8.1f} {result['errors']:>7}"
+        )
+    return results
+
+
+def metadata(database_url, scale, spec, seed, load_result):
+    return {
+        **git_info(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": database_url.split(":", 1)[0],
+        "scale": scale,
+        "spec": spec._asdict(),
+        "seed": seed,
+        "load": load_result,
+        "rss_baseline_kb": peak_rss_kb(),
+    }
+
+
+def save(path, meta, results):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "scenarios": results}, f, indent=2)
+        f.write("\n")
+
+
+def compare(old_path, new_path, threshold=DEFAULT_THRESHOLD, log=print):
+    """Diferencias por escenario entre dos corridas; devuelve las regresiones."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    log(f"{old['meta'].get('commit') or '?'} → {new['meta'].get('commit') or '?'}")
+    if old["meta"].get("spec") != new["meta"].get("spec"):
+        log("⚠️  los datasets no son iguales: la comparación es orientativa")
+
+    # (métrica, mayor es peor)
+    metrics = (("p50_ms", True), ("p99_ms", True), ("throughput_ops", False), ("peak_rss_kb", True))
+    regressions = []
+    log(f"\n{'escenario':<24} " + " ".join(f"{m:>16}" for m, _ in metrics))
+    for name, after in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None:
+            continue
+        # El RSS acumulado del proceso depende del orden de los escenarios
+        rss_comparable = all(r.get("peak_rss_scope") == "scenario" for r in (before, after))
+        cells = []
+        for metric, higher_is_worse in metrics:
+            if not before[metric] or (metric == "peak_rss_kb" and not rss_comparable):
+                cells.append(f"{'—':>16}")
+                continue
+            change = (after[metric] - before[metric]) / before[metric]
+            worse = change > threshold if higher_is_worse else change < -threshold
+            if worse:
+                regressions.append((name, metric, change))
+            cells.append(f"{change:>+14.1%}{' !' if worse else '  '}")
+        log(f"{name:<24} " + " ".join(cells))
+    return regressions
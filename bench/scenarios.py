@@ -0,0 +1,173 @@
+"""Escenarios de benchmark: cada uno arma una operación al azar (con semilla).
+
+Los HTTP pasan por el test client de Flask (rutas, serialización, hooks);
+los "direct" llaman a las funciones de scoring sin la capa web, para
+separar cuánto cuesta el cálculo de cuánto cuesta todo lo demás.
+
+Un escenario es una función `(ctx, rnd) -> operación`, donde la operación
+no recibe argumentos y devuelve True si salió bien.
+"""
+from app import db
+from app.engine import get_engine
+from app.matching import top_k_offers, top_k_offers_weighted
+from app.models import JobSkillRequirement, UserSkill
+from app.weights import offer_weights
+
+TOP_K = 10
+PAGE_LIMIT = 50
+
+
+class BenchContext:
+    """Lo que comparten los escenarios: app, test client y tamaños del dataset."""
+
+    def __init__(self, app, spec):
+        self.app = app
+        self.client = app.test_client()
+        self.spec = spec
+        self._requirements = None
+
+    def user_id(self, rnd):
+        return rnd.randint(1, self.spec.users)
+
+    def offer_id(self, rnd):
+        return rnd.randint(1, self.spec.offers)
+
+    def requirements(self):
+        """(job_offer_id, skill_id, level_required) de todas las ofertas, una sola vez."""
+        if self._requirements is None:
+            self._requirements = db.session.query(
+                JobSkillRequirement.job_offer_id,
+                JobSkillRequirement.skill_id,
+                JobSkillRequirement.level_required,
+            ).all()
+        return self._requirements
+
+
+def _get(ctx, url):
+    def call():
+        response = ctx.client.get(url)
+        response.close()
+        return response.status_code < 400
+    return call
+
+
+def _user_levels(user_id):
+    return dict(
+        db.session.query(UserSkill.skill_id, UserSkill.level).filter(UserSkill.user_id == user_id)
+    )
+
+
+# =========================
+# HTTP (test client)
+# =========================
+
+def match(ctx, rnd):
+    return _get(ctx, f"/api/match/user/{ctx.user_id(rnd)}/job_offer/{ctx.offer_id(rnd)}")
+
+
+def match_numpy(ctx, rnd):
+    return _get(ctx, f"/api/match/user/{ctx.user_id(rnd)}/job_offer/{ctx.offer_id(rnd)}?engine=numpy")
+
+
+def top_k(engine):
+    def scenario(ctx, rnd):
+        return _get(ctx, f"/api/match/user/{ctx.user_id(rnd)}/top?k={TOP_K}&engine={engine}")
+    return scenario
+
+
+def top_candidates(ctx, rnd):
+    return _get(ctx, f"/api/match/job_offer/{ctx.offer_id(rnd)}/candidates?k={TOP_K}&engine=numpy")
+
+
+def list_users(ctx, rnd):
+    return _get(ctx, f"/api/users?after_id={rnd.randint(0, ctx.spec.users)}&limit={PAGE_LIMIT}")
+
+
+def list_job_offers(ctx, rnd):
+    return _get(
+        ctx, f"/api/job_offers?after_id={rnd.randint(0, ctx.spec.offers)}&limit={PAGE_LIMIT}&is_active=true"
+    )
+
+
+def list_user_skills(ctx, rnd):
+    return _get(ctx, f"/api/user_skills?user_id={ctx.user_id(rnd)}")
+
+
+def write_user_skills(ctx, rnd):
+    """Reemplaza las skills de un usuario: escritura + señales + invalidaciones."""
+    user_id = ctx.user_id(rnd)
+    skills = rnd.sample(range(1, ctx.spec.skills + 1), min(rnd.randint(3, 12), ctx.spec.skills))
+    payload = [
+        {"skill_id": skill_id, "level": rnd.choice(("beginner", "intermediate", "advanced"))}
+        for skill_id in skills
+    ]
+
+    def call():
+        response = ctx.client.put(f"/api/users/{user_id}/skills", json=payload)
+        response.close()
+        return response.status_code == 200
+    return call
+
+
+def create_job_offer(ctx, rnd):
+    skills = rnd.sample(range(1, ctx.spec.skills + 1), min(rnd.randint(2, 8), ctx.spec.skills))
+    payload = [{
+        "title": "bench offer",
+        "company": "bench",
+        "requirements": [
+            {"skill_id": skill_id, "min_level": "intermediate", "importance": rnd.randint(1, 5)}
+            for skill_id in skills
+        ],
+    }]
+
+    def call():
+        response = ctx.client.post("/api/job_offers/bulk", json=payload)
+        response.close()
+        return response.status_code == 201
+    return call
+
+
+# =========================
+# Directo contra el scoring
+# =========================
+
+def score_direct(ctx, rnd):
+    """Ranking por conteo en Python puro sobre los requisitos ya en memoria."""
+    user_levels = _user_levels(ctx.user_id(rnd))
+    requirements = ctx.requirements()
+    return lambda: top_k_offers(user_levels, requirements, TOP_K) is not None
+
+
+def score_weighted_direct(ctx, rnd):
+    user_levels = _user_levels(ctx.user_id(rnd))
+    profiles = offer_weights.profiles()
+    return lambda: top_k_offers_weighted(user_levels, profiles.items(), TOP_K) is not None
+
+
+def engine_top_k_direct(ctx, rnd):
+    user_id = ctx.user_id(rnd)
+    return lambda: get_engine().top_offers(user_id, TOP_K) is not None
+
+
+SCENARIOS = {
+    "match": match,
+    "match_numpy": match_numpy,
+    "top_k": top_k("python"),
+    "top_k_numpy": top_k("numpy"),
+    "top_k_sql": top_k("sql"),
+    "top_k_lsh": top_k("lsh"),
+    "top_k_materialized": top_k("materialized"),
+    "top_candidates": top_candidates,
+    "list_users": list_users,
+    "list_job_offers": list_job_offers,
+    "list_user_skills": list_user_skills,
+    "score_direct": score_direct,
+    "score_weighted_direct": score_weighted_direct,
+    "engine_top_k_direct": engine_top_k_direct,
+    # Escrituras al final: invalidan los índices en memoria de los demás
+    "write_user_skills": write_user_skills,
+    "create_job_offer": create_job_offer,
+}
+
+# top_k_materialized necesita match_scores (run --scores)
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "top_k_materialized"]
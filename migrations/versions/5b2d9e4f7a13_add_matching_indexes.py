@@ -0,0 +1,41 @@
+"""add matching indexes and uniqueness
+
+Revision ID: 5b2d9e4f7a13
+Revises: 0c8e63b795af
+Create Date: 2026-10-18 18:02:11.407215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2d9e4f7a13'
+down_revision = '0c8e63b795af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Antes de los índices únicos se eliminan duplicados: queda la fila más
+    # reciente (id mayor) de cada par
+    op.execute(
+        "DELETE FROM user_skills WHERE id NOT IN ("
+        "SELECT MAX(id) FROM user_skills GROUP BY user_id, skill_id)"
+    )
+    op.execute(
+        "DELETE FROM job_skill_requirements WHERE id NOT IN ("
+        "SELECT MAX(id) FROM job_skill_requirements GROUP BY job_offer_id, skill_id)"
+    )
+
+    op.create_index('uq_user_skills_user_skill', 'user_skills', ['user_id', 'skill_id'], unique=True, postgresql_include=['level'])
+    op.create_index('ix_user_skills_skill_user', 'user_skills', ['skill_id', 'user_id'], unique=False)
+    op.create_index('uq_job_skill_requirements_offer_skill', 'job_skill_requirements', ['job_offer_id', 'skill_id'], unique=True, postgresql_include=['level_required', 'importance'])
+    op.create_index('ix_job_offers_active', 'job_offers', ['id'], unique=False, postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
+
+
+def downgrade():
+    op.drop_index('ix_job_offers_active', table_name='job_offers', postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
+    op.drop_index('uq_job_skill_requirements_offer_skill', table_name='job_skill_requirements', postgresql_include=['level_required', 'importance'])
+    op.drop_index('ix_user_skills_skill_user', table_name='user_skills')
+    op.drop_index('uq_user_skills_user_skill', table_name='user_skills', postgresql_include=['level'])
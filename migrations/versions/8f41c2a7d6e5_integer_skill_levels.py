@@ -0,0 +1,101 @@
+"""integer skill levels
+
+Revision ID: 8f41c2a7d6e5
+Revises: 5b2d9e4f7a13
+Create Date: 2026-10-18 18:40:27.552903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f41c2a7d6e5'
+down_revision = '5b2d9e4f7a13'
+branch_labels = None
+depends_on = None
+
+
+# Copia de matching.LEVEL_ORDER / LEVEL_NAMES al momento de esta revisión
+LEVEL_ORDER = {
+    "beginner": 1,
+    "junior": 1,
+    "intermediate": 2,
+    "mid": 2,
+    "advanced": 3,
+    "senior": 3,
+}
+LEVEL_NAMES = {
+    1: "beginner",
+    2: "intermediate",
+    3: "advanced",
+}
+
+LEVEL_COLUMNS = (
+    ("user_skills", "level"),
+    ("job_skill_requirements", "level_required"),
+)
+
+# Cuántas filas con nivel irreconocible se listan por tabla en el error
+MAX_REPORTED_ROWS = 20
+
+
+def unknown_levels(table, column):
+    """Filas (id, nivel) de `table` cuyo nivel no está en LEVEL_ORDER."""
+    known = ", ".join(f"'{name}'" for name in LEVEL_ORDER)
+    return op.get_bind().execute(sa.text(
+        f"SELECT id, {column} FROM {table} "
+        f"WHERE LOWER(TRIM({column})) NOT IN ({known}) ORDER BY id"
+    )).all()
+
+
+def upgrade():
+    # Antes se comparaba con LEVEL_ORDER.get(nivel, 0): un nivel irreconocible
+    # quedaba debajo de beginner. Pasarlo a cualquier código cambiaría los
+    # matches, así que la migración se corta y lista las filas a corregir
+    problems = []
+    for table, column in LEVEL_COLUMNS:
+        rows = unknown_levels(table, column)
+        if rows:
+            listed = ", ".join(f"id {row_id}: {level!r}" for row_id, level in rows[:MAX_REPORTED_ROWS])
+            more = f" (y {len(rows) - MAX_REPORTED_ROWS} más)" if len(rows) > MAX_REPORTED_ROWS else ""
+            problems.append(f"{table}.{column}: {listed}{more}")
+    if problems:
+        raise RuntimeError(
+            "Niveles irreconocibles; corregirlos (beginner / intermediate / advanced) "
+            "o borrar esas filas antes de migrar:\n  " + "\n  ".join(problems)
+        )
+
+    # Texto → código
+    for table, column in LEVEL_COLUMNS:
+        whens = " ".join(
+            f"WHEN '{name}' THEN '{code}'" for name, code in LEVEL_ORDER.items()
+        )
+        op.execute(
+            f"UPDATE {table} SET {column} = "
+            f"CASE LOWER(TRIM({column})) {whens} END"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.String(length=20),
+                type_=sa.SmallInteger(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::smallint",
+            )
+
+
+def downgrade():
+    for table, column in LEVEL_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.SmallInteger(),
+                type_=sa.String(length=20),
+                existing_nullable=False,
+                postgresql_using=f"{column}::varchar",
+            )
+        whens = " ".join(
+            f"WHEN '{code}' THEN '{name}'" for code, name in LEVEL_NAMES.items()
+        )
+        op.execute(f"UPDATE {table} SET {column} = CASE {column} {whens} END")
@@ -0,0 +1,37 @@
+"""add updated_at
+
+Revision ID: c3e7a1f09b42
+Revises: 8f41c2a7d6e5
+Create Date: 2026-10-18 19:21:05.118640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e7a1f09b42'
+down_revision = '8f41c2a7d6e5'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('users', 'skills', 'job_offers', 'user_skills', 'job_skill_requirements')
+
+# Tablas que ya tenían created_at: las filas existentes parten de esa fecha
+WITH_CREATED_AT = ('users', 'job_offers')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        if table in WITH_CREATED_AT:
+            op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+        else:
+            op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,50 @@
+"""add user_recommendations and recommendation_queue
+
+Revision ID: d4a96b1e2f07
+Revises: c3e7a1f09b42
+Create Date: 2026-10-18 20:02:44.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a96b1e2f07'
+down_revision = 'c3e7a1f09b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_recommendations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('job_offer_id', sa.Integer(), nullable=False),
+    sa.Column('compatibility', sa.SmallInteger(), nullable=False),
+    sa.Column('matched_count', sa.Integer(), nullable=False),
+    sa.Column('total_reqs', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'rank')
+    )
+    op.create_index('ix_user_recommendations_offer', 'user_recommendations', ['job_offer_id'], unique=False)
+    op.create_table('recommendation_queue',
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('enqueued_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'entity_id')
+    )
+    op.create_index('ix_recommendation_queue_enqueued_at', 'recommendation_queue', ['enqueued_at'], unique=False)
+    # Todos los usuarios existentes arrancan pendientes: el worker los calcula
+    op.execute(
+        "INSERT INTO recommendation_queue (kind, entity_id, enqueued_at) "
+        "SELECT 'user', id, CURRENT_TIMESTAMP FROM users"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_recommendation_queue_enqueued_at', table_name='recommendation_queue')
+    op.drop_table('recommendation_queue')
+    op.drop_index('ix_user_recommendations_offer', table_name='user_recommendations')
+    op.drop_table('user_recommendations')
@@ -0,0 +1,28 @@
+"""match active offers index predicate to the loaders
+
+Revision ID: e8f3b6c2a519
+Revises: d4a96b1e2f07
+Create Date: 2026-10-18 21:40:52.118034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f3b6c2a519'
+down_revision = 'd4a96b1e2f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los motores filtran `is_active IS NOT false`: con `WHERE is_active` el
+    # planner no puede usar el índice parcial
+    op.drop_index('ix_job_offers_active', table_name='job_offers', postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
+    op.create_index('ix_job_offers_active', 'job_offers', ['id'], unique=False, postgresql_where=sa.text('is_active IS NOT false'), sqlite_where=sa.text('is_active IS NOT 0'))
+
+
+def downgrade():
+    op.drop_index('ix_job_offers_active', table_name='job_offers', postgresql_where=sa.text('is_active IS NOT false'), sqlite_where=sa.text('is_active IS NOT 0'))
+    op.create_index('ix_job_offers_active', 'job_offers', ['id'], unique=False, postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import pytest
+
+# La config se lee al importar `app`: base y cache de los tests en un
+# directorio temporal, antes de cualquier import de la app
+_TMP_DIR = tempfile.mkdtemp(prefix="skillmatch-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["CACHE_PATH"] = os.path.join(_TMP_DIR, "cache.sqlite3")
+os.environ["CACHE_BACKEND"] = "memory"
+
+from app import create_app, db  # noqa: E402
+from app import lsh  # noqa: E402
+from app.cache import match_cache  # noqa: E402
+from app.catalog import skill_catalog  # noqa: E402
+from app.engine import invalidate_engine  # noqa: E402
+from app.search import offer_search  # noqa: E402
+from app.skill_index import skill_index  # noqa: E402
+from app.weights import offer_weights  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    """Test client sobre una base vacía y sin nada en memoria de tests anteriores."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        skill_catalog.clear()
+        skill_index.invalidate()
+        offer_weights.clear()
+        offer_search.clear()
+        lsh.lsh_index.clear()
+        invalidate_engine()
+        match_cache.backend.clear()
+        yield app.test_client()
+        db.session.remove()
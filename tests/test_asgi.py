@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+
+from starlette.requests import Request
+
+from app import asgi
+from app.asgi import AsyncAPI, create_db_engine
+
+
+def top_request(user_id, k):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": f"/api/match/user/{user_id}/top",
+        "query_string": f"k={k}".encode(),
+        "headers": [],
+        "path_params": {"user_id": user_id},
+    })
+
+
+def test_top_matches_do_not_block_the_event_loop(app, client, monkeypatch):
+    skills = [client.post("/api/skills", json={"name": name}).get_json()["id"] for name in ("sql", "go")]
+    user = client.post("/api/users", json={"name": "eva", "email": "eva@test.local"}).get_json()
+    client.post("/api/job_offers/bulk", json=[
+        {
+            "title": f"backend {i}",
+            "company": "acme",
+            "requirements": [{"skill_id": skill_id, "min_level": "beginner"} for skill_id in skills[:i + 1]],
+        }
+        for i in range(2)
+    ])
+    client.put(f"/api/users/{user['id']}/skills", json=[{"skill_id": skills[0], "level": "advanced"}])
+    expected = client.get(f"/api/match/user/{user['id']}/top?k=2").get_json()
+
+    # Un ranking lento: si corriera en el event loop, nada más avanzaría
+    def slow_top_k_offers(*args):
+        time.sleep(0.3)
+        return top_k_offers(*args)
+
+    top_k_offers = asgi.top_k_offers
+    monkeypatch.setattr(asgi, "top_k_offers", slow_top_k_offers)
+
+    async def scenario():
+        api = AsyncAPI(app, create_db_engine(app.config), None)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            response = await api.top_matches_for_user(top_request(user["id"], 2))
+        finally:
+            ticking.cancel()
+            await api.db_engine.dispose()
+        return response, ticks
+
+    response, ticks = asyncio.run(scenario())
+
+    assert json.loads(response.body) == expected
+    assert ticks >= 10
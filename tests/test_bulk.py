@@ -0,0 +1,161 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import JobOffer, MatchScore, UserSkill
+from app.scores import rebuild_all_scores
+from app.signals import job_offers_changed, requirements_changed
+
+
+@contextmanager
+def count_commits():
+    commits = []
+    listener = lambda conn: commits.append(conn)  # noqa: E731
+    event.listen(db.engine, "commit", listener)
+    try:
+        yield commits
+    finally:
+        event.remove(db.engine, "commit", listener)
+
+
+def create_skills(client, n):
+    return [client.post("/api/skills", json={"name": f"skill-{i}"}).get_json()["id"] for i in range(n)]
+
+
+def offers_payload(skill_ids, n, prefix="offer"):
+    return [
+        {
+            "title": f"{prefix} {i}",
+            "company": "acme",
+            "requirements": [
+                {"skill_id": skill_ids[(i + j) % len(skill_ids)], "min_level": "intermediate"}
+                for j in range(3)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def match_scores():
+    return sorted(
+        db.session.query(
+            MatchScore.user_id, MatchScore.job_offer_id, MatchScore.compatibility,
+            MatchScore.matched_count, MatchScore.total_reqs,
+        ).all()
+    )
+
+
+def test_bulk_offers_commit_count_does_not_grow_with_batch_size(client):
+    skill_ids = create_skills(client, 10)
+    for i in range(5):
+        user = client.post("/api/users", json={"name": f"u{i}", "email": f"u{i}@test.local"}).get_json()
+        client.put(f"/api/users/{user['id']}/skills", json=[
+            {"skill_id": skill_id, "level": "advanced"} for skill_id in skill_ids[i:i + 4]
+        ])
+
+    counts = []
+    for size in (20, 200):
+        with count_commits() as commits:
+            response = client.post("/api/job_offers/bulk", json=offers_payload(skill_ids, size, f"batch {size}"))
+        assert response.status_code == 201
+        counts.append(len(commits))
+
+    assert counts[0] == counts[1]
+    # match_scores queda igual que recalculando todo desde cero
+    incremental = match_scores()
+    rebuild_all_scores()
+    assert incremental == match_scores()
+
+
+def test_bulk_offers_send_one_signal_per_batch(app, client):
+    skill_ids = create_skills(client, 3)
+    received = []
+
+    def on_offers(sender, offer_ids=None, **extra):
+        received.append(("job_offers_changed", len(offer_ids)))
+
+    def on_requirements(sender, offer_ids=None, **extra):
+        received.append(("requirements_changed", len(offer_ids)))
+
+    with job_offers_changed.connected_to(on_offers), requirements_changed.connected_to(on_requirements):
+        client.post("/api/job_offers/bulk", json=offers_payload(skill_ids, 30))
+
+    assert received == [("job_offers_changed", 30)]
+
+
+@pytest.mark.parametrize("item", [
+    {"user_id": [1], "skill_id": 1, "level": "advanced"},
+    {"user_id": 1, "skill_id": {"id": 1}, "level": "advanced"},
+    {"user_id": "1", "skill_id": 1, "level": "advanced"},
+    {"user_id": True, "skill_id": 1, "level": "advanced"},
+    {"user_id": -1, "skill_id": 1, "level": "advanced"},
+])
+def test_bulk_user_skills_reject_non_integer_ids(client, item):
+    create_skills(client, 1)
+    client.post("/api/users", json={"name": "ana", "email": "ana@test.local"})
+
+    response = client.post("/api/user_skills/bulk", json=[item])
+    assert response.status_code == 400
+    assert response.get_json()["items"][0]["index"] == 0
+
+
+def test_bulk_requirements_reject_non_integer_ids(client):
+    response = client.post("/api/job_offers/bulk", json=[{
+        "title": "dev", "company": "acme", "requirements": [{"skill_id": [1], "min_level": "beginner"}],
+    }])
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("item", [
+    {"title": None, "company": "acme"},
+    {"title": "  ", "company": "acme"},
+    {"title": ["a"], "company": "acme"},
+    {"title": "dev", "company": "acme", "location": 5},
+    {"title": "dev", "company": "acme", "is_active": "yes"},
+    {"title": "x" * 151, "company": "acme"},
+])
+def test_bulk_offers_reject_invalid_fields(client, item):
+    response = client.post("/api/job_offers/bulk", json=[{"title": "ok", "company": "acme"}, item])
+
+    assert response.status_code == 400
+    assert [error["index"] for error in response.get_json()["items"]] == [1]
+    assert db.session.query(JobOffer).count() == 0
+
+
+def test_bulk_user_skills_report_repeated_and_existing_pairs(client):
+    skills = create_skills(client, 2)
+    user_id = client.post("/api/users", json={"name": "ana", "email": "ana@test.local"}).get_json()["id"]
+    client.post("/api/user_skills", json={"user_id": user_id, "skill_id": skills[0], "level": "advanced"})
+
+    repeated = client.post("/api/user_skills/bulk", json=[
+        {"user_id": user_id, "skill_id": skills[1], "level": "advanced"},
+        {"user_id": user_id, "skill_id": skills[1], "level": "beginner"},
+    ])
+    assert repeated.status_code == 400
+    assert [error["index"] for error in repeated.get_json()["items"]] == [1]
+
+    existing = client.post("/api/user_skills/bulk", json=[
+        {"user_id": user_id, "skill_id": skills[1], "level": "advanced"},
+        {"user_id": user_id, "skill_id": skills[0], "level": "beginner"},
+    ])
+    assert existing.status_code == 409
+    assert [error["index"] for error in existing.get_json()["items"]] == [1]
+    assert db.session.query(UserSkill).count() == 1
+
+
+def test_bulk_offers_report_repeated_requirements(client):
+    skills = create_skills(client, 2)
+    response = client.post("/api/job_offers/bulk", json=[
+        {"title": "ok", "company": "acme", "requirements": [{"skill_id": skills[0], "min_level": "beginner"}]},
+        {
+            "title": "dup",
+            "company": "acme",
+            "requirements": [{"skill_id": skills[1], "min_level": "beginner"}] * 2,
+        },
+    ])
+
+    assert response.status_code == 400
+    assert [error["index"] for error in response.get_json()["items"]] == [1]
+    assert db.session.query(JobOffer).count() == 0
@@ -0,0 +1,126 @@
+import pytest
+
+from app.cache import LocalInvalidationLog, MemoryCache, SqliteInvalidationLog, match_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("app.cache.time.monotonic", fake)
+    return fake
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" queda como la menos usada
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_evicts_by_bytes():
+    cache = MemoryCache(max_entries=100, max_bytes=20)
+    cache.set("a", "x" * 8)  # 10 bytes serializado
+    cache.set("b", "y" * 8)
+    cache.set("c", "z" * 8)
+
+    stats = cache.stats()
+    assert cache.get("a") is None
+    assert stats["bytes"] <= 20
+    assert stats["entries"] == 2
+
+
+def test_memory_cache_ttl_expires_entries(clock):
+    cache = MemoryCache(ttl=30)
+    cache.set("a", {"compatibility": 50})
+
+    clock.now += 29
+    assert cache.get("a") == {"compatibility": 50}
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_memory_cache_returns_copies():
+    cache = MemoryCache()
+    cache.set("a", {"skills": [1]})
+    cache.get("a")["skills"].append(2)
+    assert cache.get("a") == {"skills": [1]}
+
+
+@pytest.mark.parametrize("make_log", [
+    lambda tmp_path: LocalInvalidationLog(max_versions=3),
+    lambda tmp_path: SqliteInvalidationLog(str(tmp_path / "cache.sqlite3"), max_versions=3),
+])
+def test_versions_are_bounded_and_never_repeat(tmp_path, make_log):
+    log = make_log(tmp_path)
+    history = {}
+    for _ in range(3):
+        for i in range(100):
+            name = f"user:{i}"
+            log.bump_version(name)
+            # Aunque el nombre se haya descartado, cada subida da una versión nueva
+            version = log.get_version(name)
+            assert all(version > old for old in history.get(name, []))
+            history.setdefault(name, []).append(version)
+
+    # El tope se revisa cada 100 subidas en SQLite: puede pasarse un poco
+    assert log.stats()["versions"] <= 3 + 100
+    for name, versions in history.items():
+        # Los descartados devuelven el piso, que nunca es una versión vieja suya
+        assert log.get_version(name) >= versions[-1]
+
+
+def test_match_cache_key_changes_when_user_or_offer_is_written(client):
+    skill = client.post("/api/skills", json={"name": "python"}).get_json()
+    user = client.post("/api/users", json={"name": "ana", "email": "ana@test.local"}).get_json()
+    offer = client.post("/api/job_offers", json={"title": "dev", "company": "acme"}).get_json()
+
+    user_key = match_cache.key(user["id"], offer["id"], "python:count")
+    match_cache.set(user_key, {"compatibility": 0})
+    assert match_cache.get(user_key) == {"compatibility": 0}
+
+    client.put(f"/api/users/{user['id']}/skills", json=[{"skill_id": skill["id"], "level": "advanced"}])
+    offer_key = match_cache.key(user["id"], offer["id"], "python:count")
+    assert offer_key != user_key
+
+    client.post("/api/job_skill_requirements", json={
+        "job_offer_id": offer["id"], "skill_id": skill["id"], "min_level": "beginner",
+    })
+    assert match_cache.key(user["id"], offer["id"], "python:count") != offer_key
+
+
+def test_match_endpoint_serves_fresh_result_after_write(client):
+    skills = [client.post("/api/skills", json={"name": name}).get_json()["id"] for name in ("sql", "go")]
+    user = client.post("/api/users", json={"name": "bo", "email": "bo@test.local"}).get_json()
+    offer = client.post("/api/job_offers/bulk", json=[{
+        "title": "backend",
+        "company": "acme",
+        "requirements": [{"skill_id": skill_id, "min_level": "beginner"} for skill_id in skills],
+    }]).get_json()[0]
+    client.put(f"/api/users/{user['id']}/skills", json=[{"skill_id": skills[0], "level": "advanced"}])
+    url = f"/api/match/user/{user['id']}/job_offer/{offer['id']}"
+
+    assert client.get(url).get_json()["compatibility"] == 50
+    hits = match_cache.stats()["hits"]
+    assert client.get(url).get_json()["compatibility"] == 50
+    assert match_cache.stats()["hits"] == hits + 1
+
+    client.put(
+        f"/api/users/{user['id']}/skills",
+        json=[{"skill_id": skill_id, "level": "advanced"} for skill_id in skills],
+    )
+    assert client.get(url).get_json()["compatibility"] == 100
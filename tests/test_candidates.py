@@ -0,0 +1,34 @@
+import pytest
+
+ENGINES = ("python", "numpy", "sql", "materialized")
+
+
+@pytest.fixture
+def offer_id(client):
+    skill = client.post("/api/skills", json={"name": "sql"}).get_json()["id"]
+    user = client.post("/api/users", json={"name": "gus", "email": "gus@test.local"}).get_json()["id"]
+    client.put(f"/api/users/{user}/skills", json=[{"skill_id": skill, "level": "advanced"}])
+    return client.post("/api/job_offers/bulk", json=[{
+        "title": "dba",
+        "company": "acme",
+        "requirements": [{"skill_id": skill, "min_level": "beginner"}],
+    }]).get_json()[0]["id"]
+
+
+def test_every_engine_ranks_the_same_candidates(client, offer_id):
+    responses = [
+        client.get(f"/api/match/job_offer/{offer_id}/candidates?engine={engine}").get_json()
+        for engine in ENGINES
+    ]
+
+    assert len(responses[0]["candidates"]) == 1
+    assert all(response == responses[0] for response in responses)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_inactive_offer_is_rejected_by_every_engine(client, offer_id, engine):
+    client.put(f"/api/job_offers/{offer_id}", json={"is_active": False})
+
+    response = client.get(f"/api/match/job_offer/{offer_id}/candidates?engine={engine}")
+
+    assert response.status_code == 409
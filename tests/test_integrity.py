@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import JobOffer, JobSkillRequirement, UserSkill
+from app.routes import is_unique_violation
+
+
+@pytest.fixture
+def ids(client):
+    user_id = client.post("/api/users", json={"name": "ana", "email": "ana@example.com"}).get_json()["id"]
+    skill_id = client.post("/api/skills", json={"name": "python"}).get_json()["id"]
+    offer_id = client.post("/api/job_offers", json={"title": "dev", "company": "acme"}).get_json()["id"]
+    return {"user": user_id, "skill": skill_id, "offer": offer_id}
+
+
+@pytest.mark.parametrize("field", ["user_id", "skill_id"])
+def test_user_skill_with_missing_reference_is_rejected(client, ids, field):
+    payload = {"user_id": ids["user"], "skill_id": ids["skill"], "level": "advanced", field: 999}
+
+    response = client.post("/api/user_skills", json=payload)
+
+    assert response.status_code == 400
+    assert "999" in response.get_json()["error"]
+    assert db.session.query(UserSkill).count() == 0
+
+
+def test_user_skill_rejects_non_integer_ids(client, ids):
+    response = client.post("/api/user_skills", json={"user_id": [ids["user"]], "skill_id": ids["skill"], "level": "advanced"})
+
+    assert response.status_code == 400
+
+
+def test_duplicate_user_skill_is_a_conflict(client, ids):
+    payload = {"user_id": ids["user"], "skill_id": ids["skill"], "level": "advanced"}
+
+    assert client.post("/api/user_skills", json=payload).status_code == 201
+    response = client.post("/api/user_skills", json=payload)
+
+    assert response.status_code == 409
+    assert db.session.query(UserSkill).count() == 1
+
+
+@pytest.mark.parametrize("field", ["job_offer_id", "skill_id"])
+def test_requirement_with_missing_reference_is_rejected(client, ids, field):
+    payload = {"job_offer_id": ids["offer"], "skill_id": ids["skill"], "min_level": "intermediate", field: 999}
+
+    response = client.post("/api/job_skill_requirements", json=payload)
+
+    assert response.status_code == 400
+    assert "999" in response.get_json()["error"]
+    assert db.session.query(JobSkillRequirement).count() == 0
+
+
+def test_duplicate_requirement_is_a_conflict(client, ids):
+    payload = {"job_offer_id": ids["offer"], "skill_id": ids["skill"], "min_level": "intermediate"}
+
+    assert client.post("/api/job_skill_requirements", json=payload).status_code == 201
+    response = client.post("/api/job_skill_requirements", json=payload)
+
+    assert response.status_code == 409
+    assert db.session.query(JobSkillRequirement).count() == 1
+
+
+def test_only_unique_violations_are_conflicts(client):
+    db.session.add(JobOffer(title=None, company="acme"))
+    with pytest.raises(IntegrityError) as excinfo:
+        db.session.flush()
+    db.session.rollback()
+
+    assert not is_unique_violation(excinfo.value)
+
+
+def test_active_offers_query_uses_partial_index(client):
+    # El predicado del índice tiene que ser el mismo que filtran los motores
+    query = select(JobOffer.id).where(JobOffer.is_active.isnot(False))
+    sql = str(query.compile(db.engine, compile_kwargs={"literal_binds": True}))
+
+    plan = db.session.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+
+    assert any("ix_job_offers_active" in row[-1] for row in plan)
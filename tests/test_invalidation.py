@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+
+from app import db
+from app.cache import MemoryCache, SqliteInvalidationLog
+from app.catalog import SkillCatalog, skill_catalog
+from app.models import Skill
+from app.signals import skills_changed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Otro worker: misma base y mismo CACHE_PATH (heredados del entorno), otro proceso
+WRITER = """
+import sys
+from app import create_app
+client = create_app().test_client()
+response = client.put(sys.argv[1], json=[
+    {"skill_id": int(skill_id), "level": "advanced"} for skill_id in sys.argv[2:]
+])
+assert response.status_code == 200, response.get_json()
+"""
+
+
+def test_memory_backends_share_versions_and_events(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = MemoryCache(log=SqliteInvalidationLog(path))
+    second = MemoryCache(log=SqliteInvalidationLog(path))
+
+    seq = second.latest_seq()
+    first.bump_version("user:1")
+    first.publish("user_skills_changed", {"user_ids": [1]})
+
+    assert second.get_version("user:1") == first.get_version("user:1") != 0
+    assert second.poll(seq) == [(seq + 1, "user_skills_changed", {"user_ids": [1]})]
+    assert first.epoch == second.epoch
+
+
+def test_write_in_another_process_invalidates_this_one(client):
+    skills = [client.post("/api/skills", json={"name": name}).get_json()["id"] for name in ("css", "js")]
+    user = client.post("/api/users", json={"name": "cai", "email": "cai@test.local"}).get_json()
+    offer = client.post("/api/job_offers/bulk", json=[{
+        "title": "frontend",
+        "company": "acme",
+        "requirements": [{"skill_id": skill_id, "min_level": "beginner"} for skill_id in skills],
+    }]).get_json()[0]
+    client.put(f"/api/users/{user['id']}/skills", json=[{"skill_id": skills[0], "level": "advanced"}])
+
+    match_url = f"/api/match/user/{user['id']}/job_offer/{offer['id']}"
+    first = client.get(match_url)
+    top_url = f"/api/match/user/{user['id']}/top?engine=numpy"
+    assert client.get(top_url).get_json()["matches"][0]["compatibility"] == 50
+
+    subprocess.run(
+        [sys.executable, "-c", WRITER, f"/api/users/{user['id']}/skills", *map(str, skills)],
+        cwd=ROOT, check=True,
+    )
+
+    assert client.get(match_url).get_json()["compatibility"] == 100
+    assert client.get(match_url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
+    assert client.get(top_url).get_json()["matches"][0]["compatibility"] == 100
+
+
+def test_match_etag_falls_back_to_body_hash_without_shared_versions(app, client, monkeypatch):
+    skill = client.post("/api/skills", json={"name": "rust"}).get_json()
+    user = client.post("/api/users", json={"name": "dan", "email": "dan@test.local"}).get_json()
+    offer = client.post("/api/job_offers/bulk", json=[{
+        "title": "systems",
+        "company": "acme",
+        "requirements": [{"skill_id": skill["id"], "min_level": "beginner"}],
+    }]).get_json()[0]
+    url = f"/api/match/user/{user['id']}/job_offer/{offer['id']}"
+
+    # Versiones privadas del proceso: no sirven para validar entre workers
+    monkeypatch.setitem(app.extensions, "cache", MemoryCache())
+    first = client.get(url)
+    assert not first.headers["ETag"].startswith("W/")
+
+    client.put(f"/api/users/{user['id']}/skills", json=[{"skill_id": skill["id"], "level": "advanced"}])
+    second = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_json()["compatibility"] == 100
+    assert client.get(url, headers={"If-None-Match": second.headers["ETag"]}).status_code == 304
+
+
+def test_skill_written_while_catalog_loads_is_picked_up(app, client, monkeypatch):
+    client.post("/api/skills", json={"name": "css"})
+    writes = []
+
+    def racing_load():
+        snapshot = SkillCatalog._load()
+        if not writes:
+            # Otro worker crea una skill después de que se leyeron las filas
+            skill = Skill(name="go")
+            db.session.add(skill)
+            db.session.commit()
+            skills_changed.send(app, skill_ids=[skill.id])
+            writes.append(skill.id)
+        return snapshot
+
+    monkeypatch.setattr(skill_catalog, "_load", racing_load)
+    assert [s["name"] for s in client.get("/api/skills").get_json()] == ["css"]
+    assert [s["name"] for s in client.get("/api/skills").get_json()] == ["css", "go"]
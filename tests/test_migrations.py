@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Revisión anterior a los niveles enteros (8f41c2a7d6e5)
+TEXT_LEVELS_REVISION = "5b2d9e4f7a13"
+
+
+def flask_db(database, *args):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}", "FLASK_APP": "app"}
+    return subprocess.run(
+        [sys.executable, "-m", "flask", "db", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "legacy.db"
+    assert flask_db(path, "upgrade", TEXT_LEVELS_REVISION).returncode == 0
+    return path
+
+
+def add_user_skills(path, levels):
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO user_skills (user_id, skill_id, level) VALUES (1, ?, ?)",
+            list(enumerate(levels, start=1)),
+        )
+
+
+def test_integer_levels_keep_known_levels(database):
+    add_user_skills(database, ["Junior", " advanced ", "mid"])
+
+    assert flask_db(database, "upgrade").returncode == 0
+    with sqlite3.connect(database) as conn:
+        levels = [level for level, in conn.execute("SELECT level FROM user_skills ORDER BY id")]
+    assert levels == [1, 3, 2]
+
+
+def test_integer_levels_refuse_unknown_levels(database):
+    add_user_skills(database, ["beginner", "expert"])
+
+    result = flask_db(database, "upgrade")
+
+    assert result.returncode != 0
+    assert "user_skills.level: id 2: 'expert'" in result.stderr
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT level FROM user_skills WHERE id = 2").fetchone() == ("expert",)
@@ -0,0 +1,37 @@
+def create_offers(client, titles, **fields):
+    response = client.post("/api/job_offers/bulk", json=[
+        {"title": title, "company": "acme", **fields} for title in titles
+    ])
+    assert response.status_code == 201
+    return [offer["id"] for offer in response.get_json()]
+
+
+def search(client, **params):
+    response = client.get("/api/job_offers/search", query_string=params)
+    assert response.status_code == 200
+    return [offer["id"] for offer in response.get_json()]
+
+
+def test_prefix_expands_every_matching_token(client):
+    # 80 palabras distintas con el mismo prefijo
+    offer_ids = create_offers(client, [f"dev{i:03d}x" for i in range(80)])
+
+    assert search(client, q="dev", limit=100) == sorted(offer_ids, reverse=True)
+    assert search(client, q="dev07", limit=100) == sorted(offer_ids[70:], reverse=True)
+
+
+def test_prefix_with_other_words_and_filters(client):
+    remote = create_offers(client, ["python backend", "pythonic tools", "java backend"], location="Remote")
+    create_offers(client, ["python backend"], location="Lima")
+
+    assert search(client, q="backend pyth", location="remote") == [remote[0]]
+    assert search(client, q="pyth", location="Remote") == [remote[1], remote[0]]
+
+
+def test_index_follows_writes(client):
+    (offer_id,) = create_offers(client, ["golang developer"])
+    assert search(client, q="gola") == [offer_id]
+
+    client.put(f"/api/job_offers/{offer_id}", json={"title": "rust developer"})
+    assert search(client, q="gola") == []
+    assert search(client, q="rus") == [offer_id]
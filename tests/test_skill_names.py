@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+
+
+@contextmanager
+def count_statements():
+    """Cuenta las sentencias SQL que llegan al engine dentro del bloque."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_profile(client, n_skills):
+    """Usuario y oferta que comparten `n_skills` skills; devuelve (user_id, offer_id)."""
+    skill_ids = [
+        client.post("/api/skills", json={"name": f"skill-{n_skills}-{i}"}).get_json()["id"]
+        for i in range(n_skills)
+    ]
+    user = client.post(
+        "/api/users", json={"name": f"user {n_skills}", "email": f"u{n_skills}@test.local"}
+    ).get_json()
+    response = client.put(
+        f"/api/users/{user['id']}/skills",
+        json=[{"skill_id": skill_id, "level": "advanced"} for skill_id in skill_ids],
+    )
+    assert response.status_code == 200
+    response = client.post("/api/job_offers/bulk", json=[{
+        "title": f"offer {n_skills}",
+        "company": "test",
+        "requirements": [
+            {"skill_id": skill_id, "min_level": "intermediate"} for skill_id in skill_ids
+        ],
+    }])
+    assert response.status_code == 201
+    offer_id = response.get_json()[0]["id"]
+    return user["id"], offer_id
+
+
+@pytest.fixture
+def profiles(client):
+    small = create_profile(client, 2)
+    large = create_profile(client, 25)
+    # Catálogo y versiones listos: las dos mediciones parten del mismo estado
+    client.get("/api/skills")
+    return small, large
+
+
+def statements_for(client, url):
+    with count_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements), response.get_json()
+
+
+@pytest.mark.parametrize("url, names", [
+    ("/api/match/user/{user}/job_offer/{offer}", lambda body: [s["skill_name"] for s in body["matched_skills"]]),
+    ("/api/users/{user}?include=skills", lambda body: [s["skill_name"] for s in body["skills"]]),
+    ("/api/job_offers/{offer}?include=requirements", lambda body: [r["skill_name"] for r in body["requirements"]]),
+])
+def test_skill_names_use_constant_statements(client, profiles, url, names):
+    (small_user, small_offer), (large_user, large_offer) = profiles
+
+    small_count, small_body = statements_for(client, url.format(user=small_user, offer=small_offer))
+    large_count, large_body = statements_for(client, url.format(user=large_user, offer=large_offer))
+
+    assert sorted(names(small_body)) == [f"skill-2-{i}" for i in range(2)]
+    assert sorted(names(large_body)) == sorted(f"skill-25-{i}" for i in range(25))
+    assert small_count == large_count
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize("matched, total", [(29, 50), (29, 100), (57, 100), (58, 100)])
+def test_sql_compatibility_matches_the_other_engines(client, matched, total):
+    skills = [client.post("/api/skills", json={"name": f"skill-{i}"}).get_json()["id"] for i in range(total)]
+    user = client.post("/api/users", json={"name": "fer", "email": "fer@test.local"}).get_json()
+    client.post("/api/job_offers/bulk", json=[{
+        "title": "data",
+        "company": "acme",
+        "requirements": [{"skill_id": skill_id, "min_level": "beginner"} for skill_id in skills],
+    }])
+    client.put(f"/api/users/{user['id']}/skills", json=[
+        {"skill_id": skill_id, "level": "advanced"} for skill_id in skills[:matched]
+    ])
+
+    rankings = {
+        engine: client.get(f"/api/match/user/{user['id']}/top?k=1&engine={engine}").get_json()["matches"]
+        for engine in ("python", "numpy", "sql")
+    }
+
+    assert rankings["sql"][0]["compatibility"] == int((matched / total) * 100)
+    assert rankings["sql"] == rankings["python"] == rankings["numpy"]
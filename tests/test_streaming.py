@@ -0,0 +1,24 @@
+import time
+
+from sqlalchemy import insert
+
+from app import db
+from app.models import User
+
+
+def test_slow_stream_consumer_is_not_cut_by_the_statement_timeout(app, client, monkeypatch):
+    db.session.execute(insert(User), [
+        {"name": f"user {i}", "email": f"user{i}@test.local"} for i in range(1500)
+    ])
+    db.session.commit()
+    monkeypatch.setitem(app.config["DB_STATEMENT_TIMEOUTS"], "api.list_users", 50)
+
+    response = client.get("/api/users?stream=1", buffered=False)
+    lines = 0
+    for chunk in response.response:
+        lines += chunk.count(b"\n")
+        # Cliente lento: el body completo tarda mucho más que el timeout
+        time.sleep(0.001)
+
+    assert response.status_code == 200
+    assert lines == 1500